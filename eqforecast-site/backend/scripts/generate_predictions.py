@@ -23,7 +23,6 @@ from typing import List, Dict, Any
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from app.services.quadtree import QuadtreeBinner
 from app.services.earthquake_processor import EarthquakeProcessor
 from app.services.apply_optimized_configs import load_config
 from app.services.load_catalog import load_catalog
@@ -35,14 +34,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Format version of bin_scheme.json (see forecasting/binning/quadtree.py)
+BIN_SCHEME_VERSION = 1
+
 class PredictionGenerator:
     """Generates earthquake predictions using the ML forecasting system."""
     
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, bin_scheme_path: str = None):
         """Initialize the prediction generator.
         
         Args:
             data_path: Path to the earthquake catalog CSV file
+            bin_scheme_path: Path to the bin scheme saved by preprocessing (bin_scheme.json)
         """
         if data_path is None:
             # Default to the processed catalog in the data directory
@@ -52,8 +55,17 @@ class PredictionGenerator:
         self.predictions_dir = backend_dir / "data" / "predictions"
         self.predictions_dir.mkdir(exist_ok=True)
         
-        # Initialize the spatial binner with exactly 24 bins
-        self.quadtree_binner = QuadtreeBinner(target_bins=24)
+        if bin_scheme_path is None:
+            bin_scheme_path = backend_dir / "data" / "bin_scheme.json"
+        self.bin_scheme_path = Path(bin_scheme_path)
+        
+        # Reuse the frozen bin scheme from preprocessing so bin ids match the model's bins
+        if self.bin_scheme_path.exists():
+            self.bin_scheme = self._load_bin_scheme(self.bin_scheme_path)
+            logger.info(f"Loaded bin scheme with {len(self.bin_scheme['bin_ids'])} bins from: {self.bin_scheme_path}")
+        else:
+            self.bin_scheme = None
+            logger.warning(f"No bin scheme found at {self.bin_scheme_path}, falling back to a synthetic 24-bin grid")
         
         logger.info(f"Initialized PredictionGenerator with data: {self.data_path}")
         logger.info(f"Predictions will be saved to: {self.predictions_dir}")
@@ -78,8 +90,11 @@ class PredictionGenerator:
             raise
     
     def generate_spatial_bins(self, df: Any) -> List[Dict[str, Any]]:
-        """Generate exactly 24 spatial bins using the processed data."""
+        """Generate spatial bins from the processed data and the frozen bin scheme."""
         try:
+            if self.bin_scheme is not None:
+                return self._bins_from_scheme(df)
+            
             logger.info("Generating exactly 24 spatial bins from processed data...")
             
             # Filter out bin_id -1 and get only bins 0-23
@@ -129,6 +144,39 @@ class PredictionGenerator:
             logger.error(f"Failed to generate spatial bins: {e}")
             raise
     
+    @staticmethod
+    def _load_bin_scheme(path: Path) -> Dict[str, Any]:
+        """Read the bin ids and bounds of a bin scheme written by the forecasting QuadtreeBinner.save()."""
+        with open(path, 'r') as f:
+            scheme = json.load(f)
+        
+        if scheme.get('version') != BIN_SCHEME_VERSION:
+            raise ValueError(f"Unsupported bin scheme version: {scheme.get('version')}")
+        if len(scheme['bin_ids']) != len(scheme['bounds']):
+            raise ValueError("Bin scheme needs one bin id per bin")
+        return scheme
+    
+    def _bins_from_scheme(self, df: Any) -> List[Dict[str, Any]]:
+        """Build the bin list from the real bounds of the loaded bin scheme."""
+        logger.info("Using spatial bins from the frozen bin scheme...")
+        
+        bins = []
+        for bin_id, bounds in zip(self.bin_scheme['bin_ids'], self.bin_scheme['bounds']):
+            bin_data = df[df['bin_id'] == bin_id]
+            earthquake_count = int(bin_data['frequency'].sum()) if 'frequency' in bin_data.columns else 0
+            max_magnitude = float(bin_data['max_magnitude'].max()) if len(bin_data) and 'max_magnitude' in bin_data.columns else 0
+            
+            bins.append({
+                'bin_id': int(bin_id),
+                'bounds': [float(b) for b in bounds],
+                'events': bin_data.to_dict('records'),
+                'earthquake_count': earthquake_count,
+                'max_magnitude': max_magnitude
+            })
+        
+        logger.info(f"Generated {len(bins)} spatial bins from the bin scheme")
+        return bins
+    
     def generate_predictions_for_year(self, year: int, bins: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate predictions for a specific year and spatial bins.
         
@@ -258,6 +306,12 @@ def parse_arguments():
         help="Path to earthquake catalog CSV file (default: uses data/processed_earthquake_catalog_annual_stats.csv)"
     )
     
+    parser.add_argument(
+        "--bin-scheme",
+        type=str,
+        help="Path to the bin scheme written by preprocessing (default: uses data/bin_scheme.json)"
+    )
+    
     return parser.parse_args()
 
 def main():
@@ -278,7 +332,7 @@ def main():
                 sys.exit(1)
         
         # Initialize generator
-        generator = PredictionGenerator(data_path=args.data_path)
+        generator = PredictionGenerator(data_path=args.data_path, bin_scheme_path=args.bin_scheme)
         
         # Generate predictions
         saved_files = generator.generate_predictions(years)
@@ -0,0 +1,129 @@
+import numpy as np
+
+MAGNITUDE_BIN_SIZE = 0.1
+
+
+def magnitude_entropy(mags, bin_size=MAGNITUDE_BIN_SIZE):
+    """Shannon entropy (bits) of one bin's magnitude histogram, edges starting at the bin's minimum."""
+    if len(mags) < 2:
+        return 0
+    hist, _ = np.histogram(mags, bins=np.arange(mags.min(), mags.max() + bin_size, bin_size))
+    probs = hist / hist.sum()
+    probs = probs[probs > 0]
+    return -np.sum(probs * np.log2(probs))
+
+
+def _group_min_max(bin_ids, values, n_bins):
+    vmin = np.full(n_bins, np.inf)
+    vmax = np.full(n_bins, -np.inf)
+    np.minimum.at(vmin, bin_ids, values)
+    np.maximum.at(vmax, bin_ids, values)
+    return vmin, vmax
+
+
+def magnitude_bin_ids(bin_ids, mags, n_bins=None, bin_size=MAGNITUDE_BIN_SIZE):
+    """
+    Histogram cell of every event's magnitude within its own spatial bin.
+
+    Cells use the same edges as magnitude_entropy (np.arange from the bin's minimum
+    magnitude in steps of bin_size), so the 2D histogram in bin_magnitude_metrics
+    matches a per-bin np.histogram. Events np.histogram would drop get -1.
+    """
+    bin_ids = np.asarray(bin_ids)
+    mags = np.asarray(mags, dtype=np.float64)
+    cells = np.full(len(mags), -1, dtype=np.int64)
+    valid = bin_ids >= 0
+    if not valid.any():
+        return cells
+    bin_ids, mags = bin_ids[valid], mags[valid]
+    n_bins = int(bin_ids.max()) + 1 if n_bins is None else n_bins
+
+    mag_min, mag_max = _group_min_max(bin_ids, mags, n_bins)
+    start = mag_min[bin_ids]
+    # Number of histogram cells per bin: len(np.arange(min, max + bin_size, bin_size)) - 1
+    n_cells = (np.ceil((mag_max + bin_size - mag_min) / bin_size)[bin_ids] - 1).astype(np.int64)
+    # np.arange steps by the rounded difference of its first two values
+    step = (start + bin_size) - start
+
+    # Nearest cell by arithmetic, then corrected against the actual edges start + k * step
+    cell = np.floor((mags - start) / step).astype(np.int64)
+    cell -= mags < start + cell * step
+    cell += mags >= start + (cell + 1) * step
+
+    # np.histogram puts values equal to the last edge into the last cell and drops larger ones
+    cell = np.where(mags == start + n_cells * step, n_cells - 1, cell)
+    cells[valid] = np.where((cell >= 0) & (cell < n_cells), cell, -1)
+    return cells
+
+
+def bin_magnitude_metrics(bin_ids, mags, mag_bin_ids, n_bins=None):
+    """
+    Counts, Mmax, magnitude variance and magnitude entropy for all bins in one pass.
+
+    Args:
+        bin_ids: Spatial bin of every event (events with -1 are ignored)
+        mags: Magnitude of every event
+        mag_bin_ids: Magnitude histogram cell of every event (see magnitude_bin_ids)
+        n_bins: Number of spatial bins (default: max bin id + 1)
+
+    Returns:
+        Dict of per-bin arrays: count, mmax (nan if empty), variance (ddof=1, 0 for a
+        single event), entropy (bits, 0 for fewer than two events) and the 2D histogram
+    """
+    bin_ids = np.asarray(bin_ids)
+    mags = np.asarray(mags, dtype=np.float64)
+    mag_bin_ids = np.asarray(mag_bin_ids)
+
+    valid = bin_ids >= 0
+    bin_ids, mags, mag_bin_ids = bin_ids[valid], mags[valid], mag_bin_ids[valid]
+    if n_bins is None:
+        n_bins = int(bin_ids.max()) + 1 if len(bin_ids) else 0
+
+    count = np.bincount(bin_ids, minlength=n_bins)
+    safe_count = np.maximum(count, 1)
+
+    _, mmax = _group_min_max(bin_ids, mags, n_bins)
+    mmax[count == 0] = np.nan
+
+    # Two-pass variance: mean first, then squared deviations
+    mean = np.bincount(bin_ids, weights=mags, minlength=n_bins) / safe_count
+    squares = np.bincount(bin_ids, weights=(mags - mean[bin_ids]) ** 2, minlength=n_bins)
+    variance = np.where(count > 1, squares / np.maximum(count - 1, 1), 0.0)
+
+    # 2D (bin, magnitude cell) histogram
+    in_hist = mag_bin_ids >= 0
+    n_cells = int(mag_bin_ids.max()) + 1 if in_hist.any() else 1
+    hist = np.bincount(
+        bin_ids[in_hist] * n_cells + mag_bin_ids[in_hist], minlength=n_bins * n_cells
+    ).reshape(n_bins, n_cells)
+
+    totals = hist.sum(axis=1, keepdims=True)
+    probs = hist / np.maximum(totals, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(probs > 0, probs * np.log2(probs), 0.0)
+    entropy = np.where(count >= 2, -terms.sum(axis=1), 0.0)
+
+    return {
+        'count': count,
+        'mmax': mmax,
+        'variance': variance,
+        'entropy': entropy,
+        'histogram': hist
+    }
+
+
+def uniform_cell_ids(lons, lats, step=0.5):
+    """
+    Cell of every event on a uniform grid of step degrees from the catalog's minimum
+    corner (cells [edge[i], edge[i+1]) as in the validation baseline), -1 outside.
+    """
+    lons = np.asarray(lons)
+    lats = np.asarray(lats)
+    lon_edges = np.arange(lons.min(), lons.max() + step, step)
+    lat_edges = np.arange(lats.min(), lats.max() + step, step)
+
+    lon_idx = np.searchsorted(lon_edges, lons, side='right') - 1
+    lat_idx = np.searchsorted(lat_edges, lats, side='right') - 1
+    n_lat = len(lat_edges) - 1
+    valid = (lon_idx >= 0) & (lon_idx < len(lon_edges) - 1) & (lat_idx >= 0) & (lat_idx < n_lat)
+    return np.where(valid, lon_idx * n_lat + lat_idx, -1)
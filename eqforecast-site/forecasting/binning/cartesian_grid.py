@@ -2,7 +2,18 @@ import numpy as np
 import pandas as pd
 from csep.core.catalogs import CSEPCatalog
 from csep.core.regions import CartesianGrid2D
-from csep.utils.time_utils import datetime_to_utc_epoch
+
+def cell_indices(coords, cell_min, cell_max):
+    """
+    Cell index of each coordinate for sorted cells [cell_min[i], cell_max[i]), -1 outside all cells.
+
+    The last cell starting at or before a coordinate is the only one that can hold it,
+    so one searchsorted replaces a mask per cell.
+    """
+    idx = np.searchsorted(cell_min, coords, side='right') - 1
+    inside = idx >= 0
+    inside[inside] = coords[inside] < cell_max[idx[inside]]
+    return np.where(inside, idx, -1)
 
 def apply_cartesian(catalog, n_lat=3, n_lon=3):
     # --- Region bounds ---
@@ -18,22 +29,22 @@ def apply_cartesian(catalog, n_lat=3, n_lon=3):
     # --- Compute bin centers ---
     lon_centers = lon_edges[:-1] + dh_lon / 2
     lat_centers = lat_edges[:-1] + dh_lat / 2
-    lon_mesh, lat_mesh = np.meshgrid(lon_centers, lat_centers)
-    origins = np.column_stack((lon_mesh.ravel(), lat_mesh.ravel()))
 
     # --- Filter original catalog ---
     lons = catalog.get_longitudes()
     lats = catalog.get_latitudes()
 
-    mask = np.full(len(lons), False)
-    for lon_c, lat_c in origins:
-        in_lon = (lons >= lon_c - dh_lon / 2) & (lons < lon_c + dh_lon / 2)
-        in_lat = (lats >= lat_c - dh_lat / 2) & (lats < lat_c + dh_lat / 2)
-        mask |= (in_lon & in_lat)
+    # Cell index per axis (same half-open cell limits as center -/+ half width)
+    lon_idx = cell_indices(lons, lon_centers - dh_lon / 2, lon_centers + dh_lon / 2)
+    lat_idx = cell_indices(lats, lat_centers - dh_lat / 2, lat_centers + dh_lat / 2)
+    mask = (lon_idx >= 0) & (lat_idx >= 0)
+
+    # Cell ids follow the order of the returned bounds (longitude-major)
+    cell_ids = lon_idx[mask] * n_lat + lat_idx[mask]
 
     filtered_mags = catalog.get_magnitudes()[mask]
     filtered_depths = catalog.get_depths()[mask] if catalog.get_depths() is not None else np.full(np.sum(mask), np.nan)
-    filtered_times = [datetime_to_utc_epoch(dt) for dt in np.array(catalog.get_datetimes())[mask]]
+    filtered_times = catalog.get_epoch_times()[mask]
 
     df = pd.DataFrame({
         'id': np.arange(np.sum(mask)),
@@ -49,12 +60,10 @@ def apply_cartesian(catalog, n_lat=3, n_lon=3):
     filtered_catalog = CSEPCatalog.from_dataframe(df, region=dummy_region)
 
     # Bin boundaries for visualization
-    bounds = []
-    for lon_min in lon_edges[:-1]:
-        for lat_min in lat_edges[:-1]:
-            bounds.append((
-                lon_min, lon_min + dh_lon,
-                lat_min, lat_min + dh_lat
-            ))
-
-    return filtered_catalog, dummy_region, bounds
+    bounds = [
+        (lon_min, lon_min + dh_lon, lat_min, lat_min + dh_lat)
+        for lon_min in lon_edges[:-1]
+        for lat_min in lat_edges[:-1]
+    ]
+
+    return filtered_catalog, dummy_region, bounds, cell_ids
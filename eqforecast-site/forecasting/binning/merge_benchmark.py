@@ -0,0 +1,93 @@
+# merge_benchmark.py
+#
+# Run time of the quadtree merge planner against leaf count, for max_depth 3-7.
+#   python binning/merge_benchmark.py [--catalog data/eq_catalog.csv]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from binning.quadtree import build_leaf_bounds, enhanced_merge_adjacent_bins, DEFAULT_MERGE_WORK_BUDGET
+from binning.bin_lookup import CountOracle
+
+CUSTOM_BOUNDS = (116.3, 129.0, 2.0, 22.0)  # same region as EarthquakeProcessor
+
+
+def synthetic_catalog(n_events=200_000, seed=42):
+    """Clustered events (a few dense zones over a sparse background)."""
+    rng = np.random.default_rng(seed)
+    n_background = n_events // 4
+    centers = rng.uniform([118.0, 4.0], [127.0, 20.0], size=(12, 2))
+    cluster = rng.integers(0, len(centers), n_events - n_background)
+    clustered = centers[cluster] + rng.normal(0.0, 0.6, size=(len(cluster), 2))
+    background = rng.uniform([CUSTOM_BOUNDS[0], CUSTOM_BOUNDS[2]], [CUSTOM_BOUNDS[1], CUSTOM_BOUNDS[3]],
+                             size=(n_background, 2))
+    events = np.vstack([clustered, background])
+    return events[:, 0], events[:, 1]
+
+
+def load_catalog_coordinates(path):
+    catalog = pd.read_csv(path, encoding="utf-8-sig")
+    catalog = catalog.dropna(subset=["N_Lat", "E_Long"])
+    return catalog["E_Long"].to_numpy(), catalog["N_Lat"].to_numpy()
+
+
+def run_benchmark(lons, lats, depths=range(3, 8), min_events=20, threshold=50, max_bin_size=40.0,
+                  work_budget=DEFAULT_MERGE_WORK_BUDGET):
+    min_lon, max_lon, min_lat, max_lat = CUSTOM_BOUNDS
+    mask = (lons >= min_lon) & (lons < max_lon) & (lats >= min_lat) & (lats < max_lat)
+    lons, lats = lons[mask], lats[mask]
+
+    rows = []
+    for max_depth in depths:
+        leaves = build_leaf_bounds(CUSTOM_BOUNDS, lons, lats, max_depth, min_events)
+        oracle = CountOracle(leaves, lons, lats)
+        low = sum(oracle.count(b) < threshold for b in leaves)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            merged = enhanced_merge_adjacent_bins(
+                leaves, lons, lats, threshold=threshold, max_bin_size=max_bin_size,
+                count_oracle=oracle, work_budget=work_budget
+            )
+        elapsed = time.perf_counter() - start
+
+        rows.append({
+            'max_depth': max_depth,
+            'leaves': len(leaves),
+            'below_threshold': low,
+            'merged_bins': len(merged),
+            'still_below': sum(oracle.count(b) < threshold for b in merged),
+            'seconds': round(elapsed, 3)
+        })
+        print(f"max_depth={max_depth}: {len(leaves)} leaves ({low} below {threshold}) -> "
+              f"{len(merged)} bins in {elapsed:.3f}s")
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the quadtree merge planner")
+    parser.add_argument('--catalog', type=str, default=None, help='Raw catalog CSV (default: synthetic events)')
+    parser.add_argument('--n_events', type=int, default=200_000, help='Synthetic catalog size')
+    parser.add_argument('--min_events', type=int, default=20)
+    parser.add_argument('--threshold', type=int, default=50)
+    parser.add_argument('--work_budget', type=int, default=DEFAULT_MERGE_WORK_BUDGET)
+    args = parser.parse_args()
+
+    if args.catalog:
+        lons, lats = load_catalog_coordinates(args.catalog)
+    else:
+        lons, lats = synthetic_catalog(args.n_events)
+
+    results = run_benchmark(lons, lats, min_events=args.min_events, threshold=args.threshold,
+                            work_budget=args.work_budget)
+    print("\n" + results.to_string(index=False))
@@ -1,13 +1,21 @@
+import bisect
+import hashlib
+import json
+import math
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from csep.core.catalogs import CSEPCatalog
-from csep.utils.time_utils import datetime_to_utc_epoch
 from csep.core.regions import CartesianGrid2D
+from pathlib import Path
 from typing import List, Tuple
 
+from binning.quadtree_arrays import build_quadtree_arrays
+from binning.bin_lookup import BinLookup, CountOracle
+from binning.rect_index import RectIndex
+
 class QuadtreeNode:
     def __init__(self, bounds, depth=0):
         self.bounds = bounds  # (min_lon, max_lon, min_lat, max_lat)
@@ -48,6 +56,15 @@ def build_quadtree_recursive(node, lons, lats, max_depth=4, min_events=10):
     for child in node.children:
         build_quadtree_recursive(child, lons, lats, max_depth, min_events)
 
+def build_leaf_bounds(root_bounds, lons, lats, max_depth=4, min_events=10, use_array_builder=True):
+    """Build the quadtree over root_bounds and return its leaf bounds (depth-first order)."""
+    if use_array_builder:
+        return build_quadtree_arrays(lons, lats, root_bounds, max_depth, min_events).leaf_bounds()
+
+    root = QuadtreeNode(root_bounds)
+    build_quadtree_recursive(root, lons, lats, max_depth, min_events)
+    return extract_leaf_bounds(root)
+
 def extract_leaf_bounds(node):
     """Extract bounds from all leaf nodes (non-overlapping)."""
     if node.is_leaf:
@@ -89,7 +106,99 @@ def are_bins_adjacent(bin1, bin2, tolerance=1e-6):
     
     return False
 
-def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
+class BinAdjacencyGraph:
+    """
+    Adjacency graph of bins (are_bins_adjacent), maintained incrementally as bins merge.
+    
+    Edge coordinates are hashed into buckets of width `tolerance`, so the candidates
+    for a bin are only the bins whose opposite edge lies on the same line. Each line
+    keeps its bins sorted along the line, so only the run overlapping the bin's
+    extent is visited. Neighbour lookups then cost O(degree) instead of a scan over
+    all bins.
+    """
+    
+    # (side of this bin, opposite side of a touching bin): max_lon/min_lon, min_lon/max_lon, ...
+    SIDE_PAIRS = ((1, 0), (0, 1), (3, 2), (2, 3))
+    # Extent along the line for each side: lon edges lie on lat intervals and vice versa
+    ALONG = {0: (2, 3), 1: (2, 3), 2: (0, 1), 3: (0, 1)}
+    
+    def __init__(self, bounds, tolerance=1e-6):
+        self.tolerance = tolerance
+        self.neighbors_of = {}
+        self.order = {}  # insertion order, i.e. the position in a working list with removes + appends
+        self._next_order = 0
+        self._lines = [{} for _ in range(4)]  # side -> bucket -> [sorted (start, bin) entries, max length]
+        
+        for b in bounds:
+            self.add(b)
+    
+    def __contains__(self, b):
+        return b in self.neighbors_of
+    
+    def __len__(self):
+        return len(self.neighbors_of)
+    
+    def _bucket(self, value):
+        return math.floor(value / self.tolerance)
+    
+    def _candidates(self, b):
+        tol = self.tolerance
+        for side, opposite in self.SIDE_PAIRS:
+            lo, hi = self.ALONG[side]
+            key = self._bucket(b[side])
+            for k in (key - 1, key, key + 1):
+                line = self._lines[opposite].get(k)
+                if line is None:
+                    continue
+                entries, max_length = line
+                i = bisect.bisect_left(entries, (b[lo] - tol - max_length,))
+                while i < len(entries) and entries[i][0] < b[hi] + tol:
+                    yield entries[i][1]
+                    i += 1
+    
+    def add(self, b):
+        """Add a bin and link it to every adjacent bin already in the graph."""
+        if b in self.neighbors_of:
+            return
+        
+        neighbors = {c for c in self._candidates(b) if c != b and are_bins_adjacent(b, c, self.tolerance)}
+        self.neighbors_of[b] = neighbors
+        for c in neighbors:
+            self.neighbors_of[c].add(b)
+        
+        for side in range(4):
+            lo, hi = self.ALONG[side]
+            line = self._lines[side].setdefault(self._bucket(b[side]), [[], 0.0])
+            bisect.insort(line[0], (b[lo], b))
+            line[1] = max(line[1], b[hi] - b[lo])
+        
+        self.order[b] = self._next_order
+        self._next_order += 1
+    
+    def remove(self, b):
+        """Remove a bin and its links."""
+        for c in self.neighbors_of.pop(b):
+            self.neighbors_of[c].discard(b)
+        for side in range(4):
+            entries = self._lines[side][self._bucket(b[side])][0]
+            entries.pop(bisect.bisect_left(entries, (b[self.ALONG[side][0]], b)))
+        del self.order[b]
+    
+    def merge(self, bins, merged_bin):
+        """Replace merged bins by their merged bounding box (appended last in order)."""
+        for b in bins:
+            if b in self.neighbors_of:
+                self.remove(b)
+        self.add(merged_bin)
+    
+    def neighbors(self, b):
+        """Adjacent bins in working-list order."""
+        return sorted(self.neighbors_of[b], key=self.order.__getitem__)
+    
+    def are_adjacent(self, b1, b2):
+        return b2 in self.neighbors_of.get(b1, ())
+
+def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0, count_oracle=None):
     """
     Merge low-count bins with adjacent neighbors while maintaining complete coverage.
     
@@ -98,6 +207,7 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
         lons, lats: Earthquake coordinates
         threshold: Event count threshold below which bins are merged
         max_bin_size: Maximum size for any bin dimension
+        count_oracle: Optional CountOracle over these events (built from bounds if omitted)
         
     Returns:
         List of merged bounds
@@ -107,8 +217,9 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
     
     print(f"🔄 Starting merge process with {len(bounds)} bins, threshold: {threshold}")
     
-    # Count events in each bin
-    bin_counts = {b: count_events_in_bin(b, lons, lats) for b in bounds}
+    # Count events in each bin (prefix-sum table, built once)
+    count_oracle = count_oracle or CountOracle(bounds, lons, lats)
+    bin_counts = {b: count_oracle.count(b) for b in bounds}
     
     # Find bins below threshold
     low_count_bins = [b for b, count in bin_counts.items() if count < threshold]
@@ -125,6 +236,7 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
     # Create a copy to work with
     working_bounds = bounds.copy()
     bins_to_remove = set()
+    adjacency = BinAdjacencyGraph(working_bounds)
     
     # Iterate until no more merges are possible
     iteration = 0
@@ -137,25 +249,24 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
         merged_this_iteration = False
         
         for low_bin in low_count_bins[:]:  # Copy list to avoid modification during iteration
-            if low_bin not in working_bounds or low_bin in bins_to_remove:
+            if low_bin not in adjacency or low_bin in bins_to_remove:
                 continue
             
             # Find best adjacent neighbor to merge with
             best_neighbor = None
             best_score = float('inf')
             
-            for other_bin in working_bounds:
-                if other_bin == low_bin or other_bin in bins_to_remove:
+            for other_bin in adjacency.neighbors(low_bin):
+                if other_bin in bins_to_remove:
                     continue
                 
-                if are_bins_adjacent(low_bin, other_bin):
-                    # Score based on count (prefer merging with lower count bins)
-                    other_count = bin_counts[other_bin]
-                    score = other_count
-                    
-                    if score < best_score:
-                        best_score = score
-                        best_neighbor = other_bin
+                # Score based on count (prefer merging with lower count bins)
+                other_count = bin_counts[other_bin]
+                score = other_count
+                
+                if score < best_score:
+                    best_score = score
+                    best_neighbor = other_bin
             
             if best_neighbor is not None:
                 # Create merged bin
@@ -190,6 +301,7 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
                 working_bounds.remove(low_bin)
                 working_bounds.remove(best_neighbor)
                 working_bounds.append(merged_bin)
+                adjacency.merge([low_bin, best_neighbor], merged_bin)
                 
                 # Mark for removal
                 bins_to_remove.add(best_neighbor)
@@ -225,11 +337,9 @@ def merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
     # Verify no overlaps in final result (should be clean now)
     print("🔍 Verifying no overlaps in final bins...")
     overlaps_found = 0
-    for i, b1 in enumerate(final_bounds):
-        for j, b2 in enumerate(final_bounds[i+1:], i+1):
-            if has_overlap(b1, b2):
-                overlaps_found += 1
-                print(f"  ❌ OVERLAP FOUND: Bin {i} {b1} overlaps with Bin {j} {b2}")
+    for i, j in RectIndex(final_bounds).overlapping_pairs():
+        overlaps_found += 1
+        print(f"  ❌ OVERLAP FOUND: Bin {i} {final_bounds[i]} overlaps with Bin {j} {final_bounds[j]}")
     
     if overlaps_found == 0:
         print("✅ No overlaps detected in final bins")
@@ -268,10 +378,12 @@ def restore_coverage(original_bounds, merged_bounds, lons, lats):
     
     # Find bins that were lost
     lost_bins = []
+    merged_set = set(merged_bounds)
+    merged_index = RectIndex(merged_bounds)
     for orig_bin in original_bounds:
-        if orig_bin not in merged_bounds:
+        if orig_bin not in merged_set:
             # Check if this bin's area is covered by merged bins
-            if not is_bin_covered(orig_bin, merged_bounds):
+            if len(merged_index.containing(orig_bin)) == 0:
                 lost_bins.append(orig_bin)
     
     if lost_bins:
@@ -319,22 +431,22 @@ def remove_overlapping_bins(bounds):
     print("🧹 Cleaning overlapping bins...")
     clean_bounds = []
     
-    for bound in bounds:
-        is_overlapping = False
-        
-        for existing_bound in clean_bounds:
-            if has_overlap(bound, existing_bound):
-                is_overlapping = True
-                print(f"  🗑️  Removing overlapping bin: {bound}")
-                break
-        
-        if not is_overlapping:
+    # A bin is kept unless it overlaps an earlier kept bin
+    index = RectIndex(bounds)
+    kept = np.zeros(len(bounds), dtype=bool)
+    for i, bound in enumerate(bounds):
+        earlier = index.intersecting(bound)
+        if kept[earlier[earlier < i]].any():
+            print(f"  🗑️  Removing overlapping bin: {bound}")
+        else:
+            kept[i] = True
             clean_bounds.append(bound)
     
     print(f"  📊 Cleaned: {len(bounds)} → {len(clean_bounds)} bins")
     return clean_bounds
 
-def apply_quadtree_binning(catalog, max_depth=4, min_events=10, merge_threshold=None, max_bin_size=10.0):
+def apply_quadtree_binning(catalog, max_depth=4, min_events=10, merge_threshold=None, max_bin_size=10.0,
+                           use_array_builder=True):
     """Apply quadtree binning to catalog and return filtered catalog, region, and bounds."""
     lons = catalog.get_longitudes()
     lats = catalog.get_latitudes()
@@ -346,10 +458,9 @@ def apply_quadtree_binning(catalog, max_depth=4, min_events=10, merge_threshold=
     print(f"📊 Total events: {len(lons)}")
     print(f"🌳 Building quadtree with max_depth={max_depth}, min_events={min_events}")
 
-    root = QuadtreeNode((min_lon, max_lon, min_lat, max_lat))
-    build_quadtree_recursive(root, lons, lats, max_depth, min_events)
-
-    unmerged_bounds = extract_leaf_bounds(root)
+    unmerged_bounds = build_leaf_bounds(
+        (min_lon, max_lon, min_lat, max_lat), lons, lats, max_depth, min_events, use_array_builder
+    )
     print(f"🍃 Extracted {len(unmerged_bounds)} leaf nodes from quadtree")
     
     original_bounds = unmerged_bounds.copy()
@@ -367,17 +478,13 @@ def apply_quadtree_binning(catalog, max_depth=4, min_events=10, merge_threshold=
     else:
         final_bounds = unmerged_bounds
 
-    # Create mask for events in final bins
-    mask = np.full(len(lons), False)
-    for (min_lon, max_lon, min_lat, max_lat) in final_bounds:
-        in_lon = (lons >= min_lon) & (lons < max_lon)
-        in_lat = (lats >= min_lat) & (lats < max_lat)
-        mask |= (in_lon & in_lat)
+    # Create mask for events in final bins (one vectorized lookup)
+    mask = BinLookup(final_bounds).assign(lats, lons) >= 0
 
     # Create filtered DataFrame
     filtered_mags = catalog.get_magnitudes()[mask]
     filtered_depths = catalog.get_depths()[mask] if catalog.get_depths() is not None else np.full(np.sum(mask), np.nan)
-    filtered_times = [datetime_to_utc_epoch(dt) for dt in np.array(catalog.get_datetimes())[mask]]
+    filtered_times = catalog.get_epoch_times()[mask]
 
     df = pd.DataFrame({
         'id': np.arange(np.sum(mask)),
@@ -485,22 +592,63 @@ def plot_quadtree_comparison(original_catalog, unmerged_bounds, merged_bounds,
     plt.show()
     print("✅ Comparison plot completed!")
 
+BIN_SCHEME_VERSION = 1
+BIN_SCHEME_FILE = "bin_scheme.json"
+
+def coordinates_hash(lats, lons):
+    """Content hash of the event coordinates a bin scheme was built from."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(lats, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lons, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
 class QuadtreeBinner:
     """Wrapper class for quadtree binning functionality."""
     
     def __init__(self, max_depth: int = 4, min_events: int = 10, merge_threshold: int = 50, max_bin_size: float = 12.0, 
-                 custom_bounds: Tuple[float, float, float, float] = None):
+                 custom_bounds: Tuple[float, float, float, float] = None, use_array_builder: bool = True):
         self.max_depth = max_depth
         self.min_events = min_events
         self.merge_threshold = merge_threshold
         self.max_bin_size = max_bin_size
         self.custom_bounds = custom_bounds  # (min_lon, max_lon, min_lat, max_lat)
+        self.use_array_builder = use_array_builder  # flat-array builder instead of QuadtreeNode recursion
         self.bounds = None
         self.unmerged_bounds = None
+        self.catalog_hash = None  # hash of the coordinates the bins were built from
+        self.bin_ids = None  # id of each bin in self.bounds; None means positional (0..n-1)
+        self._bin_lookup = None
+        self._rect_index = None
         
+    def _get_bin_lookup(self) -> BinLookup:
+        """Lookup structure for the current final bins, rebuilt whenever self.bounds is replaced."""
+        if self._bin_lookup is None or self._bin_lookup.bounds is not self.bounds:
+            self._bin_lookup = BinLookup(self.bounds)
+        return self._bin_lookup
+    
+    def get_rect_index(self) -> RectIndex:
+        """Spatial index over the current final bins, rebuilt whenever self.bounds is replaced."""
+        if self.bounds is None:
+            raise ValueError("No bins available. Run assign_bins() first.")
+        if self._rect_index is None or self._rect_index.bounds is not self.bounds:
+            self._rect_index = RectIndex(self.bounds)
+        return self._rect_index
+    
+    def query_bins(self, bounds: Tuple[float, float, float, float]) -> List[int]:
+        """Ids of the bins overlapping a (min_lon, max_lon, min_lat, max_lat) region, e.g. a map view."""
+        ids = self.get_bin_ids()
+        return [ids[j] for j in self.get_rect_index().intersecting(bounds)]
+    
+    def bins_at(self, lon: float, lat: float) -> List[int]:
+        """Ids of the bins containing a point."""
+        ids = self.get_bin_ids()
+        return [ids[j] for j in self.get_rect_index().containing_point(lon, lat)]
+    
     def assign_bins(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
         """Assign bin IDs to earthquake locations using non-overlapping quadtree."""
         print("[TOOL] Creating non-overlapping quadtree bins...")
+        self.catalog_hash = coordinates_hash(lats, lons)
+        self.bin_ids = None
         
         if self.custom_bounds:
             print(f"[TOOL] Using custom bounds: {self.custom_bounds}")
@@ -517,9 +665,10 @@ class QuadtreeBinner:
             print(f"🌍 Custom bounds: {min_lon:.2f}° to {max_lon:.2f}° lon, {min_lat:.2f}° to {max_lat:.2f}° lat")
             print(f"📊 Filtered events: {len(filtered_lons)} (from {len(lons)} total)")
             
-            root = QuadtreeNode((min_lon, max_lon, min_lat, max_lat))
-            build_quadtree_recursive(root, filtered_lons, filtered_lats, self.max_depth, self.min_events)
-            unmerged_bounds = extract_leaf_bounds(root)
+            unmerged_bounds = build_leaf_bounds(
+                (min_lon, max_lon, min_lat, max_lat), filtered_lons, filtered_lats,
+                self.max_depth, self.min_events, self.use_array_builder
+            )
             self.unmerged_bounds = unmerged_bounds
             print(f"🍃 Extracted {len(unmerged_bounds)} leaf nodes from quadtree with custom bounds")
         else:
@@ -529,10 +678,10 @@ class QuadtreeBinner:
             print(f"🌍 Spatial bounds: {min_lon:.2f}° to {max_lon:.2f}° lon, {min_lat:.2f}° to {max_lat:.2f}° lat")
             print(f"📊 Total events: {len(lons)}")
             
-            root = QuadtreeNode((min_lon, max_lon, min_lat, max_lat))
-            build_quadtree_recursive(root, lons, lats, self.max_depth, self.min_events)
-        
-            unmerged_bounds = extract_leaf_bounds(root)
+            unmerged_bounds = build_leaf_bounds(
+                (min_lon, max_lon, min_lat, max_lat), lons, lats,
+                self.max_depth, self.min_events, self.use_array_builder
+            )
             self.unmerged_bounds = unmerged_bounds
         
             print(f"🍃 Extracted {len(unmerged_bounds)} leaf nodes from quadtree")
@@ -544,9 +693,13 @@ class QuadtreeBinner:
             print(f"Before merging: {len(unmerged_bounds)} bins")
             print(f"⚠️  Note: Will preserve complete coverage of catalog area")
             
+            # One prefix-sum table answers every count during merging and verification
+            count_oracle = CountOracle(unmerged_bounds, filtered_lons, filtered_lats)
+            
             # Use enhanced merging that allows L-shaped and irregular merges
             merged_bounds = enhanced_merge_adjacent_bins(
-                unmerged_bounds, filtered_lons, filtered_lats, threshold=self.merge_threshold, max_bin_size=self.max_bin_size
+                unmerged_bounds, filtered_lons, filtered_lats, threshold=self.merge_threshold, max_bin_size=self.max_bin_size,
+                count_oracle=count_oracle
             )
             
             print(f"After merging: {len(merged_bounds)} bins")
@@ -556,7 +709,7 @@ class QuadtreeBinner:
             print("\n🔍 Verifying all bins meet threshold...")
             all_meet_threshold = True
             for i, b in enumerate(merged_bounds):
-                count = count_events_in_bin(b, filtered_lons, filtered_lats)
+                count = count_oracle.count(b)
                 width = b[1] - b[0]
                 height = b[3] - b[2]
                 
@@ -574,23 +727,18 @@ class QuadtreeBinner:
             print("⚠️  No merging applied")
             self.bounds = unmerged_bounds
         
-        # Assign bin IDs to original data using the same mask
-        bin_ids = np.full(len(lons), -1, dtype=int)
-        
+        # Assign bin IDs to original data in one vectorized lookup
         print(f"\nAssigning earthquakes to {len(self.bounds)} non-overlapping bins:")
         
+        bin_ids = self._get_bin_lookup().assign(lats, lons)
         # Only assign to events within the custom bounds
-        for bin_id, (min_lon, max_lon, min_lat, max_lat) in enumerate(self.bounds):
-            bin_mask = (
-                (lons >= min_lon) & (lons < max_lon) &
-                (lats >= min_lat) & (lats < max_lat)
-            )
-            # Only assign to events that are also in the filtered mask
-            if self.custom_bounds:
-                bin_mask = bin_mask & mask
-            count = np.sum(bin_mask)
-            bin_ids[bin_mask] = bin_id
-            print(f"  Bin {bin_id}: {count} earthquakes")
+        if self.custom_bounds:
+            bin_ids[~mask] = -1
+        
+        bin_sizes = np.bincount(bin_ids[bin_ids >= 0], minlength=len(self.bounds))
+        if len(bin_sizes) > 0:
+            print(f"  {int(bin_sizes.sum())} earthquakes assigned, "
+                  f"{int(bin_sizes.min())}-{int(bin_sizes.max())} per bin")
         
         unassigned = np.sum(bin_ids == -1)
         if unassigned > 0:
@@ -599,7 +747,28 @@ class QuadtreeBinner:
                 print(f"     (This includes {np.sum(~mask)} events outside custom bounds)")
             
         return bin_ids
-    
+
+    def assign_existing_bins(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Assign bin IDs using the already-built bins, without rebuilding the quadtree."""
+        if self.bounds is None:
+            raise ValueError("No bins available. Run assign_bins() first.")
+
+        # Same tie-breaking as assign_bins: later bins overwrite earlier ones
+        bin_ids = self._get_bin_lookup().assign(lats, lons)
+        if self.bin_ids is not None:
+            ids = np.asarray(self.bin_ids)
+            bin_ids = np.where(bin_ids >= 0, ids[np.maximum(bin_ids, 0)], -1)
+
+        if self.custom_bounds:
+            min_lon, max_lon, min_lat, max_lat = self.custom_bounds
+            mask = (
+                (lons >= min_lon) & (lons < max_lon) &
+                (lats >= min_lat) & (lats < max_lat)
+            )
+            bin_ids[~mask] = -1
+
+        return bin_ids
+
     def get_bin_bounds(self) -> List[Tuple]:
         return self.bounds if self.bounds is not None else []
     
@@ -609,6 +778,224 @@ class QuadtreeBinner:
     def get_bin_count(self) -> int:
         return len(self.bounds) if self.bounds is not None else 0
     
+    def get_bin_ids(self) -> List[int]:
+        if self.bin_ids is not None:
+            return list(self.bin_ids)
+        return list(range(self.get_bin_count()))
+    
+    def update_bins(self, lats: np.ndarray, lons: np.ndarray, new_lats: np.ndarray, new_lons: np.ndarray,
+                    stable_ids: bool = False) -> np.ndarray:
+        """
+        Insert newly arrived events into the existing quadtree instead of rebuilding it.
+        
+        Only leaves whose count now exceeds min_events are split (down to max_depth),
+        which gives the same leaves as a rebuild over old + new events. Merging is
+        re-run only for the final bins covering a split leaf and their neighbours in
+        the adjacency graph; every other bin is kept as it is.
+        
+        Args:
+            lats, lons: Coordinates the current scheme was built from (as passed to assign_bins)
+            new_lats, new_lons: Coordinates of the new events
+            stable_ids: Keep the ids of all unchanged bins and give replacement bins new ids
+                (default: renumber all bins positionally)
+            
+        Returns:
+            Bin IDs of the new events
+        """
+        if self.bounds is None:
+            raise ValueError("No bins available. Run assign_bins() first.")
+        if self.catalog_hash is not None and coordinates_hash(lats, lons) != self.catalog_hash:
+            raise ValueError("Coordinates do not match the catalog the bin scheme was built from")
+        
+        all_lats = np.concatenate([np.asarray(lats), np.asarray(new_lats)])
+        all_lons = np.concatenate([np.asarray(lons), np.asarray(new_lons)])
+        
+        # The leaves tile the quadtree root, so its bounds are the extent of the leaves
+        leaves = list(self.get_unmerged_bounds())
+        root = (
+            min(b[0] for b in leaves), max(b[1] for b in leaves),
+            min(b[2] for b in leaves), max(b[3] for b in leaves)
+        )
+        mask = (
+            (all_lons >= root[0]) & (all_lons < root[1]) &
+            (all_lats >= root[2]) & (all_lats < root[3])
+        )
+        event_lons, event_lats = all_lons[mask], all_lats[mask]
+        outside = int(np.sum(~mask[len(lats):]))
+        if outside > 0:
+            print(f"  ⚠️  {outside} new events lie outside the quadtree root (rebuild with assign_bins to include them)")
+
+        # Counts only grow, so nodes split before stay split: only leaves can cross min_events
+        leaf_ids = BinLookup(leaves).assign(event_lats, event_lons)
+        leaf_counts = np.bincount(leaf_ids[leaf_ids >= 0], minlength=len(leaves))
+        root_width = root[1] - root[0]
+        
+        new_leaves = []
+        split_leaves = []
+        for i, leaf in enumerate(leaves):
+            depth = int(round(math.log2(root_width / (leaf[1] - leaf[0]))))
+            if leaf_counts[i] <= self.min_events or depth >= self.max_depth:
+                new_leaves.append(leaf)
+                continue
+            idx = leaf_ids == i
+            sub_leaves = build_leaf_bounds(
+                leaf, event_lons[idx], event_lats[idx],
+                self.max_depth - depth, self.min_events, self.use_array_builder
+            )
+            new_leaves.extend(sub_leaves)
+            split_leaves.append(leaf)
+        
+        print(f"🌱 Inserted {len(new_lats)} new events: split {len(split_leaves)} leaves, "
+              f"{len(leaves)} → {len(new_leaves)} leaf nodes")
+        
+        old_bounds = list(self.bounds)
+        old_ids = self.get_bin_ids()
+        self.unmerged_bounds = new_leaves
+        self.catalog_hash = coordinates_hash(all_lats, all_lons)
+        
+        if split_leaves:
+            # Final bins covering a split leaf are dissolved back into their leaves
+            old_index = RectIndex(old_bounds)
+            dissolved = {int(j) for leaf in split_leaves for j in old_index.intersecting(leaf)}
+            region = set(dissolved)
+            if self.merge_threshold is not None:
+                # Their adjacent bins are dissolved too and take part in the local re-merge
+                adjacency = BinAdjacencyGraph(old_bounds)
+                position = {b: j for j, b in enumerate(old_bounds)}
+                for j in dissolved:
+                    region.update(position[n] for n in adjacency.neighbors(old_bounds[j]))
+            
+            # Re-merging already merged bins alongside leaves can produce overlapping
+            # bounding boxes, so the whole region is re-merged from its leaves. Any other
+            # bin reaching into those leaves joins the region, so no kept bin overlaps them
+            leaf_index = RectIndex(new_leaves)
+            piece_ids = set()
+            frontier = set(region)
+            while frontier:
+                touched = {int(i) for j in frontier for i in leaf_index.intersecting(old_bounds[j])}
+                touched -= piece_ids
+                piece_ids |= touched
+                frontier = {int(j) for i in touched for j in old_index.intersecting(new_leaves[i])} - region
+                region |= frontier
+            pieces = [new_leaves[i] for i in sorted(piece_ids)]
+            
+            if self.merge_threshold is not None:
+                print(f"🔄 Re-merging {len(region)} affected bins ({len(pieces)} pieces)")
+                local_bounds = enhanced_merge_adjacent_bins(
+                    pieces, event_lons, event_lats, threshold=self.merge_threshold,
+                    max_bin_size=self.max_bin_size, count_oracle=CountOracle(pieces, event_lons, event_lats)
+                )
+                local_bounds = remove_overlapping_bins(local_bounds)
+                local_bounds = restore_coverage(pieces, local_bounds, event_lons, event_lats)
+            else:
+                local_bounds = pieces
+
+            kept = [j for j in range(len(old_bounds)) if j not in region]
+
+            # A merged bounding box must not reach into the bins kept outside the region;
+            # such bins fall back to the pieces they were merged from
+            kept_index = RectIndex([old_bounds[j] for j in kept])
+            leaking = [b for b in local_bounds if len(kept_index.intersecting(b))]
+            if leaking:
+                local_bounds = [b for b in local_bounds if b not in leaking]
+                for b in leaking:
+                    local_bounds.extend(
+                        p for p in pieces
+                        if has_overlap(p, b) and not any(has_overlap(p, c) for c in local_bounds)
+                    )
+                print(f"  ⚠️  {len(leaking)} merged bins would overlap unchanged bins, kept unmerged")
+            self.bounds = [old_bounds[j] for j in kept] + list(local_bounds)
+            
+            if stable_ids:
+                # Bins that came out of the re-merge unchanged keep their id too
+                region_ids = {old_bounds[j]: old_ids[j] for j in region}
+                next_id = max(old_ids, default=-1) + 1
+                ids = [old_ids[j] for j in kept]
+                for b in local_bounds:
+                    if b in region_ids:
+                        ids.append(region_ids.pop(b))
+                    else:
+                        ids.append(next_id)
+                        next_id += 1
+                self.bin_ids = ids
+            else:
+                self.bin_ids = None
+            
+            print(f"🎯 Updated bins: {len(old_bounds)} → {len(self.bounds)} "
+                  f"({len(region)} replaced by {len(local_bounds)})")
+        
+        return self.assign_existing_bins(new_lats, new_lons)
+    
+    def get_params(self) -> dict:
+        """Parameters that define how the bin scheme is built."""
+        return {
+            'max_depth': self.max_depth,
+            'min_events': self.min_events,
+            'merge_threshold': self.merge_threshold,
+            'max_bin_size': self.max_bin_size,
+            'custom_bounds': [float(v) for v in self.custom_bounds] if self.custom_bounds else None
+        }
+    
+    def save(self, path: str, catalog_hash: str = None):
+        """
+        Write the frozen bin scheme (versioned JSON).
+        
+        Args:
+            path: Output file
+            catalog_hash: Hash of the source catalog (default: hash of the coordinates passed to assign_bins)
+        """
+        if self.bounds is None:
+            raise ValueError("No bins available. Run assign_bins() first.")
+        
+        scheme = {
+            'version': BIN_SCHEME_VERSION,
+            'params': self.get_params(),
+            'catalog_hash': catalog_hash or self.catalog_hash,
+            'bin_ids': self.get_bin_ids(),
+            'bounds': [[float(v) for v in b] for b in self.bounds],
+            'unmerged_bounds': [[float(v) for v in b] for b in self.get_unmerged_bounds()]
+        }
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(scheme, f, indent=2)
+        print(f"💾 Bin scheme saved to: {path} ({len(self.bounds)} bins)")
+    
+    @classmethod
+    def load(cls, path: str) -> 'QuadtreeBinner':
+        """
+        Load a frozen bin scheme written by save(); use assign_existing_bins() to assign events.
+        
+        Args:
+            path: Bin scheme file
+            
+        Returns:
+            QuadtreeBinner with its parameters and bins restored
+        """
+        with open(path, 'r') as f:
+            scheme = json.load(f)
+        
+        if scheme.get('version') != BIN_SCHEME_VERSION:
+            raise ValueError(f"Unsupported bin scheme version: {scheme.get('version')}")
+        bin_ids = scheme['bin_ids']
+        if len(bin_ids) != len(scheme['bounds']) or len(set(bin_ids)) != len(bin_ids):
+            raise ValueError("Bin scheme needs one unique bin id per bin")
+        
+        params = scheme['params']
+        binner = cls(
+            max_depth=params['max_depth'],
+            min_events=params['min_events'],
+            merge_threshold=params['merge_threshold'],
+            max_bin_size=params['max_bin_size'],
+            custom_bounds=tuple(params['custom_bounds']) if params['custom_bounds'] else None
+        )
+        binner.bounds = [tuple(b) for b in scheme['bounds']]
+        binner.unmerged_bounds = [tuple(b) for b in scheme['unmerged_bounds']]
+        binner.catalog_hash = scheme.get('catalog_hash')
+        binner.bin_ids = None if bin_ids == list(range(len(bin_ids))) else bin_ids
+        return binner
+    
     def plot_comparison(self, lats: np.ndarray, lons: np.ndarray, save_path: str = None):
         """Plot both unmerged and merged quadtree grids for comparison."""
         if self.unmerged_bounds is None or self.bounds is None:
@@ -690,15 +1077,41 @@ def merge_multiple_bins(bins):
     
     return (min_lon, max_lon, min_lat, max_lat)
 
-def find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size):
+DEFAULT_MERGE_WORK_BUDGET = 200_000
+
+def _forms_rectangle(group, merged_bin, rel_tol=1e-9):
+    """
+    True if the (non-overlapping) bins in group exactly fill their bounding box.
+    
+    Then the merged bin cannot overlap any other non-overlapping bin, which
+    replaces a scan over all bounds.
     """
-    Find groups of bins that can be merged to meet the threshold.
+    merged_area = (merged_bin[1] - merged_bin[0]) * (merged_bin[3] - merged_bin[2])
+    group_area = sum((b[1] - b[0]) * (b[3] - b[2]) for b in group)
+    return abs(merged_area - group_area) <= rel_tol * max(merged_area, 1.0)
+
+def find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size, adjacency=None,
+                          max_group_size=8, work_budget=DEFAULT_MERGE_WORK_BUDGET):
+    """
+    Plan groups of bins that can be merged to meet the threshold.
+    
+    Low-count bins are used as seeds, lowest count first. Each seed grows a
+    connected group over the adjacency graph, one neighbour at a time. It
+    prefers neighbours that keep the group rectangular and bring the total
+    closest to the threshold. Growth stops at the threshold or at
+    max_group_size. The best rectangular snapshot of the group is kept.
+    Every candidate evaluation uses one unit of work_budget. Once the budget
+    is spent, planning stops. The output is deterministic: ties are broken by
+    position in bounds.
         
         Args:
-        bounds: List of all bin bounds
+        bounds: List of all bin bounds (non-overlapping)
         bin_counts: Dictionary mapping bounds to event counts
         threshold: Target event count threshold
         max_bin_size: Maximum bin size constraint
+        adjacency: Optional BinAdjacencyGraph of bounds (built if omitted)
+        max_group_size: Maximum number of bins in one group
+        work_budget: Maximum number of candidate evaluations
             
         Returns:
         List of merge groups (each group is a list of bin bounds)
@@ -709,69 +1122,67 @@ def find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size):
     if not low_count_bins:
         return []
     
+    if adjacency is None:
+        adjacency = BinAdjacencyGraph(bounds)
+    low_set = set(low_count_bins)
+    low_count_bins.sort(key=lambda b: (bin_counts[b], adjacency.order[b]))
+    
     merge_groups = []
     used_bins = set()
+    work = 0
     
-    # Try to find groups of 2-8 bins that can be merged (much more aggressive)
-    for group_size in range(2, 9):  # Try groups of 2, 3, 4, 5, 6, 7, 8 bins
-        for i, bin1 in enumerate(low_count_bins):
-            if bin1 in used_bins:
-                continue
-                
-            # Find all possible groups starting with bin1
-            potential_groups = []
-            
-            def find_groups_recursive(current_group, remaining_bins):
-                if len(current_group) == group_size:
-                    # Check if this group can be merged
-                    if can_merge_multiple_bins(current_group):
-                        total_count = sum(bin_counts[b] for b in current_group)
-                        merged_bin = merge_multiple_bins(current_group)
-                        merged_width = merged_bin[1] - merged_bin[0]
-                        merged_height = merged_bin[3] - merged_bin[2]
-                        
-                        # Check size constraints
-                        if merged_width <= max_bin_size and merged_height <= max_bin_size:
-                            # CRITICAL: Check if merged bin would overlap with any existing bins
-                            would_overlap = False
-                            for existing_bin in bounds:
-                                if existing_bin in current_group or existing_bin in used_bins:
-                                    continue
-                                if has_overlap(merged_bin, existing_bin):
-                                    would_overlap = True
-                                    break
-                            
-                            if not would_overlap:
-                                potential_groups.append((current_group.copy(), total_count))
-                    return
+    for seed in low_count_bins:
+        if seed in used_bins:
+            continue
+        if work >= work_budget:
+            print(f"  ⚠️  Merge planner work budget ({work_budget}) exhausted")
+            break
+        
+        group = [seed]
+        total = bin_counts[seed]
+        merged_bin = seed
+        best = None  # (score, group, merged_bin)
+        
+        while total < threshold and len(group) < max_group_size and work < work_budget:
+            # Frontier: unused low-count bins adjacent to the group
+            frontier = {
+                n for b in group for n in adjacency.neighbors_of[b]
+                if n in low_set and n not in used_bins and n not in group
+            }
+            
+            best_candidate = None
+            for candidate in frontier:
+                work += 1
+                candidate_bin = merge_multiple_bins([merged_bin, candidate])
+                if (candidate_bin[1] - candidate_bin[0] > max_bin_size or
+                        candidate_bin[3] - candidate_bin[2] > max_bin_size):
+                    continue
                 
-                for j, bin2 in enumerate(remaining_bins):
-                    if bin2 in used_bins:
-                        continue
-                    
-                    # Check if bin2 is adjacent to any bin in current_group
-                    can_add = False
-                    for existing_bin in current_group:
-                        if are_bins_adjacent(bin2, existing_bin):
-                            can_add = True
-                            break
-                    
-                    if can_add:
-                        new_group = current_group + [bin2]
-                        new_remaining = remaining_bins[j+1:]
-                        find_groups_recursive(new_group, new_remaining)
+                key = (
+                    not _forms_rectangle(group + [candidate], candidate_bin),
+                    abs(total + bin_counts[candidate] - threshold),
+                    adjacency.order[candidate]
+                )
+                if best_candidate is None or key < best_candidate[0]:
+                    best_candidate = (key, candidate, candidate_bin)
             
-            find_groups_recursive([bin1], low_count_bins[i+1:])
+            if best_candidate is None:
+                break
             
-            # Sort by total count (prefer groups that get closer to threshold)
-            potential_groups.sort(key=lambda x: abs(x[1] - threshold))
+            _, candidate, merged_bin = best_candidate
+            group.append(candidate)
+            total += bin_counts[candidate]
             
-            # Take the best group that doesn't conflict with already used bins
-            for group, total_count in potential_groups:
-                if not any(b in used_bins for b in group):
-                    merge_groups.append(group)
-                    used_bins.update(group)
-                    break
+            if _forms_rectangle(group, merged_bin):
+                score = (abs(total - threshold), len(group))
+                if best is None or score < best[0]:
+                    best = (score, list(group), merged_bin)
+        
+        if best is not None:
+            merge_groups.append(best[1])
+            used_bins.update(best[1])
+    
+    print(f"  [TOOL] Merge planner: {len(merge_groups)} groups, {work} candidate evaluations (budget {work_budget})")
     
     # If we still have low-count bins, try merging with ANY available bins (not just low-count ones)
     remaining_low_bins = [b for b in low_count_bins if b not in used_bins]
@@ -786,49 +1197,36 @@ def find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size):
             best_neighbor = None
             best_score = float('inf')
             
-            for other_bin in bounds:
-                if other_bin == low_bin or other_bin in used_bins:
+            for other_bin in adjacency.neighbors(low_bin):
+                if other_bin in used_bins:
+                    continue
+                
+                # Only neighbours sharing a full edge give a non-overlapping merged bin
+                merged_bin = merge_multiple_bins([low_bin, other_bin])
+                if not _forms_rectangle([low_bin, other_bin], merged_bin):
+                    continue
+                if merged_bin[1] - merged_bin[0] > max_bin_size or merged_bin[3] - merged_bin[2] > max_bin_size:
                     continue
             
-                if are_bins_adjacent(low_bin, other_bin):
-                    # Score based on count (prefer merging with lower count bins)
-                    other_count = bin_counts[other_bin]
-                    score = other_count
-                    
-                    if score < best_score:
-                        best_score = score
-                        best_neighbor = other_bin
+                # Score based on count (prefer merging with lower count bins)
+                other_count = bin_counts[other_bin]
+                score = other_count
+                
+                if score < best_score:
+                    best_score = score
+                    best_neighbor = other_bin
             
             if best_neighbor is not None:
-                # Create merged bin
-                merged_bin = (
-                    min(low_bin[0], best_neighbor[0]), max(low_bin[1], best_neighbor[1]),
-                    min(low_bin[2], best_neighbor[2]), max(low_bin[3], best_neighbor[3])
-                )
-                
-                # Check if merged bin would be too large
-                merged_width = merged_bin[1] - merged_bin[0]
-                merged_height = merged_bin[3] - merged_bin[2]
-                
-                # CRITICAL: Check if merged bin would overlap with any existing bins
-                would_overlap = False
-                for existing_bin in bounds:
-                    if existing_bin == low_bin or existing_bin == best_neighbor or existing_bin in used_bins:
-                        continue
-                    if has_overlap(merged_bin, existing_bin):
-                        would_overlap = True
-                        break
-                
-                if not would_overlap and merged_width <= max_bin_size and merged_height <= max_bin_size:
-                    total_count = bin_counts[low_bin] + bin_counts[best_neighbor]
-                    merge_groups.append([low_bin, best_neighbor])
-                    used_bins.add(low_bin)
-                    used_bins.add(best_neighbor)
-                    print(f"    🔄 Aggressive merge: {bin_counts[low_bin]} + {bin_counts[best_neighbor]} = {total_count} events")
+                total_count = bin_counts[low_bin] + bin_counts[best_neighbor]
+                merge_groups.append([low_bin, best_neighbor])
+                used_bins.add(low_bin)
+                used_bins.add(best_neighbor)
+                print(f"    🔄 Aggressive merge: {bin_counts[low_bin]} + {bin_counts[best_neighbor]} = {total_count} events")
     
     return merge_groups
 
-def enhanced_merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0):
+def enhanced_merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=10.0, count_oracle=None,
+                                 work_budget=DEFAULT_MERGE_WORK_BUDGET):
     """
     Enhanced merging that allows L-shaped and irregular merges.
         
@@ -837,6 +1235,8 @@ def enhanced_merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=
         lons, lats: Earthquake coordinates
         threshold: Event count threshold below which bins are merged
         max_bin_size: Maximum size for any bin dimension
+        count_oracle: Optional CountOracle over these events (built from bounds if omitted)
+        work_budget: Candidate evaluations allowed to the merge planner
             
         Returns:
         List of merged bounds
@@ -846,11 +1246,16 @@ def enhanced_merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=
     
     print(f"🔄 Starting enhanced merge process with {len(bounds)} bins, threshold: {threshold}")
     
-    # Count events in each bin
-    bin_counts = {b: count_events_in_bin(b, lons, lats) for b in bounds}
+    # Count events in each bin (prefix-sum table, built once)
+    count_oracle = count_oracle or CountOracle(bounds, lons, lats)
+    bin_counts = {b: count_oracle.count(b) for b in bounds}
+    
+    # Adjacency graph, kept in sync with the bounds through both merge phases
+    adjacency = BinAdjacencyGraph(bounds)
     
     # Find mergeable groups
-    merge_groups = find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size)
+    merge_groups = find_mergeable_groups(bounds, bin_counts, threshold, max_bin_size, adjacency,
+                                         work_budget=work_budget)
     
     if not merge_groups:
         print("✅ No mergeable groups found")
@@ -875,21 +1280,22 @@ def enhanced_merge_adjacent_bins(bounds, lons, lats, threshold=50, max_bin_size=
                     working_bounds.remove(b)
             
             working_bounds.append(merged_bin)
+            adjacency.merge(group, merged_bin)
         
         print(f"🎯 Result after group merging: {len(bounds)} → {len(working_bounds)} bins")
         bounds = working_bounds
         # Update bin counts for the new bounds
-        bin_counts = {b: count_events_in_bin(b, lons, lats) for b in bounds}
+        bin_counts = {b: count_oracle.count(b) for b in bounds}
     
     # PHASE 2: Specifically target bins below threshold
-    bounds = merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size)
+    bounds = merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size, adjacency)
     
     print(f"🎯 Final result: {len(bounds)} bins")
     print("✅ Enhanced merging completed successfully")
     
     return bounds
 
-def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size):
+def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size, adjacency=None):
     """
     Merge bins below threshold with their adjacent neighbors.
     
@@ -898,6 +1304,7 @@ def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size):
         bin_counts: Dictionary mapping bounds to event counts
         threshold: Event count threshold
         max_bin_size: Maximum bin size constraint
+        adjacency: Optional BinAdjacencyGraph of bounds (built if omitted)
             
     Returns:
         List of merged bounds
@@ -919,7 +1326,11 @@ def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size):
     # Sort by count (lowest first) to merge worst bins first
     below_threshold.sort(key=lambda b: bin_counts[b])
     
+    if adjacency is None:
+        adjacency = BinAdjacencyGraph(bounds)
     working_bounds = bounds.copy()
+    # working_bounds only changes once all pairs are chosen, so one static index serves the overlap checks
+    overlap_index = RectIndex(working_bounds)
     used_bins = set()
     merge_pairs = []
     
@@ -929,13 +1340,12 @@ def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size):
             
         # Find ONLY ADJACENT neighbors
         adjacent_neighbors = []
-        for other_bin in working_bounds:
-            if other_bin == low_bin or other_bin in used_bins:
+        for other_bin in adjacency.neighbors(low_bin):
+            if other_bin in used_bins:
                 continue
                 
             # CRITICAL: Only consider ADJACENT bins
-            if are_bins_adjacent(low_bin, other_bin):
-                adjacent_neighbors.append((other_bin, bin_counts[other_bin]))
+            adjacent_neighbors.append((other_bin, bin_counts[other_bin]))
         
         if not adjacent_neighbors:
             print(f"  ⚠️  Bin with {bin_counts[low_bin]} events has no adjacent neighbors to merge with")
@@ -959,12 +1369,12 @@ def merge_below_threshold_bins(bounds, bin_counts, threshold, max_bin_size):
                     
         # Check if merged bin would overlap with any existing bins
         would_overlap = False
-        for existing_bin in working_bounds:
+        for j in overlap_index.intersecting(merged_bin):
+            existing_bin = working_bounds[j]
             if existing_bin == low_bin or existing_bin == best_neighbor or existing_bin in used_bins:
                 continue
-            if has_overlap(merged_bin, existing_bin):
-                would_overlap = True
-                break
+            would_overlap = True
+            break
         
         if not would_overlap and merged_width <= max_bin_size and merged_height <= max_bin_size:
             total_count = bin_counts[low_bin] + bin_counts[best_neighbor]
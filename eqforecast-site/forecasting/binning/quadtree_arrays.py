@@ -0,0 +1,174 @@
+import numpy as np
+
+# Child order matches QuadtreeNode.subdivide: SW, SE, NW, NE,
+# i.e. quadrant code = (lon >= mid_lon) + 2 * (lat >= mid_lat)
+N_CHILDREN = 4
+
+
+def _bounds_dtype(root_bounds):
+    """dtype the node bounds are computed in, following QuadtreeNode's scalar arithmetic."""
+    strong = [b for b in root_bounds if isinstance(b, np.generic)]
+    dtype = np.result_type(*strong) if strong else np.dtype(np.float64)
+    if not np.issubdtype(dtype, np.floating):
+        dtype = np.dtype(np.float64)
+    return dtype, not strong
+
+
+def _compare_dtype(coords, bounds_dtype, weak):
+    """dtype of `coords >= bound` in build_quadtree_recursive (Python float bounds are weakly typed)."""
+    if weak and np.issubdtype(coords.dtype, np.floating):
+        return coords.dtype
+    return np.result_type(coords.dtype, bounds_dtype)
+
+
+class ArrayQuadtree:
+    """
+    Quadtree stored in flat arrays instead of QuadtreeNode objects.
+
+    Node i has bounds[i] = (min_lon, max_lon, min_lat, max_lat), depth[i],
+    child_offset[i] (id of its first child, children are consecutive; -1 for a leaf)
+    and owns the events perm[event_start[i]:event_end[i]].
+    """
+
+    def __init__(self, bounds, depth, child_offset, event_start, event_end, perm, weak_bounds=False):
+        self.bounds = bounds
+        self.depth = depth
+        self.child_offset = child_offset
+        self.event_start = event_start
+        self.event_end = event_end
+        self.perm = perm
+        self.weak_bounds = weak_bounds
+
+    @property
+    def n_nodes(self):
+        return len(self.depth)
+
+    def events_in(self, node):
+        """Event indices inside a node, in ascending order."""
+        return self.perm[self.event_start[node]:self.event_end[node]]
+
+    def leaf_nodes(self):
+        """Leaf node ids in depth-first order (same order as extract_leaf_bounds)."""
+        leaves = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            first = self.child_offset[node]
+            if first < 0:
+                leaves.append(node)
+            else:
+                stack.extend(range(first + N_CHILDREN - 1, first - 1, -1))
+        return np.array(leaves, dtype=np.int64)
+
+    def leaf_bounds(self):
+        """Leaf bounds as a list of tuples, equal to extract_leaf_bounds on the object tree."""
+        rows = self.bounds[self.leaf_nodes()]
+        if self.weak_bounds:
+            return [tuple(row) for row in rows.tolist()]
+        return [tuple(row) for row in rows]
+
+    def leaf_counts(self):
+        """Number of events in each leaf, in leaf_nodes() order."""
+        leaves = self.leaf_nodes()
+        return self.event_end[leaves] - self.event_start[leaves]
+
+
+def build_quadtree_arrays(lons, lats, root_bounds, max_depth=4, min_events=10):
+    """
+    Array-backed equivalent of build_quadtree_recursive.
+
+    All events live in one permuted index array. Each level partitions the
+    ranges of the nodes being split in a single stable sort by (node, quadrant),
+    so every level is touched once instead of masking the full catalog per node.
+    """
+    lons = np.asarray(lons)
+    lats = np.asarray(lats)
+
+    dtype, weak = _bounds_dtype(root_bounds)
+    lon_cmp = _compare_dtype(lons, dtype, weak)
+    lat_cmp = _compare_dtype(lats, dtype, weak)
+
+    root = np.array([root_bounds], dtype=dtype)
+    r = root[0]
+    perm = np.flatnonzero(
+        (lons >= r[0].astype(lon_cmp)) & (lons < r[1].astype(lon_cmp)) &
+        (lats >= r[2].astype(lat_cmp)) & (lats < r[3].astype(lat_cmp))
+    )
+
+    bounds = [root]
+    depth = [np.zeros(1, dtype=np.int64)]
+    event_start = [np.zeros(1, dtype=np.int64)]
+    event_end = [np.array([len(perm)], dtype=np.int64)]
+    child_offset = np.full(1, -1, dtype=np.int64)
+
+    frontier = np.zeros(1, dtype=np.int64)  # node ids of the current level
+    level_bounds, level_start, level_end = root, event_start[0], event_end[0]
+    n_nodes = 1
+    level = 0
+
+    while len(frontier) > 0 and level < max_depth:
+        counts = level_end - level_start
+        split_local = np.flatnonzero(counts > min_events)
+        if len(split_local) == 0:
+            break
+
+        k = len(split_local)
+        starts = level_start[split_local]
+        lengths = counts[split_local]
+        parent_bounds = level_bounds[split_local]
+
+        # Gather the event ranges of the nodes being split
+        total = int(lengths.sum())
+        owner = np.repeat(np.arange(k), lengths)
+        positions = np.arange(total) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        events = perm[positions]
+
+        mid_lon = (parent_bounds[:, 0] + parent_bounds[:, 1]) / 2
+        mid_lat = (parent_bounds[:, 2] + parent_bounds[:, 3]) / 2
+        code = (
+            (lons[events] >= mid_lon.astype(lon_cmp)[owner]).astype(np.int64) +
+            2 * (lats[events] >= mid_lat.astype(lat_cmp)[owner])
+        )
+
+        # Stable partition of every split range by quadrant
+        order = np.lexsort((code, owner))
+        perm[positions] = events[order]
+
+        child_counts = np.bincount(owner * N_CHILDREN + code, minlength=k * N_CHILDREN).reshape(k, N_CHILDREN)
+        child_start = starts[:, None] + np.cumsum(child_counts, axis=1) - child_counts
+        child_end = child_start + child_counts
+
+        min_lon, max_lon = parent_bounds[:, 0], parent_bounds[:, 1]
+        min_lat, max_lat = parent_bounds[:, 2], parent_bounds[:, 3]
+        child_bounds = np.stack([
+            np.stack([min_lon, mid_lon, min_lat, mid_lat], axis=1),
+            np.stack([mid_lon, max_lon, min_lat, mid_lat], axis=1),
+            np.stack([min_lon, mid_lon, mid_lat, max_lat], axis=1),
+            np.stack([mid_lon, max_lon, mid_lat, max_lat], axis=1)
+        ], axis=1).reshape(k * N_CHILDREN, 4)
+
+        child_offset[frontier[split_local]] = n_nodes + N_CHILDREN * np.arange(k)
+
+        level += 1
+        n_new = k * N_CHILDREN
+        frontier = n_nodes + np.arange(n_new)
+        n_nodes += n_new
+        level_bounds = child_bounds
+        level_start = child_start.ravel()
+        level_end = child_end.ravel()
+
+        bounds.append(level_bounds)
+        depth.append(np.full(n_new, level, dtype=np.int64))
+        event_start.append(level_start)
+        event_end.append(level_end)
+        child_offset = np.concatenate([child_offset, np.full(n_new, -1, dtype=np.int64)])
+
+    return ArrayQuadtree(
+        bounds=np.concatenate(bounds),
+        depth=np.concatenate(depth),
+        child_offset=child_offset,
+        event_start=np.concatenate(event_start),
+        event_end=np.concatenate(event_end),
+        perm=perm,
+        weak_bounds=weak
+    )
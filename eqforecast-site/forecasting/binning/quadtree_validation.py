@@ -1,113 +1,176 @@
 # quadtree_validation.py
-
-import sys
+#
+# Parameter sweep over QuadtreeBinner settings (min_events x max_depth x merge_threshold x max_bin_size).
+# The catalog arrays are placed in shared memory once and the configurations are evaluated
+# in a process pool; the summary table (bins, variance reduction, info gain) is written to CSV.
+#   python binning/quadtree_validation.py [--catalog data/eq_catalog.csv] [--merge_threshold 50 100]
+
+import argparse
+import contextlib
+import io
+import itertools
 import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import numpy as np
 import pandas as pd
-from pathlib import Path
-from quadtree import apply_quadtree
+
+from binning.quadtree import QuadtreeBinner
+from binning.bin_metrics import bin_magnitude_metrics, magnitude_bin_ids, uniform_cell_ids
+
+# Rows of the shared (3, n_events) array
+LAT, LON, MAG = 0, 1, 2
+
+# Set in every worker by _attach_shared_catalog
+_shared = {}
+
 
 # --- Load Earthquake Catalog ---
-catalog_path = Path("data/eq_catalog.csv")
-catalog = pd.read_csv(catalog_path, encoding="utf-8-sig")
-catalog = catalog.rename(columns={"N_Lat": "latitude", "E_Long": "longitude", "Mag": "magnitude"})
-catalog = catalog.dropna(subset=["latitude", "longitude", "magnitude"])
+def load_catalog(path):
+    catalog = pd.read_csv(path, encoding="utf-8-sig")
+    catalog = catalog.rename(columns={"N_Lat": "latitude", "E_Long": "longitude", "Mag": "magnitude"})
+    return catalog.dropna(subset=["latitude", "longitude", "magnitude"])
+
 
 # --- Uniform Grid for Entropy Baseline ---
-def generate_uniform_bins(df, step=0.5):
-    min_lon, max_lon = df["longitude"].min(), df["longitude"].max()
-    min_lat, max_lat = df["latitude"].min(), df["latitude"].max()
-
-    lon_bins = np.arange(min_lon, max_lon + step, step)
-    lat_bins = np.arange(min_lat, max_lat + step, step)
-
-    bins = []
-    for i in range(len(lon_bins) - 1):
-        for j in range(len(lat_bins) - 1):
-            sub = df[
-                (df["longitude"] >= lon_bins[i]) & (df["longitude"] < lon_bins[i + 1]) &
-                (df["latitude"] >= lat_bins[j]) & (df["latitude"] < lat_bins[j + 1])
-            ]
-            if len(sub) > 0:
-                bins.append(sub["magnitude"])
-    return bins
-
-# --- Magnitude Entropy ---
-def magnitude_entropy(mags, bin_size=0.1):
-    if len(mags) < 2:
-        return 0
-    hist, _ = np.histogram(mags, bins=np.arange(mags.min(), mags.max() + bin_size, bin_size))
-    probs = hist / hist.sum()
-    probs = probs[probs > 0]
-    return -np.sum(probs * np.log2(probs))
+def uniform_entropy(catalog, step=0.5):
+    """Summed magnitude entropy over the non-empty cells of a uniform step-degree grid."""
+    lons = catalog["longitude"].to_numpy(np.float64)
+    lats = catalog["latitude"].to_numpy(np.float64)
+    mags = catalog["magnitude"].to_numpy(np.float64)
+    cell_ids = uniform_cell_ids(lons, lats, step)
+    metrics = bin_magnitude_metrics(cell_ids, mags, magnitude_bin_ids(cell_ids, mags))
+    return metrics["entropy"].sum()
 
-# --- Configurations to Test ---
-param_grid = [
-    {"label": "Min20_D3", "min_events": 20, "max_depth": 3},
-    {"label": "Min20_D4", "min_events": 20, "max_depth": 4},
-    {"label": "Min20_D5", "min_events": 20, "max_depth": 5},
-    {"label": "Min50_D3", "min_events": 50, "max_depth": 3},
-    {"label": "Min50_D4", "min_events": 50, "max_depth": 4},
-    {"label": "Min50_D5", "min_events": 50, "max_depth": 5},
-    {"label": "Min100_D3", "min_events": 100, "max_depth": 3},
-    {"label": "Min100_D4", "min_events": 100, "max_depth": 4},
-    {"label": "Min100_D5", "min_events": 100, "max_depth": 5},
-]
-
-# --- Total Magnitude Variance ---
-total_var = catalog["magnitude"].var()
-uniform_entropy = sum(magnitude_entropy(mags) for mags in generate_uniform_bins(catalog))
 
-# --- Run Validations ---
-results = []
-for p in param_grid:
-    label = p["label"]
-    filtered, root, bounds = apply_quadtree(
-        catalog,
-        min_events=p["min_events"],
+# --- Configurations to Test ---
+def build_param_grid(min_events=(20, 50, 100), max_depth=(3, 4, 5), merge_threshold=(None,), max_bin_size=(12.0,)):
+    grid = []
+    for me, d, t, s in itertools.product(min_events, max_depth, merge_threshold, max_bin_size):
+        label = f"Min{me}_D{d}"
+        if t is not None:
+            label += f"_T{t}_S{s:g}"
+        grid.append({"label": label, "min_events": me, "max_depth": d, "merge_threshold": t, "max_bin_size": s})
+    return grid
+
+
+# --- Shared-Memory Catalog ---
+def share_catalog(catalog):
+    """Copy lat/lon/magnitude into one shared-memory block; the caller closes and unlinks it."""
+    n_events = len(catalog)
+    shm = shared_memory.SharedMemory(create=True, size=max(3 * n_events * 8, 1))
+    data = np.ndarray((3, n_events), dtype=np.float64, buffer=shm.buf)
+    data[LAT] = catalog["latitude"].to_numpy(np.float64)
+    data[LON] = catalog["longitude"].to_numpy(np.float64)
+    data[MAG] = catalog["magnitude"].to_numpy(np.float64)
+    return shm
+
+
+def _attach_shared_catalog(name, n_events, total_var, baseline_entropy):
+    """Pool initializer: map the shared catalog without copying it."""
+    # Pool workers share the parent's resource tracker, so the parent's unlink releases the block
+    shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray((3, n_events), dtype=np.float64, buffer=shm.buf)
+    data.flags.writeable = False
+    _shared.update(shm=shm, data=data, total_var=total_var, baseline_entropy=baseline_entropy)
+
+
+# --- Evaluate One Configuration ---
+def evaluate_config(p):
+    data = _shared["data"]
+    lats, lons, mags = data[LAT], data[LON], data[MAG]
+
+    start = time.perf_counter()
+    binner = QuadtreeBinner(
         max_depth=p["max_depth"],
-        min_bin_width=0.2
+        min_events=p["min_events"],
+        merge_threshold=p["merge_threshold"],
+        max_bin_size=p["max_bin_size"]
     )
+    with contextlib.redirect_stdout(io.StringIO()):
+        bin_ids = binner.assign_bins(lats, lons)
 
-    entropy_list = []
-    var_list = []
-    mmax_list = []
-    count_list = []
-
-    for (min_lon, max_lon, min_lat, max_lat) in bounds:
-        sub = catalog[
-            (catalog["longitude"] >= min_lon) & (catalog["longitude"] < max_lon) &
-            (catalog["latitude"] >= min_lat) & (catalog["latitude"] < max_lat)
-        ]
-        mags = sub["magnitude"]
-        count = len(mags)
-        if count > 0:
-            mmax = mags.max()
-            var = mags.var() if count > 1 else 0
-            ent = magnitude_entropy(mags)
-            mmax_list.append(mmax)
-            var_list.append(var)
-            entropy_list.append(ent)
-            count_list.append(count)
-
-    avg_var = np.mean(var_list)
+    # All per-bin metrics in one pass over the events
+    metrics = bin_magnitude_metrics(bin_ids, mags, magnitude_bin_ids(bin_ids, mags, binner.get_bin_count()),
+                                    binner.get_bin_count())
+    non_empty = metrics["count"] > 0
+
+    total_var = _shared["total_var"]
+    avg_var = np.mean(metrics["variance"][non_empty])
     vr = (total_var - avg_var) / total_var
-    qt_entropy = sum(entropy_list)
-    ig = uniform_entropy - qt_entropy
-
-    results.append({
-        "config": label,
-        "bins": len(bounds),
-        "events": sum(count_list),
-        "avg_mmax": np.mean(mmax_list),
+    qt_entropy = metrics["entropy"][non_empty].sum()
+    ig = _shared["baseline_entropy"] - qt_entropy
+
+    return {
+        "config": p["label"],
+        "min_events": p["min_events"],
+        "max_depth": p["max_depth"],
+        "merge_threshold": p["merge_threshold"],
+        "max_bin_size": p["max_bin_size"],
+        "bins": binner.get_bin_count(),
+        "events": int(metrics["count"].sum()),
+        "avg_mmax": np.mean(metrics["mmax"][non_empty]),
         "variance_reduction": vr,
-        "info_gain": ig
-    })
+        "info_gain": ig,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+# --- Run Validations ---
+def run_validation(catalog, param_grid, max_workers=None):
+    total_var = catalog["magnitude"].var()
+    baseline_entropy = uniform_entropy(catalog)
+
+    if max_workers is None:
+        max_workers = min(len(param_grid), os.cpu_count() or 1)
+
+    print(f"Evaluating {len(param_grid)} configurations on {len(catalog)} events with {max_workers} workers")
+    start = time.perf_counter()
+
+    shm = share_catalog(catalog)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_shared_catalog,
+            initargs=(shm.name, len(catalog), total_var, baseline_entropy)
+        ) as executor:
+            results = []
+            for row in executor.map(evaluate_config, param_grid):
+                print(f"  {row['config']}: {row['bins']} bins, VR={row['variance_reduction']:.3f}, "
+                      f"IG={row['info_gain']:.1f} ({row['seconds']:.2f}s)")
+                results.append(row)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel quadtree parameter sweep")
+    parser.add_argument('--catalog', type=str, default="data/eq_catalog.csv", help='Raw catalog CSV')
+    parser.add_argument('--output', type=str, default="quadtree_validation_summary.csv")
+    parser.add_argument('--min_events', type=int, nargs='+', default=[20, 50, 100])
+    parser.add_argument('--max_depth', type=int, nargs='+', default=[3, 4, 5])
+    parser.add_argument('--merge_threshold', type=int, nargs='+', default=None,
+                        help='Merge thresholds to sweep (default: no merging)')
+    parser.add_argument('--max_bin_size', type=float, nargs='+', default=[12.0])
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    args = parser.parse_args()
+
+    catalog = load_catalog(Path(args.catalog))
+    param_grid = build_param_grid(
+        args.min_events, args.max_depth, args.merge_threshold or [None], args.max_bin_size
+    )
 
-# --- Save Results ---
-results_df = pd.DataFrame(results)
-results_df.to_csv("quadtree_validation_summary.csv", index=False)
-print(results_df)
+    # --- Save Results ---
+    results_df = run_validation(catalog, param_grid, max_workers=args.workers)
+    results_df.to_csv(args.output, index=False)
+    print(results_df)
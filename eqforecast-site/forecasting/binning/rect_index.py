@@ -0,0 +1,97 @@
+import numpy as np
+
+# Children per tree node
+NODE_SIZE = 16
+
+
+class RectIndex:
+    """
+    Static packed R-tree over (min_lon, max_lon, min_lat, max_lat) rectangles.
+
+    Rectangles are ordered with Sort-Tile-Recursive packing (vertical slices by
+    center longitude, each sorted by center latitude) and grouped NODE_SIZE at a
+    time into bounding boxes, level by level up to a single root. A query walks
+    down the levels testing only the children of boxes that passed, all with
+    array comparisons, so it touches O(log n + matches) nodes instead of every
+    rectangle.
+
+    Intersection follows has_overlap (shared edges do not overlap) and
+    containment follows is_bin_covered (edges may coincide).
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        rects = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        n = len(rects)
+
+        # Sort-Tile-Recursive order
+        n_leaves = max(-(-n // NODE_SIZE), 1)
+        n_slices = int(np.ceil(np.sqrt(n_leaves)))
+        slice_size = n_slices * NODE_SIZE
+        center_lon = (rects[:, 0] + rects[:, 1]) / 2
+        center_lat = (rects[:, 2] + rects[:, 3]) / 2
+        by_lon = np.argsort(center_lon, kind='stable')
+        slice_of = np.empty(n, dtype=np.int64)
+        slice_of[by_lon] = np.arange(n) // slice_size
+        self.order = np.lexsort((center_lat, slice_of))
+        self.rects = rects[self.order]
+
+        # Levels of bounding boxes, from the rectangles (level 0) up to the root
+        self.levels = [self.rects]
+        boxes = self.rects
+        while len(boxes) > 1:
+            starts = np.arange(0, len(boxes), NODE_SIZE)
+            boxes = np.column_stack([
+                np.minimum.reduceat(boxes[:, 0], starts),
+                np.maximum.reduceat(boxes[:, 1], starts),
+                np.minimum.reduceat(boxes[:, 2], starts),
+                np.maximum.reduceat(boxes[:, 3], starts)
+            ])
+            self.levels.append(boxes)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _search(self, test):
+        """Indices (in self.bounds) of rectangles passing test(boxes); test must also hold for enclosing boxes."""
+        if len(self.rects) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        nodes = np.arange(len(self.levels[-1]))
+        for level in range(len(self.levels) - 1, 0, -1):
+            nodes = nodes[test(self.levels[level][nodes])]
+            children = (nodes[:, None] * NODE_SIZE + np.arange(NODE_SIZE)).ravel()
+            nodes = children[children < len(self.levels[level - 1])]
+        nodes = nodes[test(self.rects[nodes])]
+        return np.sort(self.order[nodes])
+
+    def intersecting(self, rect):
+        """Rectangles that overlap rect with positive area (has_overlap)."""
+        min_lon, max_lon, min_lat, max_lat = (float(v) for v in rect)
+        return self._search(lambda boxes: (
+            (boxes[:, 0] < max_lon) & (min_lon < boxes[:, 1]) &
+            (boxes[:, 2] < max_lat) & (min_lat < boxes[:, 3])
+        ))
+
+    def containing(self, rect):
+        """Rectangles that completely contain rect (is_bin_covered)."""
+        min_lon, max_lon, min_lat, max_lat = (float(v) for v in rect)
+        return self._search(lambda boxes: (
+            (boxes[:, 0] <= min_lon) & (boxes[:, 1] >= max_lon) &
+            (boxes[:, 2] <= min_lat) & (boxes[:, 3] >= max_lat)
+        ))
+
+    def containing_point(self, lon, lat):
+        """Rectangles with min_lon <= lon < max_lon and min_lat <= lat < max_lat."""
+        lon, lat = float(lon), float(lat)
+        return self._search(lambda boxes: (
+            (boxes[:, 0] <= lon) & (lon < boxes[:, 1]) &
+            (boxes[:, 2] <= lat) & (lat < boxes[:, 3])
+        ))
+
+    def overlapping_pairs(self):
+        """All (i, j) with i < j whose rectangles overlap, sorted by i then j."""
+        pairs = []
+        for i, rect in enumerate(self.bounds):
+            pairs.extend((i, int(j)) for j in self.intersecting(rect) if j > i)
+        return pairs
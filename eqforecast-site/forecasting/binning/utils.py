@@ -1,46 +1,99 @@
+import heapq
+
+from binning.bin_lookup import CountOracle
+
+
+def _edge_keys(b):
+    """Keys under which a bin is found by a bin sharing a full edge with it, one per side."""
+    return {
+        'left': (b[0], b[2], b[3]),
+        'right': (b[1], b[2], b[3]),
+        'bottom': (b[2], b[0], b[1]),
+        'top': (b[3], b[0], b[1])
+    }
+
+
+# A bin's side matches the opposite side of the bin it shares an edge with
+OPPOSITE = {'left': 'right', 'right': 'left', 'bottom': 'top', 'top': 'bottom'}
+
+
 def merge_sparse_bins(bounds, catalog, threshold=10):
     lons = catalog.get_longitudes()
     lats = catalog.get_latitudes()
-    
-    def count_events(b):
-        in_bin = (
-            (lons >= b[0]) & (lons < b[1]) &
-            (lats >= b[2]) & (lats < b[3])
-        )
-        return in_bin.sum()
-    
+
     bounds = list(bounds)
-    counts = [count_events(b) for b in bounds]
-
-    merged = True
-    while merged:
-        merged = False
-        for i in range(len(bounds)):
-            if counts[i] >= threshold:
-                continue
-            for j in range(len(bounds)):
-                if i == j or counts[j] < threshold:
-                    continue
-                b1, b2 = bounds[i], bounds[j]
-                # Check for shared border (naïve)
-                if (b1[0] == b2[1] or b1[1] == b2[0]) and (b1[2] == b2[2] and b1[3] == b2[3]):
-                    new_bin = (
-                        min(b1[0], b2[0]), max(b1[1], b2[1]),
-                        b1[2], b1[3]
-                    )
-                elif (b1[2] == b2[3] or b1[3] == b2[2]) and (b1[0] == b2[0] and b1[1] == b2[1]):
-                    new_bin = (
-                        b1[0], b1[1],
-                        min(b1[2], b2[2]), max(b1[3], b2[3])
-                    )
-                else:
-                    continue
-                bounds.pop(max(i, j))
-                bounds.pop(min(i, j))
-                bounds.append(new_bin)
-                counts = [count_events(b) for b in bounds]
-                merged = True
-                break
-            if merged:
-                break
-    return bounds
+    # Counts are taken once; a merged bin's count is the sum of the two merged counts
+    count_events = CountOracle(bounds, lons, lats).count
+
+    # Every bin gets an id in list order; merged bins are appended with increasing ids,
+    # so sorting surviving ids reproduces the list order.
+    bins = dict(enumerate(bounds))
+    counts = {i: count_events(b) for i, b in bins.items()}
+    next_id = len(bounds)
+
+    # Edge indexes: side -> key -> ids, kept separately for sparse and full bins
+    sparse_edges = {side: {} for side in OPPOSITE}
+    full_edges = {side: {} for side in OPPOSITE}
+
+    def index(i, add=True):
+        edges = full_edges if counts[i] >= threshold else sparse_edges
+        for side, key in _edge_keys(bins[i]).items():
+            ids = edges[side].setdefault(key, set())
+            if add:
+                ids.add(i)
+            else:
+                ids.discard(i)
+
+    def touching(i, edges):
+        # Bins whose opposite side coincides with a side of bin i
+        found = set()
+        for side, key in _edge_keys(bins[i]).items():
+            found |= edges[OPPOSITE[side]].get(key, set())
+        return found
+
+    for i in bins:
+        index(i)
+
+    # Work queue of sparse bins that may have a partner, in list order
+    queue = [i for i in bins if counts[i] < threshold]
+    heapq.heapify(queue)
+    queued = set(queue)
+
+    while queue:
+        i = heapq.heappop(queue)
+        queued.discard(i)
+        partners = touching(i, full_edges)
+        if not partners:
+            continue
+
+        # First partner in list order, as in the original double loop
+        j = min(partners)
+        b1, b2 = bins[i], bins[j]
+        if (b1[0] == b2[1] or b1[1] == b2[0]) and (b1[2] == b2[2] and b1[3] == b2[3]):
+            new_bin = (
+                min(b1[0], b2[0]), max(b1[1], b2[1]),
+                b1[2], b1[3]
+            )
+        else:
+            new_bin = (
+                b1[0], b1[1],
+                min(b1[2], b2[2]), max(b1[3], b2[3])
+            )
+
+        for k in (i, j):
+            index(k, add=False)
+            del bins[k]
+
+        new_id = next_id
+        next_id += 1
+        bins[new_id] = new_bin
+        counts[new_id] = counts.pop(i) + counts.pop(j)
+        index(new_id)
+
+        # Sparse bins touching the new bin gain a candidate partner
+        for k in touching(new_id, sparse_edges):
+            if k not in queued:
+                heapq.heappush(queue, k)
+                queued.add(k)
+
+    return [bins[i] for i in sorted(bins)]
@@ -138,7 +138,15 @@ def setup_logging(log_level: str = "INFO", log_file: str = None) -> logging.Logg
     return logger
 
 
-def preprocess_earthquake_data(input_path: str, output_path: str, logger: logging.Logger) -> pd.DataFrame:
+def preprocess_earthquake_data(input_path: str, output_path: str, logger: logging.Logger,
+                               use_catalog_cache: bool = True, incremental: bool = False,
+                               compact_schema: bool = False,
+                               extra_input_paths: Optional[List[str]] = None,
+                               deduplicate: bool = False,
+                               dedup_tolerances: Optional[Dict] = None,
+                               bin_scheme_path: Optional[str] = None,
+                               bin_pyramid: bool = False, lstm_format: str = 'csv',
+                               use_stage_cache: bool = True) -> pd.DataFrame:
     """
     Preprocess earthquake catalog data following the paper's methodology.
     
@@ -146,6 +154,17 @@ def preprocess_earthquake_data(input_path: str, output_path: str, logger: loggin
         input_path: Path to raw earthquake catalog
         output_path: Path to save processed data
         logger: Logger instance
+        use_catalog_cache: Reuse the memory-mapped columnar catalog cache when valid
+        incremental: Only ingest events past the stored high-water mark
+        compact_schema: Load and process the event table with narrow dtypes
+        extra_input_paths: Additional agency catalogs, parsed in parallel and merged with input_path
+        deduplicate: Remove duplicate reports of the same event before depth filtering
+        dedup_tolerances: Optional matching tolerances for duplicate removal
+        bin_scheme_path: Optional frozen bin scheme to reuse instead of rebuilding the quadtree
+        bin_pyramid: Also save the multi-resolution bin pyramid (bin_pyramid.npz)
+        lstm_format: Write LSTM-ready data as 'csv' or as the 'binary' memory-mappable dataset
+        use_stage_cache: Reuse cached preprocessing stages (.stage_cache next to output_path)
+            and skip rewriting outputs that are already up to date
         
     Returns:
         Processed earthquake catalog DataFrame
@@ -158,22 +177,42 @@ def preprocess_earthquake_data(input_path: str, output_path: str, logger: loggin
         # Load raw earthquake catalog
         logger.info("Loading raw earthquake catalog...")
         
-        # Use the existing load_catalog function to get properly formatted data
-        from src.preprocessing.load_catalog import load_catalog
+        # Use the cached load_catalog wrapper to get properly formatted data
+        from src.preprocessing.catalog_cache import load_catalog_cached
         
         # Load and get the DataFrame (ignore the CSEP catalog)
-        raw_df, _ = load_catalog(input_path)
+        loader_options = {'compact': True} if compact_schema else {}
+        if extra_input_paths:
+            from src.preprocessing.multi_catalog import load_catalogs_parallel
+            
+            raw_df, _, _ = load_catalogs_parallel(
+                [input_path] + list(extra_input_paths),
+                use_cache=use_catalog_cache,
+                **loader_options
+            )
+        else:
+            raw_df, _ = load_catalog_cached(input_path, use_cache=use_catalog_cache, **loader_options)
         logger.info(f"Loaded {len(raw_df)} earthquake records")
         logger.info(f"Columns: {list(raw_df.columns)}")
         
         # Initialize processor
-        processor = EarthquakeProcessor(min_depth=70.0)
+        processor = EarthquakeProcessor(
+            min_depth=70.0,
+            compact_schema=compact_schema,
+            deduplicate=deduplicate,
+            dedup_tolerances=dedup_tolerances,
+            bin_scheme_path=bin_scheme_path,
+            bin_pyramid=bin_pyramid,
+            lstm_format=lstm_format,
+            stage_cache_dir=str(Path(output_path).parent / ".stage_cache") if use_stage_cache else None
+        )
         
         # Process catalog
         logger.info("Processing earthquake catalog...")
         processed_catalog, annual_stats = processor.process_catalog(
             df=raw_df,
-            save_path=output_path
+            save_path=output_path,
+            incremental=incremental
         )
         
         logger.info("Preprocessing completed successfully!")
@@ -200,6 +239,55 @@ def preprocess_earthquake_data(input_path: str, output_path: str, logger: loggin
         raise
 
 
+def preprocess_earthquake_data_streaming(input_path: str, output_path: str, logger: logging.Logger,
+                                         chunksize: int, bin_scheme_path: Optional[str] = None,
+                                         lstm_format: str = 'csv') -> pd.DataFrame:
+    """
+    Preprocess a large earthquake catalog in fixed-size chunks.
+    
+    Produces the same annual statistics and LSTM-ready files as
+    preprocess_earthquake_data, but never materializes the full event table
+    (the per-event processed catalog CSV is not written).
+    
+    Args:
+        input_path: Path to raw earthquake catalog
+        output_path: Path to save processed data
+        logger: Logger instance
+        chunksize: Number of raw rows per chunk
+        bin_scheme_path: Optional frozen bin scheme to reuse instead of rebuilding the quadtree
+        lstm_format: Write LSTM-ready data as 'csv' or as the 'binary' memory-mappable dataset
+        
+    Returns:
+        Tuple of (None, annual statistics DataFrame)
+    """
+    logger.info("Starting streaming earthquake data preprocessing")
+    logger.info(f"Input path: {input_path}")
+    logger.info(f"Output path: {output_path}")
+    logger.info(f"Chunk size: {chunksize} rows")
+    
+    try:
+        processor = EarthquakeProcessor(min_depth=70.0, bin_scheme_path=bin_scheme_path, lstm_format=lstm_format)
+        
+        partials_dir = Path(output_path).parent / "annual_partials"
+        annual_stats = processor.process_catalog_streaming(
+            filepath=input_path,
+            save_path=output_path,
+            chunksize=chunksize,
+            partials_dir=str(partials_dir)
+        )
+        
+        logger.info("Streaming preprocessing completed successfully!")
+        logger.info(f"Annual statistics: {len(annual_stats)} year-bin combinations")
+        logger.info(f"Quadtree bins created: {processor.quadtree_binner.get_bin_count()}")
+        logger.info(f"Years covered: {annual_stats['year'].min()} - {annual_stats['year'].max()}")
+        
+        return None, annual_stats
+        
+    except Exception as e:
+        logger.error(f"Error during streaming preprocessing: {e}")
+        raise
+
+
 def create_shared_lstm_datasets(data_path: str, 
                                 lookback_years: int = 10,
                                 target_horizon: int = 1,
@@ -1341,9 +1429,96 @@ def main():
         choices=['best_frequency', 'best_magnitude', 'best_balanced', 'anti_overfitting', 'balanced_anti_overfitting', 'enhanced_frequency_scaling', 'high_performance_balanced'],
         help='Use optimized hyperparameter configuration for best performance. Options: best_frequency (49.39 range), best_magnitude (1.52 range), best_balanced (balanced performance), anti_overfitting (prevents overfitting), balanced_anti_overfitting (balanced performance and capacity), enhanced_frequency_scaling (maximum range coverage), high_performance_balanced (maximum overall performance)'
     )
+    parser.add_argument(
+        '--stream_chunk_size',
+        type=int,
+        default=None,
+        help='Preprocess the raw catalog in chunks of this many rows (memory-bounded, skips the per-event CSV)'
+    )
+    parser.add_argument(
+        '--extra_catalogs',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Additional raw catalog CSVs (e.g. other agencies) to parse in parallel and merge with --input_data'
+    )
+    parser.add_argument(
+        '--compact_schema',
+        action='store_true',
+        help='Use narrow dtypes for the event table (float32 coordinates, float16 magnitude, categorical bin_id)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only ingest events newer than the last run (reuses the stored bin scheme and annual aggregates)'
+    )
+    parser.add_argument(
+        '--deduplicate',
+        action='store_true',
+        help='Remove duplicate reports of the same earthquake (e.g. across --extra_catalogs) before depth filtering'
+    )
+    parser.add_argument(
+        '--dedup_time_tolerance',
+        type=float,
+        default=16.0,
+        help='Maximum origin-time difference (seconds) for two reports to be the same event'
+    )
+    parser.add_argument(
+        '--dedup_coord_tolerance',
+        type=float,
+        default=0.5,
+        help='Maximum latitude/longitude difference (degrees) for two reports to be the same event'
+    )
+    parser.add_argument(
+        '--bin_scheme',
+        type=str,
+        default=None,
+        help='Frozen bin scheme (bin_scheme.json from a previous run) to assign events to instead of rebuilding the quadtree'
+    )
+    parser.add_argument(
+        '--bin_pyramid',
+        action='store_true',
+        help='Also save per-level quadtree bins and annual statistics (bin_pyramid.npz); not with --bin_scheme or --incremental'
+    )
+    parser.add_argument(
+        '--lstm_format',
+        type=str,
+        choices=['csv', 'binary'],
+        default='csv',
+        help='LSTM-ready output: exploded CSV, or binary panel + window index (.npy) with a JSON header'
+    )
+    parser.add_argument(
+        '--no-catalog-cache',
+        dest='use_catalog_cache',
+        action='store_false',
+        help='Always re-parse the raw catalog CSV instead of reusing the columnar catalog cache'
+    )
+    parser.add_argument(
+        '--no-stage-cache',
+        dest='use_stage_cache',
+        action='store_false',
+        help='Always rerun every preprocessing stage instead of reusing the stage cache'
+    )
     
     args = parser.parse_args()
     
+    # The memory-bounded streaming path only builds annual statistics from the raw CSV
+    if args.stream_chunk_size:
+        unsupported = [flag for flag, used in (
+            ('--extra_catalogs', args.extra_catalogs),
+            ('--compact_schema', args.compact_schema),
+            ('--incremental', args.incremental),
+            ('--deduplicate', args.deduplicate),
+            ('--dedup_time_tolerance', args.dedup_time_tolerance != parser.get_default('dedup_time_tolerance')),
+            ('--dedup_coord_tolerance', args.dedup_coord_tolerance != parser.get_default('dedup_coord_tolerance')),
+            ('--bin_pyramid', args.bin_pyramid)
+        ) if used]
+        if unsupported:
+            parser.error(f"--stream_chunk_size cannot be combined with {', '.join(unsupported)}")
+    
+    if args.incremental and args.bin_pyramid:
+        parser.error("--bin_pyramid cannot be combined with --incremental")
+    
     # Create output directory
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -1370,11 +1545,35 @@ def main():
             logger.info("="*50)
             
             processed_data_path = output_dir / "processed_earthquake_catalog.csv"
-            processed_catalog, annual_stats = preprocess_earthquake_data(
-                input_path=args.input_data,
-                output_path=str(processed_data_path),
-                logger=logger
-            )
+            if args.stream_chunk_size:
+                processed_catalog, annual_stats = preprocess_earthquake_data_streaming(
+                    input_path=args.input_data,
+                    output_path=str(processed_data_path),
+                    logger=logger,
+                    chunksize=args.stream_chunk_size,
+                    bin_scheme_path=args.bin_scheme,
+                    lstm_format=args.lstm_format
+                )
+            else:
+                processed_catalog, annual_stats = preprocess_earthquake_data(
+                    input_path=args.input_data,
+                    output_path=str(processed_data_path),
+                    logger=logger,
+                    use_catalog_cache=args.use_catalog_cache,
+                    incremental=args.incremental,
+                    compact_schema=args.compact_schema,
+                    extra_input_paths=args.extra_catalogs,
+                    deduplicate=args.deduplicate,
+                    dedup_tolerances={
+                        'time_tolerance_s': args.dedup_time_tolerance,
+                        'lat_tolerance': args.dedup_coord_tolerance,
+                        'lon_tolerance': args.dedup_coord_tolerance
+                    },
+                    bin_scheme_path=args.bin_scheme,
+                    bin_pyramid=args.bin_pyramid,
+                    lstm_format=args.lstm_format,
+                    use_stage_cache=args.use_stage_cache
+                )
             
             logger.info(f"Preprocessed data saved to: {processed_data_path}")
         
@@ -1385,7 +1584,9 @@ def main():
             logger.info("="*50)
             
             # Get appropriate data path
-            if args.mode == 'full_pipeline':
+            if args.mode == 'full_pipeline' and args.lstm_format == 'binary':
+                data_path = output_dir / "processed_earthquake_catalog_lstm_ready.json"
+            elif args.mode == 'full_pipeline':
                 data_path = output_dir / "processed_earthquake_catalog_annual_stats.csv"
             else:
                 data_path = args.input_data
@@ -21,6 +21,8 @@ from sklearn.preprocessing import RobustScaler
 import warnings
 warnings.filterwarnings('ignore')
 
+from preprocessing.lstm_artifact import is_lstm_artifact, load_lstm_artifact
+
 
 class EnhancedSharedDataset(Dataset):
     """
@@ -46,7 +48,8 @@ class EnhancedSharedDataset(Dataset):
         Initialize the enhanced shared dataset.
         
         Args:
-            data_path: Path to the earthquake catalog CSV
+            data_path: Path to the earthquake catalog CSV, annual statistics CSV, or the
+                JSON header of a binary LSTM-ready dataset (memory-mapped)
             lookback_years: Number of years to look back (default: 10)
             target_horizon: Number of years to predict ahead (default: 1)
             normalize: Whether to normalize the data
@@ -64,14 +67,23 @@ class EnhancedSharedDataset(Dataset):
         self.test_end_year = test_end_year
         
         # Load and preprocess data
-        self.raw_data = pd.read_csv(data_path)
         self.logger = logging.getLogger(__name__)
-        
-        # Process data into annual aggregates
-        self.annual_data = self._create_annual_aggregates()
-        
-        # Prepare sequences with rolling features
-        self.sequences = self._prepare_sequences()
+        if is_lstm_artifact(data_path):
+            # Binary LSTM-ready dataset: sequences index the memory-mapped panel through
+            # its stored windows, and each item reads only the years it needs
+            self.artifact = load_lstm_artifact(data_path, mmap=True)
+            self.raw_data = None
+            self.annual_data = None
+            self.sequences = self._prepare_artifact_sequences()
+        else:
+            self.artifact = None
+            self.raw_data = pd.read_csv(data_path)
+            
+            # Process data into annual aggregates
+            self.annual_data = self._create_annual_aggregates()
+            
+            # Prepare sequences with rolling features
+            self.sequences = self._prepare_sequences()
         
         # Setup normalization
         if self.normalize:
@@ -319,11 +331,133 @@ class EnhancedSharedDataset(Dataset):
         
         return sequences
     
+    def _prepare_artifact_sequences(self) -> List[Dict]:
+        """
+        Prepare sequences from the windows of a binary LSTM-ready dataset.
+        
+        Each stored window covers lookback_years input years plus one target year that
+        all have a row, so the sequences hold panel indices instead of DataFrame slices.
+        Rolling features are computed per item from the panel (see _artifact_item_features).
+        
+        Returns:
+            List of sequence dictionaries with split information, in the same bin and
+            year order as _prepare_sequences
+        """
+        artifact = self.artifact
+        if artifact['lookback_years'] != self.lookback_years or self.target_horizon != 1:
+            raise ValueError(
+                f"LSTM-ready dataset was built for lookback_years={artifact['lookback_years']} "
+                f"and target_horizon=1, not {self.lookback_years} and {self.target_horizon}"
+            )
+        
+        years = artifact['years']
+        bin_ids = [str(bin_id) for bin_id in artifact['bin_ids']]
+        windows = np.asarray(artifact['windows'])
+        self._feature_index = {feature: i for i, feature in enumerate(artifact['features'])}
+        
+        # Same valid years as _create_annual_aggregates (1910-2025)
+        self._first_year_index = int(np.searchsorted(years, 1910))
+        in_range = (windows[:, 1] >= self._first_year_index) & (years[windows[:, 1] + self.lookback_years] <= 2025)
+        
+        # 🔧 FIX: Ensure deterministic bin processing order (bin ids sorted as strings)
+        windows = sorted(windows[in_range].tolist(), key=lambda window: (bin_ids[window[0]], window[1]))
+        self.logger.info(f"Processing {len({window[0] for window in windows})} bins in deterministic order")
+        
+        sequences = []
+        for bin_index, start in windows:
+            input_years = years[start:start + self.lookback_years].astype(float).tolist()
+            target_year = float(years[start + self.lookback_years])
+            
+            if target_year <= self.train_end_year:
+                split = 'train'
+            elif target_year <= self.val_end_year:
+                split = 'val'
+            else:
+                split = 'test'
+            
+            sequences.append({
+                'bin_id': bin_ids[bin_index],
+                'split': split,
+                'bin_index': bin_index,
+                'start': start,
+                'input_years': input_years,
+                'target_years': [target_year]
+            })
+        
+        train_count = sum(1 for seq in sequences if seq['split'] == 'train')
+        val_count = sum(1 for seq in sequences if seq['split'] == 'val')
+        test_count = sum(1 for seq in sequences if seq['split'] == 'test')
+        self.logger.info(f"Sequence distribution: Train={train_count}, Val={val_count}, Test={test_count}")
+        
+        return sequences
+    
+    def _artifact_item_features(self, sequence: Dict) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+        """
+        Build one item's features from the memory-mapped panel.
+        
+        Rolling windows are causal over the panel's years; years without a row (before
+        the bin's first row) are skipped, as they have no row in the CSV either.
+        
+        Args:
+            sequence: Sequence dictionary from _prepare_artifact_sequences
+            
+        Returns:
+            Tuple of (input features [lookback, features], target [max_magnitude, frequency],
+            metadata features)
+        """
+        start = sequence['start']
+        end = start + self.lookback_years
+        history_start = max(self._first_year_index, start - max(self.rolling_windows) + 1)
+        
+        # Only the years this item needs are read from the memory map
+        block = np.asarray(self.artifact['panel'][sequence['bin_index'], history_start:end + 1], dtype=np.float64)
+        max_mag = block[:, self._feature_index['max_magnitude']]
+        frequency = block[:, self._feature_index['frequency']]
+        offset = start - history_start
+        
+        rows = []
+        for t in range(offset, offset + self.lookback_years):
+            features = [max_mag[t], frequency[t]]
+            for window in self.rolling_windows:
+                lo = max(0, t - window + 1)
+                past_mag = max_mag[lo:t + 1][~np.isnan(max_mag[lo:t + 1])]
+                features.extend([
+                    np.nanmean(frequency[lo:t + 1]),
+                    past_mag.max(),
+                    past_mag.std(ddof=1) if len(past_mag) > 1 else 0.0
+                ])
+            features.append((self.artifact['years'][history_start + t] - 1910) / (2025 - 1910))
+            rows.append(features)
+        
+        target = [max_mag[offset + self.lookback_years], frequency[offset + self.lookback_years]]
+        
+        bin_id = sequence['bin_id']
+        metadata = [
+            float(bin_id) if bin_id != '-1' else 0.0,
+            block[offset, self._feature_index['avg_depth']],
+            float(bin_id != '-1'),
+            rows[0][-1]
+        ]
+        return np.array(rows, dtype=np.float32), np.array(target, dtype=np.float32), metadata
+    
+    def _artifact_annual_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Max magnitude and frequency of all panel rows in the valid years (1910-2025)."""
+        years = self.artifact['years']
+        in_range = (years >= 1910) & (years <= 2025)
+        panel = self.artifact['panel']
+        max_mag = np.asarray(panel[:, in_range, self._feature_index['max_magnitude']])
+        frequency = np.asarray(panel[:, in_range, self._feature_index['frequency']])
+        observed = ~np.isnan(frequency)
+        return max_mag[observed], frequency[observed]
+    
     def _setup_normalization(self):
         """Setup normalization parameters for features."""
         # Get all values for normalization
-        all_max_magnitudes = self.annual_data['max_magnitude'].values
-        all_frequencies = self.annual_data['frequency'].values
+        if self.artifact is not None:
+            all_max_magnitudes, all_frequencies = self._artifact_annual_values()
+        else:
+            all_max_magnitudes = self.annual_data['max_magnitude'].values
+            all_frequencies = self.annual_data['frequency'].values
         
         # 🔧 NEW: Add log1p normalization for frequency to fix compression
         all_frequencies_log1p = np.log1p(all_frequencies)  # log(1 + frequency)
@@ -482,6 +616,10 @@ class EnhancedSharedDataset(Dataset):
         """
         sequence = self.sequences[idx]
         
+        if self.artifact is not None:
+            input_features, target_features, metadata_features = self._artifact_item_features(sequence)
+            return self._item_tensors(sequence, input_features, target_features, metadata_features)
+        
         # Extract sequential features from input sequence
         input_features = []
         for _, row in sequence['input_sequence'].iterrows():
@@ -540,6 +678,11 @@ class EnhancedSharedDataset(Dataset):
         # Convert to numpy arrays
         input_features = np.array(input_features, dtype=np.float32)
         # target_features already created as 2D numpy array above
+        return self._item_tensors(sequence, input_features, target_features, metadata_features)
+    
+    def _item_tensors(self, sequence: Dict, input_features: np.ndarray, target_features: np.ndarray,
+                      metadata_features: List[float]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, Dict]:
+        """Normalize an item's features and convert them to tensors."""
         metadata_features = np.array(metadata_features, dtype=np.float32)
         
         # Normalize features
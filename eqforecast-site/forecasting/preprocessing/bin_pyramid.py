@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Multi-Resolution Bin Pyramid
+
+Keeps every level of the quadtree instead of only its final leaves:
+1. The tree is built once over the shallow events (same root and limits as QuadtreeBinner)
+2. Additive annual aggregates (frequency, magnitude/depth sums, max magnitude) are
+   computed per (leaf, year) in one pass over the events
+3. Every internal node's aggregates are the sum (max) of its four children, level by
+   level from the bottom, so coarser levels never re-scan events
+4. Level L tiles the region with the nodes at depth L plus the leaves above it
+
+The pyramid is stored as dense [bins, years] arrays per level in one .npz file so
+coarse and fine views of the same catalog can be served from a single load.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from binning.quadtree_arrays import N_CHILDREN, build_quadtree_arrays
+
+AGGREGATE_FIELDS = ['frequency', 'magnitude_sum', 'depth_sum', 'max_magnitude']
+
+logger = logging.getLogger(__name__)
+
+
+class BinPyramid:
+    """
+    Per-level bins and annual aggregates of a quadtree.
+
+    Attributes:
+        years: Calendar year of each column of the aggregate arrays
+        bounds: Per level, (n_bins, 4) array of (min_lon, max_lon, min_lat, max_lat)
+        aggregates: Per level, dict of AGGREGATE_FIELDS arrays shaped (n_bins, n_years)
+        event_bin_ids: Per level, bin of every input event (-1 outside the root), if kept
+    """
+
+    def __init__(self, years: np.ndarray, bounds: List[np.ndarray], aggregates: List[Dict[str, np.ndarray]],
+                 event_bin_ids: List[np.ndarray] = None):
+        self.years = years
+        self.bounds = bounds
+        self.aggregates = aggregates
+        self.event_bin_ids = event_bin_ids
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.bounds)
+
+    def level_statistics(self, level: int) -> Dict[str, np.ndarray]:
+        """
+        Dense annual statistics of one level.
+
+        Returns:
+            Dict of (n_bins, n_years) arrays: frequency, max_magnitude, avg_magnitude,
+            avg_depth (nan where a bin has no events in a year)
+        """
+        agg = self.aggregates[level]
+        frequency = agg['frequency']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_magnitude = agg['magnitude_sum'] / frequency
+            avg_depth = agg['depth_sum'] / frequency
+        max_magnitude = np.where(frequency > 0, agg['max_magnitude'], np.nan)
+        return {
+            'frequency': frequency,
+            'max_magnitude': max_magnitude,
+            'avg_magnitude': np.where(frequency > 0, avg_magnitude, np.nan),
+            'avg_depth': np.where(frequency > 0, avg_depth, np.nan)
+        }
+
+    def annual_statistics(self, level: int) -> pd.DataFrame:
+        """One level in the compute_annual_statistics layout (only (year, bin_id) rows with events)."""
+        stats = self.level_statistics(level)
+        bin_idx, year_idx = np.nonzero(stats['frequency'] > 0)
+        order = np.lexsort((bin_idx, year_idx))
+        bin_idx, year_idx = bin_idx[order], year_idx[order]
+        return pd.DataFrame({
+            'year': self.years[year_idx],
+            'bin_id': bin_idx,
+            'max_magnitude': stats['max_magnitude'][bin_idx, year_idx],
+            'avg_magnitude': stats['avg_magnitude'][bin_idx, year_idx],
+            'avg_depth': stats['avg_depth'][bin_idx, year_idx],
+            'frequency': stats['frequency'][bin_idx, year_idx]
+        })
+
+    def save(self, path: str) -> None:
+        """Write all levels to one .npz file."""
+        arrays = {'years': self.years, 'n_levels': np.array(self.n_levels)}
+        for level in range(self.n_levels):
+            arrays[f'bounds_{level}'] = self.bounds[level]
+            for field in AGGREGATE_FIELDS:
+                arrays[f'{field}_{level}'] = self.aggregates[level][field]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **arrays)
+        logger.info(f"Saved {self.n_levels}-level bin pyramid to: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'BinPyramid':
+        """Read a pyramid written by save() (per-event bin ids are not stored)."""
+        with np.load(path) as data:
+            n_levels = int(data['n_levels'])
+            bounds = [data[f'bounds_{level}'] for level in range(n_levels)]
+            aggregates = [
+                {field: data[f'{field}_{level}'] for field in AGGREGATE_FIELDS}
+                for level in range(n_levels)
+            ]
+            return cls(data['years'], bounds, aggregates)
+
+
+def _level_nodes(tree, level: int) -> np.ndarray:
+    """Nodes tiling the root at a level (depth == level, or shallower leaves), in depth-first order."""
+    nodes = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        first = tree.child_offset[node]
+        if tree.depth[node] == level or first < 0:
+            nodes.append(node)
+        else:
+            stack.extend(range(first + N_CHILDREN - 1, first - 1, -1))
+    return np.array(nodes, dtype=np.int64)
+
+
+def build_bin_pyramid(lats: np.ndarray, lons: np.ndarray, years: np.ndarray, magnitudes: np.ndarray,
+                      depths: np.ndarray, root_bounds: Tuple[float, float, float, float],
+                      max_depth: int, min_events: int, keep_event_bins: bool = True) -> BinPyramid:
+    """
+    Build the quadtree over root_bounds and aggregate annual statistics at every level.
+
+    Args:
+        lats, lons: Event coordinates
+        years: Event years
+        magnitudes, depths: Event magnitudes and depths
+        root_bounds: Quadtree root (min_lon, max_lon, min_lat, max_lat)
+        max_depth: Maximum quadtree depth
+        min_events: Nodes with more events than this are split
+        keep_event_bins: Also materialize every event's bin at every level
+
+    Returns:
+        BinPyramid whose finest level equals the QuadtreeBinner leaves (unmerged bounds)
+    """
+    lats = np.asarray(lats)
+    lons = np.asarray(lons)
+    years = np.asarray(years)
+    magnitudes = np.asarray(magnitudes, dtype=np.float64)
+    depths = np.asarray(depths, dtype=np.float64)
+
+    tree = build_quadtree_arrays(lons, lats, root_bounds, max_depth, min_events)
+    n_nodes = tree.n_nodes
+
+    # Leaf of every event: leaf ranges partition the root's slice of perm
+    leaves = tree.leaf_nodes()
+    leaves = leaves[np.argsort(tree.event_start[leaves], kind='stable')]
+    node_of_event = np.full(len(lats), -1, dtype=np.int64)
+    node_of_event[tree.perm] = np.repeat(leaves, tree.event_end[leaves] - tree.event_start[leaves])
+
+    # Additive (node, year) aggregates for the leaves, in one pass
+    inside = node_of_event >= 0
+    year_values = np.unique(years[inside]) if inside.any() else np.empty(0, dtype=np.int64)
+    n_years = len(year_values)
+    year_idx = np.searchsorted(year_values, years[inside])
+    cell = node_of_event[inside] * n_years + year_idx
+
+    frequency = np.bincount(cell, minlength=n_nodes * n_years).reshape(n_nodes, n_years)
+    magnitude_sum = np.bincount(cell, weights=magnitudes[inside], minlength=n_nodes * n_years).reshape(n_nodes, n_years)
+    depth_sum = np.bincount(cell, weights=depths[inside], minlength=n_nodes * n_years).reshape(n_nodes, n_years)
+    max_magnitude = np.full(n_nodes * n_years, -np.inf)
+    np.maximum.at(max_magnitude, cell, magnitudes[inside])
+    max_magnitude = max_magnitude.reshape(n_nodes, n_years)
+
+    # Bottom-up: each internal node aggregates its four children
+    parents = np.flatnonzero(tree.child_offset >= 0)
+    for depth in range(int(tree.depth.max()) - 1, -1, -1):
+        level_parents = parents[tree.depth[parents] == depth]
+        children = tree.child_offset[level_parents][:, None] + np.arange(N_CHILDREN)
+        frequency[level_parents] = frequency[children].sum(axis=1)
+        magnitude_sum[level_parents] = magnitude_sum[children].sum(axis=1)
+        depth_sum[level_parents] = depth_sum[children].sum(axis=1)
+        max_magnitude[level_parents] = max_magnitude[children].max(axis=1)
+
+    parent_of = np.full(n_nodes, -1, dtype=np.int64)
+    parent_of[(tree.child_offset[parents][:, None] + np.arange(N_CHILDREN)).ravel()] = np.repeat(parents, N_CHILDREN)
+
+    bounds, aggregates, event_bin_ids = [], [], []
+    for level in range(int(tree.depth.max()) + 1):
+        nodes = _level_nodes(tree, level)
+        bounds.append(np.asarray(tree.bounds[nodes], dtype=np.float64))
+        aggregates.append({
+            'frequency': frequency[nodes],
+            'magnitude_sum': magnitude_sum[nodes],
+            'depth_sum': depth_sum[nodes],
+            'max_magnitude': max_magnitude[nodes]
+        })
+
+        if keep_event_bins:
+            # Climb from each event's leaf to its ancestor at this level
+            position = np.full(n_nodes, -1, dtype=np.int64)
+            position[nodes] = np.arange(len(nodes))
+            ancestor = node_of_event.copy()
+            deep = inside & (tree.depth[np.maximum(ancestor, 0)] > level)
+            while deep.any():
+                ancestor[deep] = parent_of[ancestor[deep]]
+                deep = inside & (tree.depth[np.maximum(ancestor, 0)] > level)
+            event_bin_ids.append(np.where(inside, position[np.maximum(ancestor, 0)], -1))
+
+    logger.info(f"Built bin pyramid: {len(bounds)} levels, "
+                f"{[len(b) for b in bounds]} bins per level, {n_years} years")
+
+    return BinPyramid(year_values, bounds, aggregates, event_bin_ids if keep_event_bins else None)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Columnar Catalog Cache
+
+Stores the normalized output of load_catalog (event DataFrame + CSEP catalog)
+as one .npy file per column so later runs can memory-map it instead of
+re-parsing the raw CSV:
+1. Cache entries are keyed by a SHA-256 of the source file plus loader options
+2. Changing the file or the options produces a new key (automatic invalidation)
+3. Stale entries for the same source file are pruned when a new one is written
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from csep.core.catalogs import CSEPCatalog
+
+from preprocessing.load_catalog import load_catalog
+
+CACHE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+CATALOG_ARRAY_NAME = "catalog.npy"
+
+logger = logging.getLogger(__name__)
+
+
+def file_content_hash(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file's contents.
+
+    Args:
+        filepath: Path to the file
+        chunk_size: Number of bytes read per iteration
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def catalog_cache_key(source_hash: str, loader_options: Dict) -> str:
+    """
+    Build the cache key from the source hash and the loader options.
+
+    Args:
+        source_hash: Content hash of the raw catalog
+        loader_options: Keyword arguments passed to load_catalog
+
+    Returns:
+        Hex digest identifying the cache entry
+    """
+    payload = json.dumps({
+        'version': CACHE_VERSION,
+        'source': source_hash,
+        'options': loader_options
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def default_cache_dir(filepath: str) -> Path:
+    """Default cache location: a hidden directory next to the raw catalog."""
+    return Path(filepath).parent / ".catalog_cache"
+
+
+def _encode_column(series: pd.Series) -> Tuple[np.ndarray, Dict]:
+    """Convert a DataFrame column into a memory-mappable array plus schema entry."""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        values = series.values.astype('datetime64[ns]').astype(np.int64)
+        return values, {'kind': 'datetime', 'tz': str(series.dt.tz)}
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        values = series.values.astype('datetime64[ns]').astype(np.int64)
+        return values, {'kind': 'datetime', 'tz': None}
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(), {'kind': 'numeric'}
+
+    # Object / string columns are stored as fixed-width unicode with a null mask
+    nulls = series.isnull().to_numpy()
+    values = series.where(~nulls, '').astype(str).to_numpy().astype(np.str_)
+    return values, {'kind': 'string', 'dtype': str(series.dtype),
+                    'has_nulls': bool(nulls.any()), 'nulls': nulls}
+
+
+def _decode_column(values: np.ndarray, schema: Dict, nulls: Optional[np.ndarray]):
+    """Rebuild a DataFrame column from its cached array."""
+    if schema['kind'] == 'datetime':
+        column = pd.to_datetime(np.asarray(values).view('datetime64[ns]'))
+        if schema['tz']:
+            column = column.tz_localize('UTC').tz_convert(schema['tz'])
+        return column
+    if schema['kind'] == 'numeric':
+        return values
+    column = pd.Series(values.astype(object))
+    if nulls is not None:
+        column[nulls] = None
+    return column.astype(schema['dtype'])
+
+
+def save_catalog_cache(entry_dir: Path, df: pd.DataFrame, catalog: CSEPCatalog,
+                       manifest: Dict) -> None:
+    """
+    Write a cache entry atomically (temporary directory, then rename).
+
+    Args:
+        entry_dir: Final directory of the cache entry
+        df: Normalized event DataFrame from load_catalog
+        catalog: CSEP catalog built from df
+        manifest: Metadata describing the source and loader options
+    """
+    tmp_dir = entry_dir.parent / f"{entry_dir.name}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        values, schema = _encode_column(df[col])
+        nulls = schema.pop('nulls', None)
+        np.save(tmp_dir / f"col_{i}.npy", values, allow_pickle=False)
+        if schema.get('has_nulls'):
+            np.save(tmp_dir / f"col_{i}_nulls.npy", nulls, allow_pickle=False)
+        columns.append({'name': col, 'file': f"col_{i}.npy", **schema})
+
+    np.save(tmp_dir / CATALOG_ARRAY_NAME, catalog.catalog, allow_pickle=False)
+
+    manifest = dict(manifest, columns=columns, n_events=int(len(df)))
+    with open(tmp_dir / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if entry_dir.exists():
+        shutil.rmtree(entry_dir)
+    tmp_dir.rename(entry_dir)
+
+
+def read_catalog_cache(entry_dir: Path) -> Optional[Tuple[pd.DataFrame, CSEPCatalog]]:
+    """
+    Memory-map a cache entry back into (df, catalog).
+
+    Args:
+        entry_dir: Directory of the cache entry
+
+    Returns:
+        Tuple of (DataFrame, CSEPCatalog), or None if the entry is missing/unreadable
+    """
+    manifest_path = entry_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CACHE_VERSION:
+            return None
+
+        # mmap_mode='c' keeps the pages shared but lets pandas write to its copy
+        data = {}
+        for column in manifest['columns']:
+            values = np.load(entry_dir / column['file'], mmap_mode='c', allow_pickle=False)
+            nulls = None
+            if column.get('has_nulls'):
+                nulls = np.load(entry_dir / column['file'].replace('.npy', '_nulls.npy'))
+            data[column['name']] = _decode_column(values, column, nulls)
+        df = pd.DataFrame(data, copy=False)
+
+        catalog_array = np.load(entry_dir / CATALOG_ARRAY_NAME, mmap_mode='c', allow_pickle=False)
+        catalog = CSEPCatalog(data=catalog_array)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable catalog cache {entry_dir}: {e}")
+        return None
+
+    return df, catalog
+
+
+def _prune_stale_entries(cache_dir: Path, source_name: str, keep: str) -> None:
+    """Remove older cache entries built from the same source file name."""
+    for manifest_path in cache_dir.glob(f"*/{MANIFEST_NAME}"):
+        entry_dir = manifest_path.parent
+        if entry_dir.name == keep:
+            continue
+        try:
+            with open(manifest_path, 'r') as f:
+                source = json.load(f).get('source_name')
+        except (OSError, ValueError):
+            continue
+        if source == source_name:
+            logger.info(f"Removing stale catalog cache: {entry_dir}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def load_catalog_cached(filepath: str, cache_dir: str = None, use_cache: bool = True,
+                        **loader_options) -> Tuple[pd.DataFrame, CSEPCatalog]:
+    """
+    Drop-in replacement for load_catalog backed by the columnar cache.
+
+    Args:
+        filepath: Path to the raw earthquake catalog CSV
+        cache_dir: Cache directory (default: .catalog_cache next to the CSV)
+        use_cache: If False, parse the CSV directly and leave the cache untouched
+        **loader_options: Keyword arguments forwarded to load_catalog
+
+    Returns:
+        Tuple of (DataFrame, CSEPCatalog) as returned by load_catalog
+    """
+    if not use_cache:
+        return load_catalog(filepath, **loader_options)
+
+    cache_root = Path(cache_dir) if cache_dir else default_cache_dir(filepath)
+    source_hash = file_content_hash(filepath)
+    key = catalog_cache_key(source_hash, loader_options)
+    entry_dir = cache_root / key
+
+    cached = read_catalog_cache(entry_dir)
+    if cached is not None:
+        logger.info(f"Loaded catalog from cache: {entry_dir}")
+        return cached
+
+    logger.info(f"Catalog cache miss for {filepath}, parsing CSV")
+    df, catalog = load_catalog(filepath, **loader_options)
+
+    try:
+        cache_root.mkdir(parents=True, exist_ok=True)
+        save_catalog_cache(entry_dir, df, catalog, {
+            'version': CACHE_VERSION,
+            'source_name': Path(filepath).name,
+            'source_hash': source_hash,
+            'loader_options': loader_options
+        })
+        _prune_stale_entries(cache_root, Path(filepath).name, keep=key)
+        logger.info(f"Saved catalog cache: {entry_dir}")
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Could not write catalog cache: {e}")
+        shutil.rmtree(cache_root / f"{key}.tmp", ignore_errors=True)
+
+    return df, catalog
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compact Event Table Schema
+
+Narrow dtypes for the event DataFrame produced by load_catalog:
+- float32 latitude / longitude / depth
+- float16 magnitude (decoded back to the catalog's 0.01 precision on use)
+- int32 id
+- categorical bin_id (applied once bins are assigned)
+- a single int64 time column (origin_time, epoch milliseconds); Date_Time is dropped
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Catalog magnitudes are reported to at most two decimals. float16 spacing is
+# <= 0.0078 below magnitude 16, so rounding recovers the reported value exactly.
+MAGNITUDE_DECIMALS = 2
+
+FLOAT32_COLUMNS = ['latitude', 'longitude', 'depth']
+
+logger = logging.getLogger(__name__)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare per-column memory usage of two versions of the same table.
+
+    Args:
+        before: Original DataFrame
+        after: Compacted DataFrame
+
+    Returns:
+        DataFrame indexed by column with before/after bytes and dtypes, plus a total row
+    """
+    before_bytes = before.memory_usage(deep=True)
+    after_bytes = after.memory_usage(deep=True)
+
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': before_bytes,
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_after': after_bytes
+    }).fillna({'bytes_before': 0, 'bytes_after': 0, 'dtype_before': '-', 'dtype_after': '-'})
+    report.loc['TOTAL'] = ['', before_bytes.sum(), '', after_bytes.sum()]
+
+    return report
+
+
+def apply_compact_schema(df: pd.DataFrame, report: bool = True) -> pd.DataFrame:
+    """
+    Convert an event table to the compact schema.
+
+    Args:
+        df: Event DataFrame in load_catalog format (optionally with bin_id)
+        report: Log a before/after memory report
+
+    Returns:
+        New DataFrame using the compact dtypes
+    """
+    compact = df.drop(columns=['Date_Time'], errors='ignore')
+
+    conversions = {col: np.float32 for col in FLOAT32_COLUMNS if col in compact.columns}
+    if 'magnitude' in compact.columns:
+        conversions['magnitude'] = np.float16
+    if 'id' in compact.columns:
+        conversions['id'] = np.int32
+    if 'origin_time' in compact.columns:
+        conversions['origin_time'] = np.int64
+    compact = compact.astype(conversions)
+
+    if 'bin_id' in compact.columns:
+        compact['bin_id'] = compact['bin_id'].astype('category')
+
+    if report:
+        log_memory_report(memory_report(df, compact))
+
+    return compact
+
+
+def log_memory_report(report: pd.DataFrame) -> None:
+    """Log a memory report produced by memory_report."""
+    total_before = report.loc['TOTAL', 'bytes_before']
+    total_after = report.loc['TOTAL', 'bytes_after']
+    ratio = total_after / total_before if total_before else 0.0
+
+    logger.info("Compact schema memory report:")
+    for col, row in report.drop(index='TOTAL').iterrows():
+        logger.info(f"  {col}: {row['dtype_before']} {int(row['bytes_before']):,} B -> "
+                    f"{row['dtype_after']} {int(row['bytes_after']):,} B")
+    logger.info(f"  Total: {int(total_before):,} B -> {int(total_after):,} B ({ratio:.1%})")
+
+
+def decode_magnitude(magnitudes: pd.Series) -> pd.Series:
+    """Return magnitudes as float64, undoing float16 storage error."""
+    if magnitudes.dtype == np.float16:
+        return magnitudes.astype(np.float64).round(MAGNITUDE_DECIMALS)
+    return magnitudes
+
+
+def event_years(df: pd.DataFrame) -> pd.Series:
+    """UTC year of each event, from Date_Time or, in the compact schema, origin_time."""
+    if 'Date_Time' in df.columns:
+        return df['Date_Time'].dt.year
+    return pd.to_datetime(df['origin_time'], unit='ms', utc=True).dt.year
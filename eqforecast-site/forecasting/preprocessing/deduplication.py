@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Spatio-Temporal Duplicate Event Detection
+
+Overlapping agency catalogs report the same earthquake several times with
+slightly different origin times and epicentres. Instead of an O(n^2) pairwise
+check, events are hashed onto a coarse time x lat x lon grid whose cell size
+equals the matching tolerance, so any duplicate pair lies in the same or a
+neighbouring cell. Only those candidates are compared.
+"""
+
+import itertools
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TIME_TOLERANCE_S = 16.0
+DEFAULT_LAT_TOLERANCE = 0.5
+DEFAULT_LON_TOLERANCE = 0.5
+
+
+def _candidate_pairs(keys: np.ndarray, offset: int):
+    """
+    All (i, j) index pairs where keys[j] == keys[i] + offset.
+
+    Uses one sort plus searchsorted, so cost is linear in the number of events
+    plus the number of candidate pairs.
+    """
+    order = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+
+    targets = keys + offset
+    lo = np.searchsorted(sorted_keys, targets, side='left')
+    hi = np.searchsorted(sorted_keys, targets, side='right')
+    counts = hi - lo
+
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    i = np.repeat(np.arange(len(keys)), counts)
+    starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    j = order[starts + np.arange(total)]
+    return i, j
+
+
+def match_duplicate_pairs(df: pd.DataFrame,
+                          time_tolerance_s: float = DEFAULT_TIME_TOLERANCE_S,
+                          lat_tolerance: float = DEFAULT_LAT_TOLERANCE,
+                          lon_tolerance: float = DEFAULT_LON_TOLERANCE,
+                          magnitude_tolerance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Find all matching event pairs with the hash-grid search.
+
+    Two events match when their origin times differ by at most time_tolerance_s
+    and their latitudes/longitudes by at most the given tolerances (and, if set,
+    magnitudes by at most magnitude_tolerance).
+
+    Args:
+        df: Event table with origin_time (epoch ms), latitude, longitude, magnitude
+        time_tolerance_s: Maximum origin-time difference in seconds
+        lat_tolerance: Maximum latitude difference in degrees
+        lon_tolerance: Maximum longitude difference in degrees
+        magnitude_tolerance: Optional maximum magnitude difference
+
+    Returns:
+        Tuple of (i, j) row positions of the matching pairs (i < j) and the number
+        of candidate pairs compared
+
+    Raises:
+        ValueError: If a time or location tolerance is not positive (they set the
+            hash grid cell size) or magnitude_tolerance is negative
+    """
+    for name, tolerance in (('time_tolerance_s', time_tolerance_s),
+                            ('lat_tolerance', lat_tolerance),
+                            ('lon_tolerance', lon_tolerance)):
+        if not tolerance > 0:
+            raise ValueError(f"{name} must be positive, got {tolerance}")
+    if magnitude_tolerance is not None and not magnitude_tolerance >= 0:
+        raise ValueError(f"magnitude_tolerance must be non-negative, got {magnitude_tolerance}")
+
+    empty = np.empty(0, dtype=np.int64)
+    if len(df) < 2:
+        return empty, empty, 0
+
+    times = df['origin_time'].to_numpy(np.int64)
+    lats = df['latitude'].to_numpy(np.float64)
+    lons = df['longitude'].to_numpy(np.float64)
+    mags = df['magnitude'].to_numpy(np.float64)
+    time_tolerance_ms = time_tolerance_s * 1000.0
+
+    # Hash grid with cell size == tolerance
+    t_idx = np.floor((times - times.min()) / time_tolerance_ms).astype(np.int64)
+    lat_idx = np.floor((lats - lats.min()) / lat_tolerance).astype(np.int64)
+    lon_idx = np.floor((lons - lons.min()) / lon_tolerance).astype(np.int64)
+    n_lat = int(lat_idx.max()) + 3
+    n_lon = int(lon_idx.max()) + 3
+    keys = (t_idx * n_lat + lat_idx) * n_lon + lon_idx
+
+    pairs_i, pairs_j = [], []
+    n_candidates = 0
+    for dt, dlat, dlon in itertools.product((-1, 0, 1), repeat=3):
+        offset = (dt * n_lat + dlat) * n_lon + dlon
+        i, j = _candidate_pairs(keys, offset)
+        n_candidates += len(i)
+
+        match = (
+            (i < j) &
+            (np.abs(times[i] - times[j]) <= time_tolerance_ms) &
+            (np.abs(lats[i] - lats[j]) <= lat_tolerance) &
+            (np.abs(lons[i] - lons[j]) <= lon_tolerance)
+        )
+        if magnitude_tolerance is not None:
+            match &= np.abs(mags[i] - mags[j]) <= magnitude_tolerance
+
+        pairs_i.append(i[match])
+        pairs_j.append(j[match])
+
+    return np.concatenate(pairs_i), np.concatenate(pairs_j), n_candidates
+
+
+def find_duplicate_events(df: pd.DataFrame,
+                          time_tolerance_s: float = DEFAULT_TIME_TOLERANCE_S,
+                          lat_tolerance: float = DEFAULT_LAT_TOLERANCE,
+                          lon_tolerance: float = DEFAULT_LON_TOLERANCE,
+                          magnitude_tolerance: Optional[float] = None) -> np.ndarray:
+    """
+    Flag events that duplicate an earlier event of the table.
+
+    Events match as in match_duplicate_pairs. Rows are resolved in table order:
+    an event is a duplicate if it matches an earlier event that was kept.
+
+    Args:
+        df: Event table with origin_time (epoch ms), latitude, longitude, magnitude
+        time_tolerance_s: Maximum origin-time difference in seconds
+        lat_tolerance: Maximum latitude difference in degrees
+        lon_tolerance: Maximum longitude difference in degrees
+        magnitude_tolerance: Optional maximum magnitude difference
+
+    Returns:
+        Boolean array, True for rows to drop
+
+    Raises:
+        ValueError: If a tolerance is invalid (see match_duplicate_pairs)
+    """
+    pairs_i, pairs_j, _ = match_duplicate_pairs(
+        df, time_tolerance_s, lat_tolerance, lon_tolerance, magnitude_tolerance
+    )
+
+    duplicate = np.zeros(len(df), dtype=bool)
+    if len(pairs_i) == 0:
+        return duplicate
+
+    # Resolve in table order: j is dropped only if it matches a kept earlier event.
+    # Loops over matched pairs only, which is small compared to the catalog.
+    pair_order = np.lexsort((pairs_i, pairs_j))
+    for i, j in zip(pairs_i[pair_order], pairs_j[pair_order]):
+        if not duplicate[i]:
+            duplicate[j] = True
+
+    return duplicate
@@ -9,14 +9,43 @@ Implements the rule-based algorithm for:
 4. Preparing data for LSTM training
 """
 
+import json
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime
 from typing import Tuple, Dict, List
 import logging
 from pathlib import Path
 
-from binning.quadtree import QuadtreeBinner
+from binning.quadtree import QuadtreeBinner, BIN_SCHEME_FILE
+from preprocessing.streaming_reader import (
+    stream_annual_statistics, partial_annual_aggregates, finalize_partial_aggregates,
+    DEFAULT_CHUNKSIZE
+)
+from preprocessing.incremental_state import (
+    load_incremental_state, save_incremental_state, update_partial_aggregates
+)
+from preprocessing.compact_schema import decode_magnitude, event_years
+from preprocessing.deduplication import DEFAULT_TIME_TOLERANCE_S, find_duplicate_events
+from preprocessing.bin_pyramid import BinPyramid, build_bin_pyramid
+from preprocessing.lstm_artifact import PANEL_FEATURES, lstm_artifact_paths, save_lstm_artifact
+from preprocessing.stage_cache import StageCache, frame_hash, stage_key
+
+BIN_PYRAMID_FILE = "bin_pyramid.npz"
+
+# Visualizations written next to the processed catalog by process_catalog
+QUADTREE_PLOT_FILE = "quadtree_bins_visualization.png"
+QUADTREE_COMPARISON_FILE = "quadtree_comparison.png"
+
+# Records which cached stage results the files next to save_path were written from
+PREPROCESS_STAMP_FILE = "preprocess_stamp.json"
+
+# Per-year features carried by LSTM windows
+LSTM_FEATURES = ['max_magnitude', 'frequency']
+
+# How LSTM-ready data is written: the exploded CSV or the binary panel (lstm_artifact)
+LSTM_FORMATS = ('csv', 'binary')
 
 
 class EarthquakeProcessor:
@@ -30,9 +59,42 @@ class EarthquakeProcessor:
     - Prepares data for LSTM training with 10-year lookback
     """
     
-    def __init__(self, min_depth: float = 70.0):
-        """Initialize the EarthquakeProcessor."""
+    def __init__(self, min_depth: float = 70.0, compact_schema: bool = False,
+                 deduplicate: bool = False, dedup_tolerances: Dict = None,
+                 bin_scheme_path: str = None, bin_pyramid: bool = False, lstm_format: str = 'csv',
+                 stage_cache_dir: str = None):
+        """
+        Initialize the EarthquakeProcessor.
+        
+        Args:
+            min_depth: Depth threshold (km) for shallow earthquakes
+            compact_schema: Keep the compact event schema (categorical bin_id, float16 magnitude)
+            deduplicate: Remove duplicate reports of the same event before depth filtering
+            dedup_tolerances: Optional overrides for find_duplicate_events (time_tolerance_s,
+                lat_tolerance, lon_tolerance, magnitude_tolerance)
+            bin_scheme_path: Optional frozen bin scheme (QuadtreeBinner.save) to assign events
+                to instead of building and merging a new quadtree
+            bin_pyramid: Also save per-level quadtree bins and annual aggregates (bin_pyramid.npz);
+                not available with bin_scheme_path, whose bins the pyramid's tree would not match,
+                or with incremental processing, which does not update the pyramid
+            lstm_format: 'csv' for *_lstm_ready.csv (one row per window and year) or
+                'binary' for the memory-mappable *_lstm_ready.json/.npy dataset
+            stage_cache_dir: Optional directory of the content-addressed stage cache; when set,
+                process_catalog reuses stage outputs (and skips writing unchanged outputs)
+        """
+        if lstm_format not in LSTM_FORMATS:
+            raise ValueError(f"lstm_format must be one of {LSTM_FORMATS}, got {lstm_format!r}")
+        if bin_pyramid and bin_scheme_path:
+            raise ValueError("bin_pyramid cannot be combined with bin_scheme_path: the pyramid builds a "
+                             "new quadtree whose finest level would not match the frozen scheme's leaves")
+        
         self.min_depth = min_depth
+        self.compact_schema = compact_schema
+        self.deduplicate = deduplicate
+        self.dedup_tolerances = dedup_tolerances or {}
+        self.bin_pyramid = bin_pyramid
+        self.lstm_format = lstm_format
+        self.stage_cache_dir = stage_cache_dir
         # Adaptive quadtree parameters for proper spatial binning
         # Custom bounds to include bottom-right bin with 10 earthquakes and allow left edge merging
         # Expanded boundaries for better coverage and merging
@@ -47,6 +109,11 @@ class EarthquakeProcessor:
         )
         self.logger = logging.getLogger(__name__)
         
+        self.bin_scheme_path = bin_scheme_path
+        if bin_scheme_path:
+            self.quadtree_binner = QuadtreeBinner.load(bin_scheme_path)
+            self.logger.info(f"Loaded frozen bin scheme with {self.quadtree_binner.get_bin_count()} bins from: {bin_scheme_path}")
+        
         # Column mapping for different naming conventions
         self.column_mapping = {
             'depth': ['depth', 'Depth', 'DEPTH'],
@@ -81,6 +148,50 @@ class EarthquakeProcessor:
         available_cols = list(df.columns)
         raise ValueError(f"Column '{target_col}' not found. Available columns: {available_cols}")
         
+    def remove_duplicate_events(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Remove duplicate reports of the same earthquake (e.g. from merged agency catalogs).
+        
+        Args:
+            df: DataFrame in load_catalog format (needs origin_time)
+            
+        Returns:
+            DataFrame keeping the first report of each event
+        """
+        self.logger.info(f"Removing duplicate events (tolerances: {self.dedup_tolerances or 'defaults'})")
+        
+        lat_col = self._get_column_name(df, 'latitude')
+        lon_col = self._get_column_name(df, 'longitude')
+        mag_col = self._get_column_name(df, 'magnitude')
+        events = df[['origin_time', lat_col, lon_col, mag_col]].rename(
+            columns={lat_col: 'latitude', lon_col: 'longitude', mag_col: 'magnitude'}
+        )
+        duplicate = find_duplicate_events(events, **self.dedup_tolerances)
+        
+        self.logger.info(f"Duplicate events removed: {int(duplicate.sum())} of {len(df)}")
+        
+        return df[~duplicate]
+    
+    def _remove_new_duplicate_events(self, df: pd.DataFrame, high_water_mark: int) -> pd.DataFrame:
+        """
+        Remove duplicates among the events past the high-water mark.
+        
+        Events already ingested within the time tolerance before the high-water mark
+        take part in the matching, so a re-report arriving just after it is dropped
+        as in a full run.
+        
+        Args:
+            df: Full catalog in load_catalog format
+            high_water_mark: Largest origin_time already ingested
+            
+        Returns:
+            Events past the high-water mark without duplicates
+        """
+        time_tolerance_ms = self.dedup_tolerances.get('time_tolerance_s', DEFAULT_TIME_TOLERANCE_S) * 1000.0
+        window = df[df['origin_time'] > high_water_mark - time_tolerance_ms]
+        kept = self.remove_duplicate_events(window)
+        return kept[kept['origin_time'] > high_water_mark]
+    
     def filter_shallow_earthquakes(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Filter earthquakes to only include shallow ones (<70km depth).
@@ -122,12 +233,21 @@ class EarthquakeProcessor:
         
         # Create quadtree bins
         df_with_bins = df.copy()
-        # Use non-overlapping bins for better spatial separation
-        bin_ids = self.quadtree_binner.assign_bins(
-            df[lat_col].values, 
-            df[lon_col].values
-        )
+        if self.bin_scheme_path:
+            # Frozen scheme: assign only, no rebuild or re-merge
+            bin_ids = self.quadtree_binner.assign_existing_bins(
+                df[lat_col].values,
+                df[lon_col].values
+            )
+        else:
+            # Use non-overlapping bins for better spatial separation
+            bin_ids = self.quadtree_binner.assign_bins(
+                df[lat_col].values, 
+                df[lon_col].values
+            )
         df_with_bins['bin_id'] = bin_ids
+        if self.compact_schema:
+            df_with_bins['bin_id'] = df_with_bins['bin_id'].astype('category')
         
         # Debug: Check bin ID distribution
         unique_bins = df_with_bins['bin_id'].nunique()
@@ -138,10 +258,65 @@ class EarthquakeProcessor:
         
         return df_with_bins
     
+    def build_bin_pyramid(self, df: pd.DataFrame) -> BinPyramid:
+        """
+        Build the multi-resolution bin pyramid of the quadtree for shallow events.
+        
+        Uses the same root and limits as the quadtree binner, so the finest level
+        equals the unmerged quadtree leaves. Coarser levels are aggregated from
+        their children.
+        
+        Args:
+            df: Shallow-filtered earthquake data
+            
+        Returns:
+            BinPyramid with per-level bins and annual aggregates
+        """
+        lats = df[self._get_column_name(df, 'latitude')].to_numpy()
+        lons = df[self._get_column_name(df, 'longitude')].to_numpy()
+        magnitudes = decode_magnitude(df[self._get_column_name(df, 'magnitude')]).to_numpy(np.float64)
+        depths = df[self._get_column_name(df, 'depth')].to_numpy(np.float64)
+        
+        binner = self.quadtree_binner
+        if binner.custom_bounds:
+            root_bounds = binner.custom_bounds
+        else:
+            root_bounds = (np.min(lons), np.max(lons), np.min(lats), np.max(lats))
+        
+        return build_bin_pyramid(
+            lats, lons, event_years(df).to_numpy(), magnitudes, depths,
+            root_bounds, binner.max_depth, binner.min_events, keep_event_bins=False
+        )
+    
+    def _annual_years(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Year of every event, from Date_Time, the Year column, the compact schema's
+        origin_time or an existing year column (in that order).
+        
+        Args:
+            df: DataFrame with earthquake data
+            
+        Returns:
+            Series of years aligned with df
+        """
+        if 'Date_Time' in df.columns:
+            return df['Date_Time'].dt.year
+        if 'Year' in df.columns and 'Month' in df.columns and 'Day' in df.columns:
+            return df['Year']
+        if 'origin_time' in df.columns:
+            # Compact schema keeps only the int64 epoch time
+            return event_years(df)
+        if 'year' in df.columns:
+            return df['year']
+        raise ValueError("DataFrame has no Date_Time, Year, origin_time or year column")
+    
     def compute_annual_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Compute annual statistics for each quadtree bin.
         
+        The input is not modified, so this can be called on any slice or chunk of a
+        binned catalog.
+        
         Args:
             df: DataFrame with earthquake data and bin_id
             
@@ -154,28 +329,25 @@ class EarthquakeProcessor:
         if 'bin_id' not in df.columns:
             raise ValueError("DataFrame must have 'bin_id' column from classify_quadtree_bins")
         
-        # Extract year from Date_Time column first
-        if 'Date_Time' in df.columns:
-            df['year'] = df['Date_Time'].dt.year
-        elif 'Year' in df.columns and 'Month' in df.columns and 'Day' in df.columns:
-            df['year'] = df['Year']
-        
-        # Now get the actual column names (year should exist now)
         mag_col = self._get_column_name(df, 'magnitude')
         depth_col = self._get_column_name(df, 'depth')
         
-        # Group by year and bin_id, compute statistics
-        annual_stats = df.groupby(['year', 'bin_id']).agg({
-            mag_col: ['max', 'mean'],
-            depth_col: 'mean'
-        }).reset_index()
-        
-        # Flatten column names
-        annual_stats.columns = ['year', 'bin_id', 'max_magnitude', 'avg_magnitude', 'avg_depth']
-        
-        # Add frequency (count of earthquakes per year per bin)
-        frequency = df.groupby(['year', 'bin_id']).size().reset_index(name='frequency')
-        annual_stats = annual_stats.merge(frequency, on=['year', 'bin_id'])
+        # Event table for the aggregation only; the caller's DataFrame is never modified
+        events = pd.DataFrame({
+            'year': self._annual_years(df),
+            'bin_id': df['bin_id'],
+            'magnitude': decode_magnitude(df[mag_col]),
+            'depth': df[depth_col]
+        }, index=df.index)
+        
+        # All statistics in one grouped pass
+        # (observed=True: a categorical bin_id must not expand to all year x bin pairs)
+        annual_stats = events.groupby(['year', 'bin_id'], observed=True).agg(
+            max_magnitude=('magnitude', 'max'),
+            avg_magnitude=('magnitude', 'mean'),
+            avg_depth=('depth', 'mean'),
+            frequency=('magnitude', 'size')
+        ).reset_index()
         
         # Sort by year and bin_id
         annual_stats = annual_stats.sort_values(['year', 'bin_id']).reset_index(drop=True)
@@ -205,61 +377,49 @@ class EarthquakeProcessor:
         # Get overall year range
         min_year = annual_stats['year'].min()
         max_year = annual_stats['year'].max()
-        unique_bins = annual_stats['bin_id'].unique()
-        
-        # Create complete year-bin combinations
         all_years = list(range(min_year, max_year + 1))
-        filled_data = []
         
-        for bin_id in unique_bins:
-            bin_data = annual_stats[annual_stats['bin_id'] == bin_id].copy()
-            bin_data = bin_data.sort_values('year').reset_index(drop=True)
-            
-            # Create complete timeline for this bin
-            for year in all_years:
-                existing_row = bin_data[bin_data['year'] == year]
-                
-                if not existing_row.empty:
-                    # Year exists, use actual data
-                    filled_data.append(existing_row.iloc[0].to_dict())
-                else:
-                    # Year missing, need to fill
-                    # Find the last non-zero value before this year
-                    previous_data = bin_data[bin_data['year'] < year]
-                    
-                    if not previous_data.empty:
-                        # Use forward-fill: copy the last available values
-                        last_row = previous_data.iloc[-1].to_dict()
-                        last_row['year'] = year  # Update year to current
-                        
-                        # Apply zero-filling logic from paper:
-                        # "zero values were filled with a value equal to the last non-zero value"
-                        # Only fill if the last value was non-zero for frequency
-                        if last_row.get('frequency', 0) > 0:
-                            filled_data.append(last_row)
-                        else:
-                            # If last value was also zero, create minimal entry
-                            filled_data.append({
-                                'year': year,
-                                'bin_id': bin_id,
-                                'max_magnitude': 0.0,
-                                'avg_magnitude': 0.0,
-                                'avg_depth': last_row.get('avg_depth', 10.0),  # Use reasonable default
-                                'frequency': 0
-                            })
-                    else:
-                        # No previous data available, create minimal entry
-                        filled_data.append({
-                            'year': year,
-                            'bin_id': bin_id,
-                            'max_magnitude': 0.0,
-                            'avg_magnitude': 0.0,
-                            'avg_depth': 10.0,  # Default shallow depth
-                            'frequency': 0
-                        })
-        
-        # Convert back to DataFrame
-        filled_df = pd.DataFrame(filled_data)
+        # Aggregated tables hold one row per (bin, year); repeated pairs would break the reindex
+        observed = annual_stats.drop_duplicates(['bin_id', 'year']).reset_index(drop=True)
+        observed_index = pd.MultiIndex.from_frame(observed[['bin_id', 'year']])
+        
+        # Complete timeline of every bin: position of the observed row for each (bin, year),
+        # and forward-filled within each bin the last observed row at or before that year
+        full_index = pd.MultiIndex.from_product([observed['bin_id'].unique(), all_years],
+                                                names=['bin_id', 'year'])
+        row = pd.Series(np.arange(len(observed), dtype=np.float64), index=observed_index).reindex(full_index)
+        last_row = row.groupby(level='bin_id', sort=False, observed=True).ffill().to_numpy()
+        
+        exists = ~np.isnan(row.to_numpy())
+        has_previous = ~np.isnan(last_row)
+        
+        # Missing years copy the last observed row, with the year updated
+        filled_df = observed.iloc[np.where(has_previous, last_row, 0).astype(np.int64)].reset_index(drop=True)
+        filled_df['bin_id'] = full_index.get_level_values('bin_id')
+        filled_df['year'] = full_index.get_level_values('year')
+        
+        # Apply zero-filling logic from paper:
+        # "zero values were filled with a value equal to the last non-zero value"
+        # Only fill if the last value was non-zero for frequency; otherwise create a minimal
+        # entry (keeping the last avg_depth), or with no previous data a default shallow one
+        minimal = ~exists & ~(has_previous & (filled_df['frequency'].to_numpy() > 0))
+        if minimal.any():
+            extra_columns = filled_df.columns.difference(
+                ['year', 'bin_id', 'max_magnitude', 'avg_magnitude', 'avg_depth', 'frequency'])
+            filled_df = filled_df.astype({col: object for col in extra_columns})
+            filled_df.loc[minimal, extra_columns] = np.nan
+            filled_df = filled_df.astype({'max_magnitude': np.float64, 'avg_magnitude': np.float64,
+                                          'avg_depth': np.float64})
+            filled_df.loc[minimal, ['max_magnitude', 'avg_magnitude']] = 0.0
+            filled_df.loc[minimal & ~has_previous, 'avg_depth'] = 10.0  # Default shallow depth
+            filled_df['frequency'] = filled_df['frequency'].where(~minimal, 0)
+        
+        # Rows used to be rebuilt from dicts of each row's values, which upcasts numeric
+        # rows to float64 (mixed dtypes such as a categorical bin_id stay per-column)
+        if annual_stats.iloc[:0].to_numpy().dtype == object:
+            filled_df = filled_df.astype(object).infer_objects()
+        else:
+            filled_df = filled_df.astype(np.float64)
         filled_df = filled_df.sort_values(['year', 'bin_id']).reset_index(drop=True)
         
         original_rows = len(annual_stats)
@@ -268,17 +428,25 @@ class EarthquakeProcessor:
         
         return filled_df
     
-    def prepare_lstm_data(self, annual_stats: pd.DataFrame, lookback_years: int = 10) -> pd.DataFrame:
+    def prepare_lstm_data(self, annual_stats: pd.DataFrame, lookback_years: int = 10,
+                          dense: bool = False, features: List[str] = None):
         """
         Prepare data for LSTM training with sliding window approach.
         
         Args:
             annual_stats: DataFrame with annual statistics per bin
             lookback_years: Number of years to look back (default: 10)
+            dense: Return the dense tensor and window views of prepare_lstm_tensor
+                instead of a list of per-window samples
+            features: Per-year features for dense mode (default: LSTM_FEATURES)
             
         Returns:
-            DataFrame ready for LSTM training
+            List of per-window samples ready for LSTM training, or the
+            prepare_lstm_tensor dict in dense mode
         """
+        if dense:
+            return self.prepare_lstm_tensor(annual_stats, lookback_years, features)
+        
         self.logger.info(f"Preparing LSTM data with {lookback_years}-year lookback")
         
         # Get unique bins
@@ -322,52 +490,414 @@ class EarthquakeProcessor:
         self.logger.info(f"Created {len(lstm_data)} LSTM training samples")
         return lstm_data
     
-    def process_catalog(self, df: pd.DataFrame, save_path: str = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def prepare_lstm_tensor(self, annual_stats: pd.DataFrame, lookback_years: int = 10,
+                            features: List[str] = None) -> Dict:
+        """
+        Pivot annual statistics into a dense [bins, years, features] array with
+        sliding-window views over it.
+        
+        Bins keep their order of first appearance (as in prepare_lstm_data) and years
+        span the full range of the table. Windows are views into the dense array, so no
+        per-window copies are made: window w of bin b covers years[w:w + lookback_years]
+        and its target is years[w + lookback_years]. On a complete (zero-filled)
+        timeline the windows match the samples of prepare_lstm_data.
+        
+        Args:
+            annual_stats: DataFrame with annual statistics per bin
+            lookback_years: Number of years to look back (default: 10)
+            features: Per-year feature columns (default: LSTM_FEATURES)
+            
+        Returns:
+            Dict with bin_ids, years, features, values [bins, years, features] (nan
+            where a (bin, year) has no row), observed [bins, years] mask, inputs
+            [bins, windows, lookback, features], targets [bins, windows, features]
+            and target_years [windows]
+        """
+        features = list(features or LSTM_FEATURES)
+        self.logger.info(f"Preparing dense LSTM tensor with {lookback_years}-year lookback")
+        
+        bin_idx, bin_ids = pd.factorize(annual_stats['bin_id'])
+        year_values = annual_stats['year'].to_numpy().astype(np.int64)
+        min_year = year_values.min()
+        years = np.arange(min_year, year_values.max() + 1)
+        year_idx = year_values - min_year
+        
+        values = np.full((len(bin_ids), len(years), len(features)), np.nan)
+        values[bin_idx, year_idx] = annual_stats[features].to_numpy(np.float64)
+        observed = np.zeros((len(bin_ids), len(years)), dtype=bool)
+        observed[bin_idx, year_idx] = True
+        
+        # Windows never include the final year as input, which only serves as a target
+        n_windows = max(len(years) - lookback_years, 0)
+        if n_windows:
+            inputs = sliding_window_view(values[:, :-1], lookback_years, axis=1)
+        else:
+            inputs = np.empty((len(bin_ids), 0, len(features), lookback_years))
+        inputs = np.moveaxis(inputs, -1, 2)
+        
+        self.logger.info(f"Created {len(bin_ids) * n_windows} LSTM windows "
+                         f"({len(bin_ids)} bins x {n_windows} windows)")
+        
+        return {
+            'bin_ids': np.asarray(bin_ids),
+            'years': years,
+            'features': features,
+            'values': values,
+            'observed': observed,
+            'inputs': inputs,
+            'targets': values[:, lookback_years:],
+            'target_years': years[lookback_years:]
+        }
+    
+    def _lstm_ready_frame(self, annual_stats: pd.DataFrame, lookback_years: int = 10) -> pd.DataFrame:
+        """
+        One row per (window, input year) in the _lstm_ready.csv layout.
+        
+        Built from the dense windows when every bin has every year (the zero-filled
+        case), otherwise from the per-window samples of prepare_lstm_data.
+        """
+        tensor = self.prepare_lstm_tensor(annual_stats, lookback_years)
+        row_dtype = annual_stats.iloc[:0].to_numpy().dtype
+        
+        if tensor['observed'].all() and len(annual_stats) == tensor['observed'].size and row_dtype.kind == 'f':
+            inputs, targets = tensor['inputs'], tensor['targets']
+            n_bins, n_windows = inputs.shape[:2]
+            years = tensor['years'].astype(row_dtype)
+            window_years = sliding_window_view(years[:-1], lookback_years) if n_windows else np.empty((0, lookback_years))
+            
+            # Only the output rows are materialized; values were upcast to the row dtype by iterrows
+            rows_per_bin = n_windows * lookback_years
+            return pd.DataFrame({
+                'bin_id': np.repeat(tensor['bin_ids'], rows_per_bin),
+                'year': np.tile(window_years.ravel(), n_bins),
+                'max_magnitude': inputs[..., 0].ravel(),
+                'frequency': inputs[..., 1].ravel(),
+                'target_year': np.tile(np.repeat(tensor['target_years'].astype(row_dtype), lookback_years), n_bins),
+                'target_max_magnitude': np.repeat(targets[..., 0].ravel(), lookback_years),
+                'target_frequency': np.repeat(targets[..., 1].ravel(), lookback_years)
+            })
+        
+        lstm_df = []
+        for item in self.prepare_lstm_data(annual_stats, lookback_years):
+            for seq_item in item['input_sequence']:
+                lstm_df.append({
+                    'bin_id': seq_item['bin_id'],
+                    'year': seq_item['year'],
+                    'max_magnitude': seq_item['max_magnitude'],
+                    'frequency': seq_item['frequency'],
+                    'target_year': item['target_year'],
+                    'target_max_magnitude': item['target_max_magnitude'],
+                    'target_frequency': item['target_frequency']
+                })
+        return pd.DataFrame(lstm_df)
+    
+    def process_catalog(self, df: pd.DataFrame, save_path: str = None,
+                        incremental: bool = False, state_dir: str = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Complete processing pipeline for earthquake catalog.
         
+        In incremental mode the last ingested origin_time, the bin scheme and the
+        additive annual aggregates are persisted in state_dir. Later calls only
+        process events past the high-water mark, assign them to the stored bins
+        and update the affected (year, bin_id) rows. The first incremental call
+        (no state yet) runs the full pipeline and writes the state.
+        
+        With a stage cache, each stage (shallow filter, binning, annual statistics)
+        is reused when the input catalog and that stage's parameters are unchanged,
+        and the saved files and plots are only rewritten when they are out of date.
+        
         Args:
-            df: Raw earthquake catalog DataFrame
+            df: Raw earthquake catalog DataFrame (load_catalog format for incremental mode)
             save_path: Optional path to save processed data
+            incremental: Enable high-water-mark incremental ingestion
+            state_dir: Directory for the incremental state (default: next to save_path)
             
         Returns:
-            Tuple of (processed_catalog, annual_statistics)
+            Tuple of (processed_catalog, annual_statistics); in an incremental
+            update, processed_catalog holds only the newly ingested events
+            
+        Raises:
+            ValueError: If incremental is combined with bin_pyramid (updates would leave
+                the pyramid's annual statistics behind the saved annual statistics)
         """
-        self.logger.info("Starting complete earthquake catalog processing")
-        
-        # Step 1: Filter shallow earthquakes
-        shallow_df = self.filter_shallow_earthquakes(df)
+        if incremental and self.bin_pyramid:
+            raise ValueError("bin_pyramid cannot be combined with incremental processing: "
+                             "incremental updates do not rebuild the pyramid")
         
-        # Step 2: Classify into quadtree bins
-        binned_df = self.classify_quadtree_bins(shallow_df)
+        if incremental:
+            state_dir = self._resolve_state_dir(save_path, state_dir)
+            state = load_incremental_state(state_dir, self)
+            if state is not None:
+                return self._process_catalog_incremental(df, save_path, state_dir, state)
+            self.logger.info("No incremental state found, running full processing")
         
-        # Step 3: Standardize column names for processed data
-        binned_df = self._standardize_columns(binned_df)
+        self.logger.info("Starting complete earthquake catalog processing")
         
-        # Step 4: Compute annual statistics
-        annual_stats = self.compute_annual_statistics(binned_df)
+        shallow_df, binned_df, annual_stats, annual_key = self._run_catalog_stages(df)
         
         # Step 5: Save processed data if path provided
-        if save_path:
+        outputs_key = None
+        if save_path and annual_key:
+            outputs_key = stage_key('outputs', annual_key, {
+                'save_path': Path(save_path).name,
+                'lstm_format': self.lstm_format,
+                'bin_pyramid': self.bin_pyramid
+            })
+        
+        if save_path and outputs_key and self._outputs_up_to_date(save_path, outputs_key):
+            self.logger.info(f"Processed outputs in {Path(save_path).parent} are up to date, skipping save")
+        elif save_path:
             self.save_processed_data(binned_df, annual_stats, save_path)
+            self.quadtree_binner.save(Path(save_path).parent / BIN_SCHEME_FILE)
+            
+            if self.bin_pyramid:
+                self.build_bin_pyramid(shallow_df).save(Path(save_path).parent / BIN_PYRAMID_FILE)
             
             # Step 6: Create and save quadtree visualizations
+            plot_path = Path(save_path).parent / QUADTREE_PLOT_FILE
+            comparison_path = Path(save_path).parent / QUADTREE_COMPARISON_FILE
+            # Stale plots must not pass for this run's output if plotting fails
+            plot_path.unlink(missing_ok=True)
+            comparison_path.unlink(missing_ok=True)
             try:
                 # Create regular quadtree visualization
-                plot_path = Path(save_path).parent / "quadtree_bins_visualization.png"
                 self.plot_quadtree_bins(binned_df, str(plot_path))
                 self.logger.info("Generated quadtree bins visualization")
                 
                 # Create comparison visualization (unmerged vs merged)
-                comparison_path = Path(save_path).parent / "quadtree_comparison.png"
                 self.plot_quadtree_comparison(binned_df, str(comparison_path))
                 self.logger.info("Generated quadtree comparison visualization")
                 
             except Exception as e:
                 self.logger.warning(f"Could not generate visualizations: {e}")
+            
+            # The plotting methods log their own errors, so check that both files were written;
+            # without the stamp the next run writes all outputs again
+            plots_written = plot_path.exists() and comparison_path.exists()
+            if outputs_key and not plots_written:
+                self.logger.warning("Visualizations missing, outputs will be rewritten on the next run")
+            if outputs_key and plots_written:
+                with open(Path(save_path).parent / PREPROCESS_STAMP_FILE, 'w') as f:
+                    json.dump({
+                        'key': outputs_key,
+                        'save_path': Path(save_path).name,
+                        'files': self._output_files(save_path)
+                    }, f, indent=2)
+        
+        if incremental:
+            partial = partial_annual_aggregates(binned_df, binned_df['bin_id'].to_numpy(), self)
+            save_incremental_state(state_dir, self, df['origin_time'].max(), partial)
+        
+        return binned_df, annual_stats
+    
+    def _stage_keys(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Stage cache keys: input catalog hash chained with each stage's parameters."""
+        binner = self.quadtree_binner
+        shallow_key = stage_key('shallow', frame_hash(df), {
+            'min_depth': self.min_depth,
+            'compact_schema': self.compact_schema,
+            'deduplicate': self.deduplicate,
+            'dedup_tolerances': self.dedup_tolerances
+        })
+        binned_key = stage_key('binned', shallow_key, {
+            'quadtree': binner.get_params(),
+            # A frozen scheme is identified by its bins rather than by the build parameters
+            'bin_scheme': [binner.bounds, binner.bin_ids] if self.bin_scheme_path else None
+        })
+        return {
+            'shallow': shallow_key,
+            'binned': binned_key,
+            'annual': stage_key('annual', binned_key, {})
+        }
+    
+    def _run_catalog_stages(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, str]:
+        """
+        Steps 0-4 of process_catalog, reusing stage cache entries when enabled.
+        
+        Args:
+            df: Raw earthquake catalog DataFrame
+            
+        Returns:
+            Tuple of (shallow events, binned catalog, annual statistics, annual stage key
+            or None without a stage cache)
+        """
+        cache = StageCache(self.stage_cache_dir) if self.stage_cache_dir else None
+        keys = self._stage_keys(df) if cache else {}
+        
+        entry = cache.load('shallow', keys['shallow']) if cache else None
+        if entry is not None:
+            shallow_df = entry['events']
+        else:
+            # Step 0: Drop duplicate reports of the same event
+            events_df = self.remove_duplicate_events(df) if self.deduplicate else df
+            
+            # Step 1: Filter shallow earthquakes
+            shallow_df = self.filter_shallow_earthquakes(events_df)
+            if cache:
+                cache.save('shallow', keys['shallow'], {'events': shallow_df})
+        
+        entry = cache.load('binned', keys['binned']) if cache else None
+        if entry is not None:
+            binned_df = entry['catalog']
+            self.quadtree_binner = QuadtreeBinner.load(entry['entry_dir'] / BIN_SCHEME_FILE)
+        else:
+            # Step 2: Classify into quadtree bins
+            binned_df = self.classify_quadtree_bins(shallow_df)
+            
+            # Step 3: Standardize column names for processed data
+            binned_df = self._standardize_columns(binned_df)
+            
+            # The processed catalog keeps each event's year
+            binned_df['year'] = self._annual_years(binned_df)
+            if cache:
+                cache.save('binned', keys['binned'], {'catalog': binned_df},
+                           lambda entry_dir: self.quadtree_binner.save(entry_dir / BIN_SCHEME_FILE))
+        
+        # Step 4: Compute annual statistics
+        entry = cache.load('annual', keys['annual']) if cache else None
+        if entry is not None:
+            annual_stats = entry['annual_stats']
+        else:
+            annual_stats = self.compute_annual_statistics(binned_df)
+            if cache:
+                cache.save('annual', keys['annual'], {'annual_stats': annual_stats})
+        
+        return shallow_df, binned_df, annual_stats, keys.get('annual')
+    
+    def _output_files(self, save_path: str) -> List[str]:
+        """Names of the files process_catalog writes next to save_path."""
+        stem = Path(save_path).stem
+        files = [Path(save_path).name, f"{stem}_annual_stats.csv"]
+        if self.lstm_format == 'binary':
+            paths = lstm_artifact_paths(f"{stem}_lstm_ready.json")
+            files += [paths['header'].name, paths['panel'].name, paths['windows'].name]
+        else:
+            files.append(f"{stem}_lstm_ready.csv")
+        files.append(BIN_SCHEME_FILE)
+        if self.bin_pyramid:
+            files.append(BIN_PYRAMID_FILE)
+        files += [QUADTREE_PLOT_FILE, QUADTREE_COMPARISON_FILE]
+        return files
+    
+    def _outputs_up_to_date(self, save_path: str, outputs_key: str) -> bool:
+        """True if the files next to save_path were written from the same stage results and all still exist."""
+        save_dir = Path(save_path).parent
+        stamp_path = save_dir / PREPROCESS_STAMP_FILE
+        if not stamp_path.exists():
+            return False
+        try:
+            with open(stamp_path, 'r') as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        files = self._output_files(save_path)
+        if stamp.get('key') != outputs_key or stamp.get('files') != files:
+            return False
+        return all((save_dir / name).exists() for name in files)
+    
+    def _resolve_state_dir(self, save_path: str, state_dir: str) -> str:
+        """Default the incremental state directory to sit next to the processed outputs."""
+        if state_dir:
+            return state_dir
+        if save_path:
+            return str(Path(save_path).parent / "incremental_state")
+        raise ValueError("Incremental processing requires save_path or state_dir")
+    
+    def _process_catalog_incremental(self, df: pd.DataFrame, save_path: str, state_dir: str,
+                                     state: Dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Ingest only events newer than the stored high-water mark.
+        
+        Args:
+            df: Earthquake catalog DataFrame in load_catalog format
+            save_path: Optional path of the processed catalog to append to
+            state_dir: Directory holding the incremental state
+            state: State returned by load_incremental_state
+            
+        Returns:
+            Tuple of (newly ingested events with bin_id, updated annual statistics)
+        """
+        high_water_mark = state['high_water_mark']
+        new_df = df[df['origin_time'] > high_water_mark]
+        self.logger.info(f"Incremental ingestion: {len(new_df)} of {len(df)} events past high-water mark {high_water_mark}")
+        
+        # Step 0: Drop duplicates of the new batch, including re-reports of events ingested
+        # within the time tolerance before the high-water mark
+        events_df = self._remove_new_duplicate_events(df, high_water_mark) if self.deduplicate else new_df
+        
+        # Step 1: Filter shallow earthquakes
+        shallow_df = self.filter_shallow_earthquakes(events_df)
+        
+        # Step 2: Assign to the stored bins (no quadtree rebuild)
+        lat_col = self._get_column_name(shallow_df, 'latitude')
+        lon_col = self._get_column_name(shallow_df, 'longitude')
+        binned_df = shallow_df.copy()
+        binned_df['bin_id'] = self.quadtree_binner.assign_existing_bins(
+            shallow_df[lat_col].values,
+            shallow_df[lon_col].values
+        )
+        if self.compact_schema:
+            binned_df['bin_id'] = binned_df['bin_id'].astype('category')
+        binned_df = self._standardize_columns(binned_df)
+        binned_df['year'] = event_years(binned_df)
+        
+        # Step 3: Update only the affected (year, bin_id) aggregates
+        new_partial = partial_annual_aggregates(binned_df, binned_df['bin_id'].to_numpy(), self)
+        partial = update_partial_aggregates(state['partial_aggregates'], new_partial)
+        annual_stats = self._apply_zero_filling_strategy(finalize_partial_aggregates(partial))
+        
+        if len(new_df) > 0:
+            high_water_mark = max(high_water_mark, int(new_df['origin_time'].max()))
+        save_incremental_state(state_dir, self, high_water_mark, partial)
+        
+        # Step 4: Append new events and rewrite the (small) annual outputs
+        if save_path:
+            catalog_path = Path(save_path)
+            if catalog_path.exists():
+                header = pd.read_csv(catalog_path, nrows=0).columns
+                binned_df.reindex(columns=header).to_csv(catalog_path, mode='a', header=False, index=False)
+            else:
+                catalog_path.parent.mkdir(parents=True, exist_ok=True)
+                binned_df.to_csv(catalog_path, index=False)
+            self.logger.info(f"Appended {len(binned_df)} events to: {catalog_path}")
+            self._save_annual_outputs(annual_stats, catalog_path)
         
         return binned_df, annual_stats
     
+    def process_catalog_streaming(self, filepath: str, save_path: str = None,
+                                  chunksize: int = None, partials_dir: str = None) -> pd.DataFrame:
+        """
+        Memory-bounded pipeline: read the raw catalog in chunks and build annual statistics
+        from per-chunk partial aggregates, never holding the full event table.
+        
+        Args:
+            filepath: Path to the raw earthquake catalog CSV
+            save_path: Optional base path (as in process_catalog) for annual/LSTM outputs
+            chunksize: Number of raw rows per chunk
+            partials_dir: Optional directory for the per-chunk partial aggregates
+            
+        Returns:
+            DataFrame with annual statistics per bin
+        """
+        self.logger.info("Starting streaming earthquake catalog processing")
+        
+        annual_stats = stream_annual_statistics(
+            filepath,
+            self,
+            chunksize=chunksize or DEFAULT_CHUNKSIZE,
+            partials_dir=partials_dir
+        )
+        
+        self.logger.info(f"Computed annual statistics for {len(annual_stats)} year-bin combinations")
+        
+        if save_path:
+            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+            self._save_annual_outputs(annual_stats, Path(save_path))
+            self.quadtree_binner.save(Path(save_path).parent / BIN_SCHEME_FILE)
+        
+        return annual_stats
+    
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Standardize column names for processed data.
@@ -429,30 +959,32 @@ class EarthquakeProcessor:
         processed_catalog.to_csv(catalog_path, index=False)
         self.logger.info(f"Saved processed catalog to: {catalog_path}")
         
+        self._save_annual_outputs(annual_stats, catalog_path)
+    
+    def _save_annual_outputs(self, annual_stats: pd.DataFrame, catalog_path: Path):
+        """
+        Save annual statistics and LSTM-ready data next to the processed catalog path.
+        
+        Args:
+            annual_stats: Annual statistics per bin
+            catalog_path: Path of the processed catalog (used to derive file names)
+        """
+        # The outputs change, so any stage cache stamp no longer describes them
+        (catalog_path.parent / PREPROCESS_STAMP_FILE).unlink(missing_ok=True)
+        
         # Save annual statistics
         stats_path = catalog_path.parent / f"{catalog_path.stem}_annual_stats.csv"
         annual_stats.to_csv(stats_path, index=False)
         self.logger.info(f"Saved annual statistics to: {stats_path}")
         
         # Save LSTM-ready data
-        lstm_data = self.prepare_lstm_data(annual_stats)
-        lstm_path = catalog_path.parent / f"{catalog_path.stem}_lstm_ready.csv"
-        
-        # Convert LSTM data to DataFrame format
-        lstm_df = []
-        for item in lstm_data:
-            for seq_item in item['input_sequence']:
-                lstm_df.append({
-                    'bin_id': seq_item['bin_id'],
-                    'year': seq_item['year'],
-                    'max_magnitude': seq_item['max_magnitude'],
-                    'frequency': seq_item['frequency'],
-                    'target_year': item['target_year'],
-                    'target_max_magnitude': item['target_max_magnitude'],
-                    'target_frequency': item['target_frequency']
-                })
+        if self.lstm_format == 'binary':
+            tensor = self.prepare_lstm_tensor(annual_stats, features=PANEL_FEATURES)
+            save_lstm_artifact(tensor, catalog_path.parent / f"{catalog_path.stem}_lstm_ready.json", lookback_years=10)
+            return
         
-        lstm_df = pd.DataFrame(lstm_df)
+        lstm_path = catalog_path.parent / f"{catalog_path.stem}_lstm_ready.csv"
+        lstm_df = self._lstm_ready_frame(annual_stats)
         lstm_df.to_csv(lstm_path, index=False)
         self.logger.info(f"Saved LSTM-ready data to: {lstm_path}")
     
@@ -517,7 +1049,7 @@ class EarthquakeProcessor:
                       label='All Events', transform=ccrs.PlateCarree())
             
             # Plot filtered earthquakes (those with bin_id >= 0) as red circles
-            filtered_mask = processed_catalog['bin_id'] >= 0
+            filtered_mask = processed_catalog['bin_id'].astype(int) >= 0
             if filtered_mask.any():
                 filtered_lons = processed_catalog.loc[filtered_mask, 'longitude'].values
                 filtered_lats = processed_catalog.loc[filtered_mask, 'latitude'].values
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Incremental Ingestion State
+
+Persists what EarthquakeProcessor needs to ingest a new batch without a rebuild:
+1. High-water mark: the largest origin_time already ingested
+2. Bin scheme: the frozen QuadtreeBinner scheme file (bounds, unmerged bounds, parameters)
+3. Additive per-(year, bin_id) aggregates (before zero-filling)
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from binning.quadtree import QuadtreeBinner, BIN_SCHEME_FILE
+from preprocessing.streaming_reader import PARTIAL_COLUMNS
+
+STATE_VERSION = 2
+STATE_FILE = "ingest_state.json"
+AGGREGATES_FILE = "annual_partials.csv"
+
+logger = logging.getLogger(__name__)
+
+
+def bin_scheme_params(processor) -> Dict:
+    """Parameters that must match for a stored bin scheme and its aggregates to be reusable."""
+    return {
+        'min_depth': processor.min_depth,
+        'deduplicate': processor.deduplicate,
+        'dedup_tolerances': processor.dedup_tolerances if processor.deduplicate else None,
+        **processor.quadtree_binner.get_params()
+    }
+
+
+def save_incremental_state(state_dir: str, processor, high_water_mark: int,
+                           partial_aggregates: pd.DataFrame) -> None:
+    """
+    Write the ingestion state.
+
+    Args:
+        state_dir: Directory holding the state files
+        processor: EarthquakeProcessor whose quadtree has been built
+        high_water_mark: Largest ingested origin_time (epoch milliseconds)
+        partial_aggregates: Additive aggregates with PARTIAL_COLUMNS
+    """
+    state_path = Path(state_dir)
+    state_path.mkdir(parents=True, exist_ok=True)
+
+    state = {
+        'version': STATE_VERSION,
+        'high_water_mark': int(high_water_mark),
+        'params': bin_scheme_params(processor)
+    }
+
+    processor.quadtree_binner.save(state_path / BIN_SCHEME_FILE)
+    partial_aggregates[PARTIAL_COLUMNS].to_csv(state_path / AGGREGATES_FILE, index=False)
+    with open(state_path / STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+    logger.info(f"Saved incremental state to {state_path} (high-water mark: {high_water_mark})")
+
+
+def load_incremental_state(state_dir: str, processor) -> Optional[Dict]:
+    """
+    Load the ingestion state and restore the stored bin scheme on the processor.
+
+    Args:
+        state_dir: Directory holding the state files
+        processor: EarthquakeProcessor to restore the quadtree bins into
+
+    Returns:
+        Dict with 'high_water_mark' and 'partial_aggregates', or None if no state exists
+    """
+    state_path = Path(state_dir)
+    if not (state_path / STATE_FILE).exists():
+        return None
+
+    with open(state_path / STATE_FILE, 'r') as f:
+        state = json.load(f)
+
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f"Unsupported incremental state version: {state.get('version')}")
+    if state['params'] != bin_scheme_params(processor):
+        raise ValueError(
+            "Stored bin scheme was built with different parameters "
+            f"({state['params']}); run a full rebuild instead"
+        )
+
+    scheme = QuadtreeBinner.load(state_path / BIN_SCHEME_FILE)
+    binner = processor.quadtree_binner
+    binner.bounds = scheme.bounds
+    binner.unmerged_bounds = scheme.unmerged_bounds
+    binner.catalog_hash = scheme.catalog_hash
+    binner.bin_ids = scheme.bin_ids
+
+    return {
+        'high_water_mark': state['high_water_mark'],
+        'partial_aggregates': pd.read_csv(state_path / AGGREGATES_FILE)
+    }
+
+
+def update_partial_aggregates(stored: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fold a new batch's partial aggregates into the stored table, touching only
+    the (year, bin_id) rows present in the batch.
+
+    Args:
+        stored: Existing additive aggregates with PARTIAL_COLUMNS
+        new: Aggregates for the new batch with PARTIAL_COLUMNS
+
+    Returns:
+        Updated aggregates with PARTIAL_COLUMNS
+    """
+    if len(new) == 0:
+        return stored
+
+    stored = stored.set_index(['year', 'bin_id'])
+    new = new.set_index(['year', 'bin_id'])
+
+    existing = new.index.intersection(stored.index)
+    if len(existing) > 0:
+        for col in ['frequency', 'magnitude_sum', 'depth_sum']:
+            stored.loc[existing, col] = stored.loc[existing, col] + new.loc[existing, col]
+        stored.loc[existing, 'max_magnitude'] = np.maximum(
+            stored.loc[existing, 'max_magnitude'], new.loc[existing, 'max_magnitude']
+        )
+
+    added = new.index.difference(stored.index)
+    if len(added) > 0:
+        stored = pd.concat([stored, new.loc[added]])
+
+    logger.info(f"Updated {len(existing)} existing and added {len(added)} new (year, bin_id) rows")
+
+    return stored.reset_index()[PARTIAL_COLUMNS]
@@ -1,11 +1,41 @@
+import numpy as np
 import pandas as pd
 from csep.core.catalogs import CSEPCatalog
 from csep.utils.time_utils import datetime_to_utc_epoch
 
-def load_catalog(filepath):
-  
-    df = pd.read_csv(filepath, encoding='utf-8-sig')
+from preprocessing.compact_schema import apply_compact_schema
+
+def datetime_series_to_utc_epoch(dt_series):
+    """
+    Vectorized datetime_to_utc_epoch for a tz-aware UTC datetime64 Series.
+
+    Reproduces the per-row float arithmetic (days * 86400 + seconds +
+    microseconds / 1e6, then int(1000.0 * seconds)) so the resulting
+    millisecond epochs are identical to the csep implementation.
+    """
+    if str(dt_series.dt.tz) != 'UTC':
+        raise ValueError(f"Timezone info must be UTC. tzinfo={dt_series.dt.tz}")
+    if dt_series.isnull().any():
+        raise ValueError("Cannot convert missing datetimes to epoch time")
 
+    ns = dt_series.values.astype('datetime64[ns]').astype(np.int64)
+
+    # SAME DECOMPOSITION AS timedelta.total_seconds()
+    us = np.floor_divide(ns, 1000)
+    days, rem = np.divmod(us, 86400 * 10**6)
+    seconds, microseconds = np.divmod(rem, 10**6)
+    total_seconds = (days * 86400 + seconds).astype(np.float64) + microseconds / 1e6
+
+    return pd.Series(
+        np.trunc(1000.0 * total_seconds).astype(np.int64),
+        index=dt_series.index
+    )
+
+def normalize_catalog_frame(df, vectorized=True):
+    """
+    Apply the load_catalog normalization (date assembly, renames, Manila->UTC,
+    origin_time) to a raw catalog frame or chunk. The original index is kept.
+    """
     # COMBINE TO DATE_TIME & DROP ORIGINAL COLS
     df['Date_Time'] = pd.to_datetime(
         df[['Year', 'Month', 'Day', 'Hour', 'Minute', 'Second']], 
@@ -30,7 +60,17 @@ def load_catalog(filepath):
     ).dt.tz_convert('UTC')
 
     #  CONVERT UTC TO EPOCH TIME
-    df['origin_time'] = df['Date_Time'].apply(datetime_to_utc_epoch)
+    if vectorized:
+        df['origin_time'] = datetime_series_to_utc_epoch(df['Date_Time'])
+    else:
+        df['origin_time'] = df['Date_Time'].apply(datetime_to_utc_epoch)
+
+    return df
+
+def load_catalog(filepath, vectorized=True, compact=False):
+  
+    df = pd.read_csv(filepath, encoding='utf-8-sig')
+    df = normalize_catalog_frame(df, vectorized=vectorized)
 
     #  ADD ID COL
     df = df.reset_index().rename(columns={'index': 'id'})
@@ -38,4 +78,8 @@ def load_catalog(filepath):
     #  CREATE CATALOG 
     catalog = CSEPCatalog.from_dataframe(df)
 
+    #  NARROW DTYPES (CATALOG KEEPS FULL PRECISION)
+    if compact:
+        df = apply_compact_schema(df)
+
     return df, catalog
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Binary LSTM-Ready Dataset
+
+Compact replacement for the exploded *_lstm_ready.csv (one row per window and year):
+1. The dense [bins, years, features] panel of annual statistics is saved once as .npy
+2. Sliding windows are saved as an index array of (bin, first input year) pairs
+3. A small JSON header records bin ids, years, feature names and the array files
+4. Loading memory-maps the .npy arrays, so nothing is parsed or copied up front
+
+Each year is stored once instead of lookback_years times, and the panel can be
+sliced directly by training code.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+LSTM_ARTIFACT_VERSION = 1
+
+# Annual statistics stored in the panel, in compute_annual_statistics column order
+PANEL_FEATURES = ['max_magnitude', 'avg_magnitude', 'avg_depth', 'frequency']
+
+logger = logging.getLogger(__name__)
+
+
+def lstm_artifact_paths(header_path: str) -> Dict[str, Path]:
+    """Header and array file paths of an artifact, derived from the header path (*.json)."""
+    header_path = Path(header_path)
+    return {
+        'header': header_path,
+        'panel': header_path.with_name(f"{header_path.stem}_panel.npy"),
+        'windows': header_path.with_name(f"{header_path.stem}_windows.npy")
+    }
+
+
+def is_lstm_artifact(path: str) -> bool:
+    """True if path is the JSON header of a binary LSTM-ready dataset."""
+    path = Path(path)
+    if path.suffix != '.json' or not path.exists():
+        return False
+    with open(path) as f:
+        header = json.load(f)
+    return isinstance(header, dict) and header.get('format') == 'lstm_ready'
+
+
+def save_lstm_artifact(tensor: Dict, header_path: str, lookback_years: int) -> None:
+    """
+    Save a prepare_lstm_tensor result as a binary LSTM-ready dataset.
+
+    Args:
+        tensor: Output of EarthquakeProcessor.prepare_lstm_tensor
+        header_path: Path of the JSON header (arrays are written next to it)
+        lookback_years: Lookback the windows were built with
+    """
+    paths = lstm_artifact_paths(header_path)
+    paths['header'].parent.mkdir(parents=True, exist_ok=True)
+
+    # Windows whose input years and target year all have a row
+    n_windows = tensor['inputs'].shape[1]
+    if n_windows:
+        complete = sliding_window_view(tensor['observed'], lookback_years + 1, axis=1).all(axis=2)
+    else:
+        complete = np.zeros((len(tensor['bin_ids']), 0), dtype=bool)
+    window_bins, window_starts = np.nonzero(complete)
+    windows = np.column_stack([window_bins, window_starts]).astype(np.int32)
+
+    np.save(paths['panel'], np.ascontiguousarray(tensor['values'], dtype=np.float64))
+    np.save(paths['windows'], windows)
+
+    header = {
+        'format': 'lstm_ready',
+        'version': LSTM_ARTIFACT_VERSION,
+        'features': list(tensor['features']),
+        'bin_ids': tensor['bin_ids'].tolist(),
+        'first_year': int(tensor['years'][0]) if len(tensor['years']) else None,
+        'n_years': len(tensor['years']),
+        'lookback_years': lookback_years,
+        'panel': paths['panel'].name,
+        'windows': paths['windows'].name
+    }
+    with open(paths['header'], 'w') as f:
+        json.dump(header, f, indent=2)
+
+    logger.info(f"Saved binary LSTM dataset ({len(windows)} windows, panel "
+                f"{tensor['values'].shape}) to: {paths['header']}")
+
+
+def load_lstm_artifact(header_path: str, mmap: bool = True) -> Dict:
+    """
+    Load a binary LSTM-ready dataset.
+
+    Args:
+        header_path: Path of the JSON header
+        mmap: Memory-map the arrays instead of reading them into memory
+
+    Returns:
+        Dict with the header fields plus years, panel [bins, years, features] (nan where
+        a (bin, year) had no row) and windows [n_windows, 2] of (bin index, start year index)
+
+    Raises:
+        ValueError: If the file is not a binary LSTM-ready dataset of this version
+    """
+    header_path = Path(header_path)
+    with open(header_path) as f:
+        header = json.load(f)
+    if header.get('format') != 'lstm_ready' or header.get('version') != LSTM_ARTIFACT_VERSION:
+        raise ValueError(f"{header_path} is not a version {LSTM_ARTIFACT_VERSION} LSTM-ready dataset")
+
+    mmap_mode = 'r' if mmap else None
+    artifact = dict(header)
+    artifact['years'] = np.arange(header['n_years']) + (header['first_year'] or 0)
+    artifact['panel'] = np.load(header_path.parent / header['panel'], mmap_mode=mmap_mode)
+    artifact['windows'] = np.load(header_path.parent / header['windows'], mmap_mode=mmap_mode)
+    return artifact
+
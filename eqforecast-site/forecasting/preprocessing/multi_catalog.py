@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Parallel Multi-Catalog Ingestion
+
+Loads regional catalogs from several agencies at once:
+1. Each file is parsed and normalized (load_catalog format) in a process pool
+2. The normalized frames are merged with a single sort on origin_time
+3. Per-file throughput (events/s, MB/s) is reported
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from csep.core.catalogs import CSEPCatalog
+
+from preprocessing.catalog_cache import load_catalog_cached
+
+logger = logging.getLogger(__name__)
+
+
+def _load_one(filepath: str, use_cache: bool, loader_options: Dict) -> Tuple[pd.DataFrame, Dict]:
+    """Worker: load and normalize one catalog, returning the frame and its timing."""
+    start = time.perf_counter()
+    df, _ = load_catalog_cached(filepath, use_cache=use_cache, **loader_options)
+    # Materialize memory-mapped columns before the frame is pickled back
+    df = df.copy()
+    elapsed = time.perf_counter() - start
+
+    size_mb = os.path.getsize(filepath) / 1e6
+    stats = {
+        'file': Path(filepath).name,
+        'events': len(df),
+        'size_mb': size_mb,
+        'seconds': elapsed,
+        'events_per_s': len(df) / elapsed if elapsed > 0 else float('inf'),
+        'mb_per_s': size_mb / elapsed if elapsed > 0 else float('inf')
+    }
+    return df, stats
+
+
+def load_catalogs_parallel(filepaths: List[str], max_workers: Optional[int] = None,
+                           use_cache: bool = True,
+                           **loader_options) -> Tuple[pd.DataFrame, CSEPCatalog, pd.DataFrame]:
+    """
+    Load several raw catalogs in parallel and merge them into one.
+
+    Args:
+        filepaths: Paths to raw earthquake catalog CSVs
+        max_workers: Process pool size (default: one per file, capped at the CPU count)
+        use_cache: Reuse each file's columnar catalog cache
+        **loader_options: Keyword arguments forwarded to load_catalog
+
+    Returns:
+        Tuple of (merged DataFrame sorted by origin_time, CSEPCatalog, per-file throughput table).
+        The merged frame has a 'source' column naming the originating file and fresh ids.
+    """
+    if not filepaths:
+        raise ValueError("No catalog files given")
+
+    if max_workers is None:
+        max_workers = min(len(filepaths), os.cpu_count() or 1)
+
+    logger.info(f"Loading {len(filepaths)} catalogs with {max_workers} worker processes")
+    start = time.perf_counter()
+
+    frames = []
+    throughput = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_load_one, str(path), use_cache, loader_options) for path in filepaths]
+        for path, future in zip(filepaths, futures):
+            df, stats = future.result()
+            df['source'] = Path(path).name
+            frames.append(df)
+            throughput.append(stats)
+            logger.info(f"  {stats['file']}: {stats['events']} events in {stats['seconds']:.2f}s "
+                        f"({stats['events_per_s']:,.0f} events/s, {stats['mb_per_s']:.1f} MB/s)")
+
+    # Single merge: concatenate, then one stable sort on origin_time
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.sort_values('origin_time', kind='mergesort').reset_index(drop=True)
+    merged['id'] = merged.index.astype(merged['id'].dtype)
+
+    catalog = CSEPCatalog.from_dataframe(merged)
+
+    total = time.perf_counter() - start
+    logger.info(f"Merged {len(merged)} events from {len(filepaths)} catalogs in {total:.2f}s")
+
+    return merged, catalog, pd.DataFrame(throughput)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Stage Cache
+
+Memoizes the stages of EarthquakeProcessor.process_catalog so unchanged inputs
+are never reprocessed:
+1. The input catalog DataFrame is hashed by content (values, index, columns, dtypes)
+2. Each stage's key is a SHA-256 of its parent stage's key plus the stage parameters,
+   so changing an input or parameter invalidates that stage and everything after it
+3. Stage outputs are stored as pickled DataFrames (dtypes such as categorical bin_id
+   and timezone-aware datetimes round-trip exactly) plus any extra files, written
+   to a temporary directory and renamed into place
+4. Only the most recently used entries of each stage are kept
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+STAGE_CACHE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+MAX_ENTRIES_PER_STAGE = 4
+
+logger = logging.getLogger(__name__)
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    Compute a content hash of a DataFrame.
+
+    Args:
+        df: DataFrame to hash
+
+    Returns:
+        Hex digest covering values, index, column names and dtypes
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(np.ascontiguousarray(pd.util.hash_pandas_object(df, index=True).to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, parent_key: str, params: Dict) -> str:
+    """
+    Build a stage's cache key from its parent key and parameters.
+
+    Args:
+        stage: Stage name
+        parent_key: Input hash or key of the stage this one consumes
+        params: Parameters that change the stage output
+
+    Returns:
+        Hex digest identifying the stage output
+    """
+    payload = json.dumps({
+        'version': STAGE_CACHE_VERSION,
+        'stage': stage,
+        'parent': parent_key,
+        'params': params
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class StageCache:
+    """
+    Directory of stage outputs: <cache_dir>/<stage>/<key>/ with a manifest,
+    one pickle per DataFrame and any extra files the stage stores.
+    """
+
+    def __init__(self, cache_dir: str, max_entries_per_stage: int = MAX_ENTRIES_PER_STAGE):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries_per_stage = max_entries_per_stage
+
+    def entry_dir(self, stage: str, key: str) -> Path:
+        return self.cache_dir / stage / key
+
+    def load(self, stage: str, key: str) -> Optional[Dict]:
+        """
+        Read a stage entry.
+
+        Args:
+            stage: Stage name
+            key: Stage key from stage_key
+
+        Returns:
+            Dict of the stored DataFrames plus 'entry_dir' (for extra files), or None on a miss
+        """
+        entry_dir = self.entry_dir(stage, key)
+        manifest_path = entry_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != STAGE_CACHE_VERSION:
+                return None
+            entry = {name: pd.read_pickle(entry_dir / f"{name}.pkl") for name in manifest['frames']}
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable stage cache {entry_dir}: {e}")
+            return None
+
+        # Touch the manifest so pruning keeps recently used entries
+        os.utime(manifest_path)
+        entry['entry_dir'] = entry_dir
+        logger.info(f"Stage cache hit: {stage} ({key})")
+        return entry
+
+    def save(self, stage: str, key: str, frames: Dict[str, pd.DataFrame],
+             write_files: Callable[[Path], None] = None) -> None:
+        """
+        Write a stage entry atomically (temporary directory, then rename).
+
+        Args:
+            stage: Stage name
+            key: Stage key from stage_key
+            frames: DataFrames to store, by name
+            write_files: Optional callback writing extra files into the entry directory
+        """
+        entry_dir = self.entry_dir(stage, key)
+        tmp_dir = entry_dir.parent / f"{key}.tmp"
+        try:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+
+            for name, frame in frames.items():
+                frame.to_pickle(tmp_dir / f"{name}.pkl")
+            if write_files is not None:
+                write_files(tmp_dir)
+            with open(tmp_dir / MANIFEST_NAME, 'w') as f:
+                json.dump({'version': STAGE_CACHE_VERSION, 'stage': stage, 'frames': list(frames)}, f, indent=2)
+
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir)
+            tmp_dir.rename(entry_dir)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Could not write stage cache {entry_dir}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        logger.info(f"Saved stage cache: {stage} ({key})")
+        self._prune(stage)
+
+    def _prune(self, stage: str) -> None:
+        """Keep only the most recently used entries of a stage."""
+        manifests = sorted(
+            (self.cache_dir / stage).glob(f"*/{MANIFEST_NAME}"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for manifest_path in manifests[self.max_entries_per_stage:]:
+            logger.info(f"Removing old stage cache: {manifest_path.parent}")
+            shutil.rmtree(manifest_path.parent, ignore_errors=True)
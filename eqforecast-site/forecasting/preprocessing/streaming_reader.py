@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Chunked Streaming Catalog Reader
+
+Builds annual per-bin statistics from catalogs too large to hold in memory:
+1. Read the raw CSV in fixed-size chunks
+2. Per chunk: date assembly, Manila->UTC conversion, shallow-depth filter, bin assignment
+3. Reduce each chunk to partial aggregates per (year, bin_id)
+4. Combine the partials into the same annual table as compute_annual_statistics
+
+Only the partial aggregates (and, if the quadtree still has to be built,
+the latitude/longitude of the shallow events) are kept across chunks.
+"""
+
+import logging
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.load_catalog import normalize_catalog_frame
+from preprocessing.compact_schema import decode_magnitude, event_years
+
+DEFAULT_CHUNKSIZE = 200_000
+
+PARTIAL_COLUMNS = ['year', 'bin_id', 'frequency', 'magnitude_sum', 'max_magnitude', 'depth_sum']
+
+logger = logging.getLogger(__name__)
+
+
+def iter_normalized_chunks(filepath: str, processor, chunksize: int = DEFAULT_CHUNKSIZE,
+                           vectorized: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Yield normalized, shallow-filtered chunks of a raw catalog.
+
+    Args:
+        filepath: Path to the raw earthquake catalog CSV
+        processor: EarthquakeProcessor providing the depth threshold and column mapping
+        chunksize: Number of raw rows per chunk
+        vectorized: Use the vectorized origin_time conversion
+
+    Yields:
+        DataFrame chunks in load_catalog format containing only shallow events
+    """
+    reader = pd.read_csv(filepath, encoding='utf-8-sig', chunksize=chunksize)
+    for chunk in reader:
+        chunk = normalize_catalog_frame(chunk, vectorized=vectorized)
+        depth_col = processor._get_column_name(chunk, 'depth')
+        yield chunk[chunk[depth_col] < processor.min_depth]
+
+
+def collect_shallow_coordinates(filepath: str, processor, chunksize: int = DEFAULT_CHUNKSIZE,
+                                vectorized: bool = True):
+    """
+    First pass: gather only the coordinates needed to build the quadtree.
+
+    Returns:
+        Tuple of (lats, lons) arrays for all shallow events
+    """
+    lats, lons = [], []
+    for chunk in iter_normalized_chunks(filepath, processor, chunksize, vectorized):
+        lats.append(chunk[processor._get_column_name(chunk, 'latitude')].to_numpy())
+        lons.append(chunk[processor._get_column_name(chunk, 'longitude')].to_numpy())
+
+    if not lats:
+        return np.array([]), np.array([])
+    return np.concatenate(lats), np.concatenate(lons)
+
+
+def partial_annual_aggregates(chunk: pd.DataFrame, bin_ids: np.ndarray, processor) -> pd.DataFrame:
+    """
+    Reduce one binned chunk to additive per-(year, bin_id) aggregates.
+
+    Args:
+        chunk: Normalized, shallow-filtered chunk
+        bin_ids: Bin ID for every row of the chunk
+        processor: EarthquakeProcessor providing the column mapping
+
+    Returns:
+        DataFrame with PARTIAL_COLUMNS
+    """
+    if len(chunk) == 0:
+        return pd.DataFrame(columns=PARTIAL_COLUMNS)
+
+    mag_col = processor._get_column_name(chunk, 'magnitude')
+    depth_col = processor._get_column_name(chunk, 'depth')
+
+    events = pd.DataFrame({
+        'year': event_years(chunk).to_numpy(),
+        'bin_id': np.asarray(bin_ids),
+        'magnitude': decode_magnitude(chunk[mag_col]).to_numpy(np.float64),
+        'depth': chunk[depth_col].to_numpy(np.float64)
+    })
+
+    partial = events.groupby(['year', 'bin_id']).agg(
+        frequency=('magnitude', 'size'),
+        magnitude_sum=('magnitude', 'sum'),
+        max_magnitude=('magnitude', 'max'),
+        depth_sum=('depth', 'sum')
+    ).reset_index()
+
+    return partial[PARTIAL_COLUMNS]
+
+
+def merge_partial_aggregates(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merge partial aggregates into a single partial table with one row per (year, bin_id).
+
+    Args:
+        partials: Partial aggregate frames from partial_annual_aggregates
+
+    Returns:
+        DataFrame with PARTIAL_COLUMNS
+    """
+    partials = [p for p in partials if len(p) > 0]
+    if not partials:
+        return pd.DataFrame(columns=PARTIAL_COLUMNS)
+
+    merged = pd.concat(partials, ignore_index=True).groupby(['year', 'bin_id']).agg(
+        frequency=('frequency', 'sum'),
+        magnitude_sum=('magnitude_sum', 'sum'),
+        max_magnitude=('max_magnitude', 'max'),
+        depth_sum=('depth_sum', 'sum')
+    ).reset_index()
+
+    return merged[PARTIAL_COLUMNS]
+
+
+def finalize_partial_aggregates(partial: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a merged partial table into the compute_annual_statistics layout (before zero-filling).
+
+    Args:
+        partial: DataFrame with PARTIAL_COLUMNS, one row per (year, bin_id)
+
+    Returns:
+        DataFrame with year, bin_id, max_magnitude, avg_magnitude, avg_depth, frequency
+    """
+    annual_stats = pd.DataFrame({
+        'year': partial['year'],
+        'bin_id': partial['bin_id'],
+        'max_magnitude': partial['max_magnitude'],
+        'avg_magnitude': partial['magnitude_sum'] / partial['frequency'],
+        'avg_depth': partial['depth_sum'] / partial['frequency'],
+        'frequency': partial['frequency']
+    })
+    return annual_stats.sort_values(['year', 'bin_id']).reset_index(drop=True)
+
+
+def combine_partial_aggregates(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merge partial aggregates into the compute_annual_statistics layout (before zero-filling).
+
+    Args:
+        partials: Partial aggregate frames from partial_annual_aggregates
+
+    Returns:
+        DataFrame with year, bin_id, max_magnitude, avg_magnitude, avg_depth, frequency
+    """
+    return finalize_partial_aggregates(merge_partial_aggregates(partials))
+
+
+def load_partial_aggregates(partials_dir: str) -> List[pd.DataFrame]:
+    """Read back the per-chunk partial aggregates written by stream_annual_statistics."""
+    return [pd.read_csv(path) for path in sorted(Path(partials_dir).glob("partial_*.csv"))]
+
+
+def stream_annual_statistics(filepath: str, processor, chunksize: int = DEFAULT_CHUNKSIZE,
+                             partials_dir: Optional[str] = None,
+                             vectorized: bool = True) -> pd.DataFrame:
+    """
+    Compute zero-filled annual per-bin statistics without materializing the event table.
+
+    If the processor's quadtree has not been built yet, a first pass collects the
+    shallow-event coordinates and builds it exactly as classify_quadtree_bins would.
+    The second pass assigns bins chunk by chunk with the frozen bin bounds.
+
+    Args:
+        filepath: Path to the raw earthquake catalog CSV
+        processor: EarthquakeProcessor instance
+        chunksize: Number of raw rows per chunk
+        partials_dir: Optional directory where per-chunk partial aggregates are written
+        vectorized: Use the vectorized origin_time conversion
+
+    Returns:
+        Annual statistics DataFrame, equivalent to EarthquakeProcessor.compute_annual_statistics
+        up to floating-point summation order in the mean columns
+    """
+    binner = processor.quadtree_binner
+
+    if binner.bounds is None:
+        logger.info("Streaming pass 1: collecting shallow-event coordinates for the quadtree")
+        lats, lons = collect_shallow_coordinates(filepath, processor, chunksize, vectorized)
+        binner.assign_bins(lats, lons)
+        del lats, lons
+
+    if partials_dir:
+        Path(partials_dir).mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Streaming pass 2: aggregating chunks of {chunksize} rows")
+    partials = []
+    n_events = 0
+    for i, chunk in enumerate(iter_normalized_chunks(filepath, processor, chunksize, vectorized)):
+        lat_col = processor._get_column_name(chunk, 'latitude')
+        lon_col = processor._get_column_name(chunk, 'longitude')
+        bin_ids = binner.assign_existing_bins(chunk[lat_col].to_numpy(), chunk[lon_col].to_numpy())
+
+        partial = partial_annual_aggregates(chunk, bin_ids, processor)
+        n_events += len(chunk)
+
+        if partials_dir:
+            partial.to_csv(Path(partials_dir) / f"partial_{i:05d}.csv", index=False)
+        partials.append(partial)
+
+    logger.info(f"Streamed {n_events} shallow earthquakes in {len(partials)} chunks")
+
+    annual_stats = combine_partial_aggregates(partials)
+    return processor._apply_zero_filling_strategy(annual_stats)
@@ -0,0 +1,73 @@
+# zero_filling_benchmark.py
+#
+# Run time of the annual-statistics zero-filling step against bins x years, up to
+# 1,000 bins x 115 years (the length of the 1910-2024 catalog).
+#   python preprocessing/zero_filling_benchmark.py [--occupancy 0.3]
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.earthquake_processor import EarthquakeProcessor
+
+
+def synthetic_annual_stats(n_bins, n_years, occupancy=0.3, first_year=1910, seed=42):
+    """compute_annual_statistics-style table where each (bin, year) has events with probability occupancy."""
+    rng = np.random.default_rng(seed)
+    bin_id, year_idx = np.nonzero(rng.random((n_bins, n_years)) < occupancy)
+    n_rows = len(bin_id)
+    annual_stats = pd.DataFrame({
+        'year': first_year + year_idx,
+        'bin_id': bin_id,
+        'max_magnitude': rng.uniform(4.0, 7.5, n_rows),
+        'avg_magnitude': rng.uniform(3.0, 5.0, n_rows),
+        'avg_depth': rng.uniform(0.0, 70.0, n_rows),
+        'frequency': rng.integers(1, 50, n_rows)
+    })
+    return annual_stats.sort_values(['year', 'bin_id']).reset_index(drop=True)
+
+
+def run_benchmark(sizes, occupancy=0.3, repeats=3):
+    processor = EarthquakeProcessor()
+    processor.logger.setLevel(logging.WARNING)
+
+    rows = []
+    for n_bins, n_years in sizes:
+        annual_stats = synthetic_annual_stats(n_bins, n_years, occupancy)
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            filled = processor._apply_zero_filling_strategy(annual_stats)
+            timings.append(time.perf_counter() - start)
+        elapsed = min(timings)
+
+        rows.append({
+            'bins': n_bins,
+            'years': n_years,
+            'observed_rows': len(annual_stats),
+            'filled_rows': len(filled),
+            'seconds': round(elapsed, 4)
+        })
+        print(f"{n_bins} bins x {n_years} years: {len(annual_stats)} -> {len(filled)} rows in {elapsed:.4f}s")
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark annual-statistics zero-filling")
+    parser.add_argument('--bins', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--years', type=int, default=115)
+    parser.add_argument('--occupancy', type=float, default=0.3, help='Fraction of (bin, year) pairs with events')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run_benchmark([(n, args.years) for n in args.bins], occupancy=args.occupancy, repeats=args.repeats)
+    print("\n" + results.to_string(index=False))
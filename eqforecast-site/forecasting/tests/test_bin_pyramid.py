@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binning.quadtree import QuadtreeBinner
+from preprocessing.earthquake_processor import EarthquakeProcessor
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame({
+        'latitude': rng.uniform(4, 21, n),
+        'longitude': rng.uniform(117, 128, n),
+        'magnitude': rng.uniform(3, 7, n).round(1),
+        'depth': rng.uniform(0, 70, n),
+        'origin_time': rng.integers(631152000000, 1577836800000, n)
+    })
+
+
+def test_processor_pyramid_matches_quadtree_leaves(events):
+    processor = EarthquakeProcessor(bin_pyramid=True)
+    processor.quadtree_binner.assign_bins(events['latitude'].to_numpy(), events['longitude'].to_numpy())
+    pyramid = processor.build_bin_pyramid(events)
+
+    # Event bin ids are not saved, so they are not materialized
+    assert pyramid.event_bin_ids is None
+    finest = sorted(map(tuple, pyramid.bounds[-1].tolist()))
+    assert finest == sorted(processor.quadtree_binner.get_unmerged_bounds())
+
+
+def test_pyramid_rejected_with_frozen_scheme(events, tmp_path):
+    binner = QuadtreeBinner()
+    binner.assign_bins(events['latitude'].to_numpy(), events['longitude'].to_numpy())
+    binner.save(tmp_path / "bin_scheme.json")
+
+    with pytest.raises(ValueError, match="bin_scheme_path"):
+        EarthquakeProcessor(bin_pyramid=True, bin_scheme_path=str(tmp_path / "bin_scheme.json"))
+
+
+def test_pyramid_rejected_with_incremental(events, tmp_path):
+    processor = EarthquakeProcessor(bin_pyramid=True)
+    with pytest.raises(ValueError, match="incremental"):
+        processor.process_catalog(events, incremental=True, state_dir=str(tmp_path / "state"))
+    assert not (tmp_path / "state").exists()
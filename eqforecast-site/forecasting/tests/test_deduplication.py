@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.deduplication import find_duplicate_events, match_duplicate_pairs
+
+
+def catalog(rng, n, duplicate_fraction=0.2):
+    events = pd.DataFrame({
+        'origin_time': rng.integers(0, 3 * 10**12, n),
+        'latitude': rng.uniform(4, 21, n),
+        'longitude': rng.uniform(116, 127, n),
+        'magnitude': rng.uniform(3, 7, n).round(1)
+    })
+    # Re-reports of existing events with small perturbations
+    source = events.sample(int(n * duplicate_fraction), random_state=0)
+    reports = source.assign(
+        origin_time=source['origin_time'] + rng.integers(-20000, 20000, len(source)),
+        latitude=source['latitude'] + rng.uniform(-0.6, 0.6, len(source)),
+        longitude=source['longitude'] + rng.uniform(-0.6, 0.6, len(source))
+    )
+    return pd.concat([events, reports], ignore_index=True).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def pairwise_duplicates(df, time_tolerance_s=16.0, lat_tolerance=0.5, lon_tolerance=0.5):
+    times = df['origin_time'].to_numpy()
+    lats = df['latitude'].to_numpy()
+    lons = df['longitude'].to_numpy()
+    duplicate = np.zeros(len(df), dtype=bool)
+    for j in range(len(df)):
+        match = (
+            (np.abs(times[:j] - times[j]) <= time_tolerance_s * 1000.0) &
+            (np.abs(lats[:j] - lats[j]) <= lat_tolerance) &
+            (np.abs(lons[:j] - lons[j]) <= lon_tolerance) &
+            ~duplicate[:j]
+        )
+        duplicate[j] = match.any()
+    return duplicate
+
+
+def test_matches_pairwise_check():
+    df = catalog(np.random.default_rng(0), 3000)
+    duplicate = find_duplicate_events(df)
+    assert duplicate.any()
+    np.testing.assert_array_equal(duplicate, pairwise_duplicates(df))
+
+
+@pytest.mark.parametrize("tolerance", ['time_tolerance_s', 'lat_tolerance', 'lon_tolerance'])
+@pytest.mark.parametrize("value", [0, -1.0, float('nan')])
+def test_rejects_non_positive_tolerance(tolerance, value):
+    df = catalog(np.random.default_rng(0), 100)
+    with pytest.raises(ValueError, match=tolerance):
+        find_duplicate_events(df, **{tolerance: value})
+
+
+def test_candidates_scale_linearly():
+    rng = np.random.default_rng(0)
+    small, large = catalog(rng, 10_000), catalog(rng, 80_000)
+
+    _, _, small_candidates = match_duplicate_pairs(small)
+    _, _, large_candidates = match_duplicate_pairs(large)
+
+    # 8x the events: ~8x the candidates for the grid, 64x for a pairwise check
+    assert small_candidates < 2 * len(small)
+    assert large_candidates / small_candidates < 10
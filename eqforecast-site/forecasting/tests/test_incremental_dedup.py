@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.earthquake_processor import EarthquakeProcessor
+from preprocessing.load_catalog import load_catalog
+
+CUT = pd.Timestamp('2005-06-01 12:00:00')
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3000
+    times = pd.to_datetime(rng.integers(pd.Timestamp('1990-01-01').value, pd.Timestamp('2020-01-01').value, n))
+    events = pd.DataFrame({
+        'time': times,
+        'N_Lat': rng.uniform(5, 20, n).round(2),
+        'E_Long': rng.uniform(117, 127, n).round(2),
+        'Depth': rng.uniform(0, 60, n).round(1),
+        'Mag': rng.uniform(3, 6, n).round(1)
+    })
+    events = events[(events['time'] < CUT - pd.Timedelta(minutes=1)) | (events['time'] > CUT + pd.Timedelta(minutes=1))]
+
+    # Originals just before the cut, re-reported a few seconds later just after it
+    originals = events.sample(10, random_state=0).assign(
+        time=CUT - pd.to_timedelta(np.arange(10) + 1, unit='s')
+    )
+    reports = originals.assign(
+        time=originals['time'] + pd.Timedelta(seconds=12),
+        N_Lat=originals['N_Lat'] + 0.1
+    )
+    raw = pd.concat([events, originals, reports]).sort_values('time', kind='mergesort')
+    raw = pd.DataFrame({
+        'Year': raw['time'].dt.year, 'Month': raw['time'].dt.month, 'Day': raw['time'].dt.day,
+        'Hour': raw['time'].dt.hour, 'Minute': raw['time'].dt.minute, 'Second': raw['time'].dt.second,
+        'N_Lat': raw['N_Lat'], 'E_Long': raw['E_Long'], 'Depth': raw['Depth'], 'Mag': raw['Mag']
+    })
+    raw.to_csv(tmp_path / "catalog.csv", index=False)
+    df, _ = load_catalog(tmp_path / "catalog.csv")
+    return df
+
+
+def processor(**kwargs):
+    processor = EarthquakeProcessor(deduplicate=True, **kwargs)
+    processor.plot_quadtree_bins = lambda *args, **kw: None
+    processor.plot_quadtree_comparison = lambda *args, **kw: None
+    return processor
+
+
+def test_incremental_matches_full_run_across_high_water_mark(catalog, tmp_path):
+    state_dir = tmp_path / "state"
+    high_water_mark = catalog.loc[catalog['Date_Time'] < CUT.tz_localize('Asia/Manila'), 'origin_time'].max()
+    before = catalog[catalog['origin_time'] <= high_water_mark]
+    assert (catalog['origin_time'] - high_water_mark).between(1, 16000).sum() >= 5
+
+    processor().process_catalog(before, incremental=True, state_dir=str(state_dir))
+    _, incremental_stats = processor().process_catalog(catalog, incremental=True, state_dir=str(state_dir))
+
+    frozen = processor(bin_scheme_path=str(state_dir / "bin_scheme.json"))
+    _, full_stats = frozen.process_catalog(catalog)
+
+    columns = ['year', 'bin_id', 'frequency', 'max_magnitude']
+    pd.testing.assert_frame_equal(
+        incremental_stats[columns].sort_values(['year', 'bin_id']).reset_index(drop=True),
+        full_stats[columns].sort_values(['year', 'bin_id']).reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+def test_switching_deduplication_is_rejected(catalog, tmp_path):
+    state_dir = tmp_path / "state"
+    processor().process_catalog(catalog, incremental=True, state_dir=str(state_dir))
+
+    raw = EarthquakeProcessor()
+    with pytest.raises(ValueError, match="different parameters"):
+        raw.process_catalog(catalog, incremental=True, state_dir=str(state_dir))
+
+    other = processor(dedup_tolerances={'time_tolerance_s': 30.0})
+    with pytest.raises(ValueError, match="different parameters"):
+        other.process_catalog(catalog, incremental=True, state_dir=str(state_dir))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from csep.utils.time_utils import datetime_to_utc_epoch
+
+from preprocessing.load_catalog import datetime_series_to_utc_epoch
+
+
+def manila_to_utc(values):
+    """Localize naive times like normalize_catalog_frame does."""
+    return pd.Series(pd.to_datetime(values)).dt.tz_localize(
+        'Asia/Manila', ambiguous='NaT', nonexistent='NaT'
+    ).dt.tz_convert('UTC')
+
+
+@pytest.mark.parametrize("unit", ['us', 'ns'])
+def test_matches_per_row_conversion(unit):
+    rng = np.random.default_rng(0)
+    # 1910-2027, including pre-1970 times, with sub-second parts
+    ns = rng.integers(-1_893_456_000, 1_830_297_600, 20000) * 10**9 + rng.integers(0, 10**9, 20000)
+    dt = pd.Series(pd.to_datetime(ns, unit='ns', utc=True)).astype(f'datetime64[{unit}, UTC]')
+
+    expected = dt.apply(datetime_to_utc_epoch)
+    pd.testing.assert_series_equal(datetime_series_to_utc_epoch(dt), expected, check_dtype=False)
+
+
+def test_matches_edge_cases():
+    dt = manila_to_utc([
+        '1969-12-31 23:59:59.999999', '1970-01-01 08:00:00.000001', '1910-01-01 00:00:00.5',
+        '1977-03-27 23:59:59.999', '1977-09-22 00:00:00.001', '2025-03-31 12:34:56.789012'
+    ])
+    assert dt.notnull().all()
+
+    expected = dt.apply(datetime_to_utc_epoch)
+    pd.testing.assert_series_equal(datetime_series_to_utc_epoch(dt), expected, check_dtype=False)
+
+
+def test_dst_gap_and_overlap_times_are_rejected():
+    # Asia/Manila DST in 1977: 00:00-01:00 on 28 March does not exist and
+    # 23:00-00:00 on 21 September happens twice, so both localize to NaT
+    dt = manila_to_utc(['1977-03-28 00:30', '1977-09-21 23:30', '2000-01-01 00:00'])
+    assert dt.isnull().tolist() == [True, True, False]
+
+    with pytest.raises(ValueError):
+        dt.apply(datetime_to_utc_epoch)
+    with pytest.raises(ValueError):
+        datetime_series_to_utc_epoch(dt)
+
+    valid = dt.dropna()
+    pd.testing.assert_series_equal(
+        datetime_series_to_utc_epoch(valid), valid.apply(datetime_to_utc_epoch), check_dtype=False
+    )
+
+
+def test_requires_utc():
+    dt = pd.Series(pd.to_datetime(['2000-01-01 00:00'])).dt.tz_localize('Asia/Manila')
+    with pytest.raises(ValueError):
+        datetime_series_to_utc_epoch(dt)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from binning.quadtree import QuadtreeBinner
+from binning.rect_index import RectIndex
+
+CUSTOM_BOUNDS = (116.3, 129.0, 2.0, 22.0)
+
+
+def clustered_events(rng, n):
+    centers = rng.uniform([118, 4], [127, 20], size=(6, 2))
+    events = centers[rng.integers(0, 6, n)] + rng.normal(0, 0.7, size=(n, 2))
+    return events[:, 1], events[:, 0]
+
+
+def overlapping_bounds(bounds):
+    return {frozenset((bounds[i], bounds[j])) for i, j in RectIndex(bounds).overlapping_pairs()}
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("merge_threshold", [None, 50])
+def test_update_bins_adds_no_overlapping_bins(seed, merge_threshold):
+    rng = np.random.default_rng(seed)
+    lats, lons = clustered_events(rng, 4000)
+    new_lats, new_lons = clustered_events(rng, 3000)
+
+    binner = QuadtreeBinner(custom_bounds=CUSTOM_BOUNDS, merge_threshold=merge_threshold)
+    binner.assign_bins(lats, lons)
+    old_overlaps = overlapping_bounds(binner.bounds)
+    new_ids = binner.update_bins(lats, lons, new_lats, new_lons)
+
+    assert overlapping_bounds(binner.bounds) <= old_overlaps
+    inside = (
+        (new_lons >= CUSTOM_BOUNDS[0]) & (new_lons < CUSTOM_BOUNDS[1]) &
+        (new_lats >= CUSTOM_BOUNDS[2]) & (new_lats < CUSTOM_BOUNDS[3])
+    )
+    assert np.all(new_ids[inside] >= 0)
+
+    # Same leaves as a rebuild, and the bins still tile them
+    rebuilt = QuadtreeBinner(custom_bounds=CUSTOM_BOUNDS, merge_threshold=merge_threshold)
+    rebuilt.assign_bins(np.concatenate([lats, new_lats]), np.concatenate([lons, new_lons]))
+    assert binner.unmerged_bounds == rebuilt.unmerged_bounds
+    if not old_overlaps:
+        area = sum((b[1] - b[0]) * (b[3] - b[2]) for b in binner.bounds)
+        root_area = (CUSTOM_BOUNDS[1] - CUSTOM_BOUNDS[0]) * (CUSTOM_BOUNDS[3] - CUSTOM_BOUNDS[2])
+        assert area == pytest.approx(root_area)
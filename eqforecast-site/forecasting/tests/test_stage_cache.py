@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.earthquake_processor import EarthquakeProcessor, PREPROCESS_STAMP_FILE
+from preprocessing.load_catalog import load_catalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 2000
+    raw = pd.DataFrame({
+        'Year': rng.integers(1990, 2020, n),
+        'Month': rng.integers(1, 13, n),
+        'Day': rng.integers(1, 29, n),
+        'Hour': rng.integers(0, 24, n),
+        'Minute': rng.integers(0, 60, n),
+        'Second': rng.uniform(0, 60, n).round(2),
+        'N_Lat': rng.uniform(5, 20, n).round(2),
+        'E_Long': rng.uniform(117, 127, n).round(2),
+        'Depth': rng.uniform(0, 60, n).round(1),
+        'Mag': rng.uniform(3, 6, n).round(1)
+    })
+    raw_path = tmp_path / "catalog.csv"
+    raw.to_csv(raw_path, index=False)
+    df, _ = load_catalog(raw_path)
+    return df
+
+
+def write_plot(catalog, save_path):
+    Path(save_path).write_bytes(b"png")
+
+
+def run(df, out_dir, plot=write_plot, **kwargs):
+    # Plotting is replaced by a stub that writes the file (or fails to, like a broken cartopy)
+    processor = EarthquakeProcessor(stage_cache_dir=str(out_dir / ".stage_cache"), **kwargs)
+    processor.plot_quadtree_bins = plot
+    processor.plot_quadtree_comparison = plot
+    processor.process_catalog(df, save_path=str(out_dir / "processed.csv"))
+
+
+@pytest.mark.parametrize("lstm_format, missing", [
+    ('csv', 'processed_lstm_ready.csv'),
+    ('csv', 'bin_scheme.json'),
+    ('binary', 'processed_lstm_ready_windows.npy'),
+    ('csv', 'quadtree_comparison.png'),
+])
+def test_missing_output_is_rewritten(catalog, tmp_path, lstm_format, missing):
+    run(catalog, tmp_path, lstm_format=lstm_format)
+    written = (tmp_path / "processed.csv").stat().st_mtime_ns
+
+    # Unchanged inputs with all outputs present: nothing is rewritten
+    run(catalog, tmp_path, lstm_format=lstm_format)
+    assert (tmp_path / "processed.csv").stat().st_mtime_ns == written
+
+    (tmp_path / missing).unlink()
+    run(catalog, tmp_path, lstm_format=lstm_format)
+    assert (tmp_path / missing).exists()
+    assert (tmp_path / PREPROCESS_STAMP_FILE).exists()
+
+
+def test_failed_plots_leave_outputs_stale(catalog, tmp_path):
+    run(catalog, tmp_path, plot=lambda *args, **kw: None)
+    assert not (tmp_path / PREPROCESS_STAMP_FILE).exists()
+
+    run(catalog, tmp_path)
+    assert (tmp_path / "quadtree_bins_visualization.png").exists()
+    assert (tmp_path / PREPROCESS_STAMP_FILE).exists()